@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+#
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Micro-benchmark of the automaton's handling of the events which used
+# to visit all the CPUs of the state: sched_wakeup (is the wakee
+# running?) and mm_page_free (is the current task of a CPU in an I/O
+# system call, or kswapd?). Synthetic events are fed to the automaton
+# after one task was scheduled on each CPU.
+
+import argparse
+import time
+from babeltrace import CTFScope
+from lttnganalyses.common.version_utils import Version
+from lttnganalyses.core.event import Event
+from lttnganalyses.linuxautomaton import automaton
+
+
+def _create_event(name, timestamp, cpu_id, **fields):
+    return Event.new_from_fields(name, timestamp, {
+        CTFScope.STREAM_PACKET_CONTEXT: {'cpu_id': cpu_id},
+        CTFScope.EVENT_FIELDS: fields,
+    })
+
+
+def _create_automaton(cpu_count):
+    bench_automaton = automaton.Automaton()
+    bench_automaton.state.tracer_version = Version(2, 8, 0)
+
+    for cpu_id in range(cpu_count):
+        bench_automaton.process_event(_create_event(
+            'sched_switch', cpu_id, cpu_id, prev_comm='swapper/0',
+            prev_tid=0, prev_prio=20, prev_state=0, next_comm='task',
+            next_tid=1000 + cpu_id, next_prio=20))
+
+    return bench_automaton
+
+
+def _measure(bench_automaton, events):
+    begin = time.perf_counter()
+
+    for event in events:
+        bench_automaton.process_event(event)
+
+    return time.perf_counter() - begin
+
+
+def _main():
+    parser = argparse.ArgumentParser(description='Measure the time the '
+                                     'automaton takes to handle wakeups '
+                                     'and page frees')
+    parser.add_argument('--cpus', type=int, default=256,
+                        help='Number of CPUs (default: 256)')
+    parser.add_argument('--count', type=int, default=100000,
+                        help='Number of events of each kind '
+                        '(default: 100000)')
+    args = parser.parse_args()
+    bench_automaton = _create_automaton(args.cpus)
+    wakeups = [
+        _create_event('sched_wakeup', 10 ** 6 + i, i % args.cpus,
+                      comm='wakee', tid=50000 + i % 5000, prio=20,
+                      target_cpu=i % args.cpus)
+        for i in range(args.count)
+    ]
+    page_frees = [
+        _create_event('mm_page_free', 10 ** 7 + i, i % args.cpus)
+        for i in range(args.count)
+    ]
+    wakeups_duration = _measure(bench_automaton, wakeups)
+    page_frees_duration = _measure(bench_automaton, page_frees)
+    print('{} CPUs: {} sched_wakeup: {:.3f} s, {} mm_page_free: '
+          '{:.3f} s'.format(args.cpus, args.count, wakeups_duration,
+                            args.count, page_frees_duration))
+
+
+if __name__ == '__main__':
+    _main()
@@ -23,18 +23,21 @@
 # SOFTWARE.
 
 import argparse
+import copy
+import inspect
 import json
 import os
-import re
 import sys
 import subprocess
 import traceback
 from babeltrace import TraceCollection
-from . import mi, progressbar, period_parsing
+from . import mi, profiler, progressbar, period_parsing
 from .. import __version__
-from ..core import analysis, period as core_period
+from ..core import analysis, cache, parallel, period as core_period
+from ..core import event as core_event, snapshot
 from ..common import (
-    format_utils, parse_utils, trace_utils, version_utils
+    format_utils, index_utils, metadata_utils, parse_utils, time_utils,
+    trace_utils, version_utils
 )
 from ..linuxautomaton import automaton
 
@@ -48,18 +51,26 @@ class Command:
     ]
     _MI_URL = 'https://github.com/lttng/lttng-analyses'
     _VERSION = version_utils.Version.new_from_string(__version__)
-    _BT_INTERSECT_VERSION = version_utils.Version(1, 4, 0)
     _DEBUG_ENV_VAR = 'LTTNG_ANALYSES_DEBUG'
+    _DEFAULT_WARMUP = '1s'
+    _DEFAULT_SNAPSHOT_INTERVAL = '60s'
+    # appended to the processes and files whose information might be
+    # incomplete in text results (see _get_incomplete_marker())
+    _INCOMPLETE_MARKER = ' *'
 
     def __init__(self, mi_mode=False):
         self._analysis = None
         self._analysis_conf = None
         self._args = None
-        self._babeltrace_version = None
+        self._bt_intersect_mode_supported = None
+        self._snapshot_store = None
+        self._seek_ts = None
         self._handles = None
         self._traces = None
         self._period_ticks = 0
+        self._profiler = None
         self._mi_mode = mi_mode
+        self._mi_results_sink = None
         self._debug_mode = os.environ.get(self._DEBUG_ENV_VAR)
         self._run_step('create automaton', self._create_automaton)
         self._run_step('setup MI', self._mi_setup)
@@ -156,8 +167,31 @@ class Command:
                                 table_classes=self._mi_table_classes.values())
         print(json.dumps(infos))
 
+    # Creates a log result table of which the rows are the dicts of
+    # column values generated by `gen_rows`. With --stream-log, the
+    # rows are only created, one at a time, when the table is printed
+    # or appended, instead of being kept in the table.
+    def _create_log_result_table(self, table_class_name, begin, end,
+                                 gen_rows, subtitle=None):
+        table_class = self._mi_table_classes[table_class_name]
+
+        if self._args.stream_log:
+            return mi.StreamedResultTable(table_class, begin, end, gen_rows,
+                                          subtitle)
+
+        result_table = mi.ResultTable(table_class, begin, end, subtitle)
+
+        for row in gen_rows:
+            result_table.append_row(**row)
+
+        return result_table
+
     def _mi_append_result_table(self, result_table):
-        if not result_table or not result_table.rows:
+        if isinstance(result_table, mi.StreamedResultTable):
+            mi.print_streamed_result_table(result_table)
+            return
+
+        if not result_table or result_table.is_empty:
             return
 
         tc_name = result_table.table_class.name
@@ -179,13 +213,23 @@ class Command:
 
         return self._result_tables[table_class_name]
 
-    def _mi_print(self):
+    def _mi_get_results(self):
         results = []
 
         for result_tables in self._result_tables.values():
             for result_table in result_tables:
                 results.append(result_table.to_native_object())
 
+        return results
+
+    def _mi_print(self):
+        results = self._mi_get_results()
+
+        # results collected by a parent command (multi-analysis)
+        if self._mi_results_sink is not None:
+            self._mi_results_sink.extend(results)
+            return
+
         obj = {
             'results': results,
         }
@@ -196,8 +240,11 @@ class Command:
         pass
 
     def _open_trace(self):
-        self._babeltrace_version = trace_utils.read_babeltrace_version()
-        if self._babeltrace_version >= self._BT_INTERSECT_VERSION:
+        # TraceCollection only accepts the intersect_mode argument
+        # starting with babeltrace 1.4
+        self._bt_intersect_mode_supported = 'intersect_mode' in \
+            inspect.signature(TraceCollection).parameters
+        if self._bt_intersect_mode_supported:
             traces = TraceCollection(intersect_mode=self._args.intersect_mode)
         else:
             if self._args.intersect_mode:
@@ -231,56 +278,26 @@ class Command:
         # remove the trailing /
         while self._args.path.endswith('/'):
             self._args.path = self._args.path[:-1]
-        for root, _, _ in os.walk(self._args.path):
-            if root.endswith('kernel'):
-                kernel_path = root
+        for handle in self._handles.values():
+            if handle.path.rstrip('/').endswith('kernel'):
+                kernel_path = handle.path
                 break
 
         if kernel_path is None:
             self._gen_error('Could not find kernel trace directory')
 
         try:
-            ret, metadata = subprocess.getstatusoutput(
-                'babeltrace -o ctf-metadata "%s"' % kernel_path)
-        except subprocess.CalledProcessError:
-            self._gen_error('Cannot run babeltrace on the trace, cannot read'
-                            ' tracer version')
-
-        # fallback to reading the text metadata if babeltrace failed to
-        # output the CTF metadata
-        if ret != 0:
-            try:
-                metadata = subprocess.getoutput(
-                    'cat "%s"' % os.path.join(kernel_path, 'metadata'))
-            except subprocess.CalledProcessError:
-                self._gen_error('Cannot read the metadata of the trace, cannot'
-                                'extract tracer version')
-
-        major_match = re.search(r'tracer_major = "*(\d+)"*', metadata)
-        minor_match = re.search(r'tracer_minor = "*(\d+)"*', metadata)
-        patch_match = re.search(r'tracer_patchlevel = "*(\d+)"*', metadata)
-
-        if not major_match or not minor_match or not patch_match:
+            trace_metadata = metadata_utils.get_trace_metadata(
+                os.path.join(kernel_path, 'metadata'),
+                trace_utils.get_cache_dir(self._args.path))
+        except (OSError, ValueError) as e:
+            self._gen_error('Cannot read the metadata of the trace, cannot '
+                            'extract tracer version: {}'.format(e))
+
+        if trace_metadata.tracer_version is None:
             self._gen_error('Malformed metadata, cannot read tracer version')
 
-        self.state.tracer_version = version_utils.Version(
-            int(major_match.group(1)),
-            int(minor_match.group(1)),
-            int(patch_match.group(1)),
-        )
-
-    def _read_babeltrace_version(self):
-        try:
-            output = subprocess.check_output('babeltrace')
-        except subprocess.CalledProcessError:
-            self._gen_error('Could not run babeltrace to verify version')
-
-        output = output.decode(sys.stdout.encoding)
-        first_line = output.splitlines()[0]
-        version_string = first_line.split()[-1]
-
-        self._babeltrace_version = \
-            version_utils.Version.new_from_string(version_string)
+        self.state.tracer_version = trace_metadata.tracer_version
 
     def _check_lost_events(self):
         msg = 'Checking the trace for lost events...'
@@ -289,12 +306,58 @@ class Command:
         if self._mi_mode and self._args.output_progress:
             mi.print_progress(0, msg)
 
-        try:
-            subprocess.check_output('babeltrace "%s"' % self._args.path,
-                                    shell=True)
-        except subprocess.CalledProcessError:
-            self._gen_error('Cannot run babeltrace on the trace, cannot verify'
-                            ' if events were lost during the trace recording')
+        # the packet indexes are enough to find the lost events of the
+        # traces which have them
+        index_paths = index_utils.find_index_files(self._args.path)
+        trace_paths = sorted(handle.path for handle in self._handles.values())
+        indexed_trace_dirs = {
+            os.path.realpath(index_utils.get_trace_dir(index_path))
+            for index_path in index_paths
+        }
+
+        if index_paths:
+            try:
+                trace_lost_events = index_utils.get_trace_lost_events(
+                    self._args.path, index_paths)
+            except (OSError, ValueError) as e:
+                self._warn('Warning: Cannot read the packet indexes of the '
+                           'trace ({}): decoding the whole trace'.format(e))
+            else:
+                self._report_lost_events(trace_lost_events)
+                trace_paths = [
+                    path for path in trace_paths
+                    if os.path.realpath(path) not in indexed_trace_dirs
+                ]
+
+                for trace_path in trace_paths:
+                    self._warn('Warning: Trace {} has no packet index: '
+                               'decoding it'.format(trace_path))
+
+        for trace_path in trace_paths:
+            try:
+                subprocess.check_output('babeltrace "%s"' % trace_path,
+                                        shell=True)
+            except subprocess.CalledProcessError:
+                self._gen_error('Cannot run babeltrace on the trace, cannot '
+                                'verify if events were lost during the trace '
+                                'recording')
+
+    def _report_lost_events(self, trace_lost_events):
+        for stream, lost_events in sorted(trace_lost_events.items()):
+            for lost in lost_events:
+                time_range = format_utils.format_time_range(
+                    lost.begin_ts, lost.end_ts, print_date=True,
+                    gmt=self._args.gmt)
+
+                if lost.event_count > 0:
+                    self._warn('Warning: {} events lost in stream {} '
+                               'during {}'.format(lost.event_count, stream,
+                                                  time_range))
+
+                if lost.packet_count > 0:
+                    self._warn('Warning: {} packets lost in stream {} '
+                               'during {}'.format(lost.packet_count, stream,
+                                                  time_range))
 
     def _pre_analysis(self):
         pass
@@ -349,21 +412,317 @@ class Command:
                 self._gen_error('Trace has no intersection. '
                                 'Use --no-intersection to override')
 
-        first_event = True
-        for event in self._traces.events:
-            if first_event is True:
-                self._analysis.begin_analysis(event)
-                first_event = False
-            self._pb_update(event)
-            self._analysis.process_event(event)
-            if self._analysis.ended:
-                break
-            self._automaton.process_event(event)
+        # snapshots contain the state of all the state providers
+        if not self._args.snapshots:
+            self._select_state_providers()
+
+        if self._args.profile:
+            self._create_profiler()
+
+        if self._args.jobs > 1:
+            self._run_time_shards()
+        else:
+            self._process_events()
+
+        profile_tables = None
+
+        if self._profiler is not None:
+            profile_tables = self._get_profile_result_tables()
+
+            if self._mi_mode:
+                self._mi_append_result_tables(profile_tables)
 
-        self._pb_finish()
-        self._analysis.end_analysis()
         self._post_analysis()
 
+        if profile_tables is not None and not self._mi_mode:
+            profiler.print_result_tables(profile_tables)
+
+    # Keeps only the state providers which the analyses need
+    def _select_state_providers(self):
+        names = set()
+
+        for an in self._get_analyses():
+            names |= an.notification_names
+
+        self._automaton.select_state_providers(names)
+
+    def _create_profiler(self):
+        self._profiler = profiler.Profiler()
+        self._profiler.instrument_automaton(self._automaton)
+
+        for an in self._get_analyses():
+            self._profiler.instrument_analysis(an)
+
+    def _get_profile_result_tables(self):
+        analyses = self._get_analyses()
+        begin_ns = analyses[0].first_event_ts
+        end_ns = analyses[0].last_event_ts
+
+        return self._profiler.get_result_tables(begin_ns, end_ns)
+
+    def _get_intersect_mode_arg(self):
+        if self._bt_intersect_mode_supported:
+            return self._args.intersect_mode
+
+        return None
+
+    def _get_analyses(self):
+        return [self._analysis]
+
+    def _process_events(self):
+        reader = None
+        cache_writer = None
+        analyses = self._get_analyses()
+
+        self._find_consumed_event_names()
+        event_names = self._event_names
+
+        events = None
+
+        if self._args.cache:
+            cache_path = cache.get_event_cache_path(self._args.path,
+                                                    self._args.intersect_mode)
+
+            if cache.EventCacheReader.exists(cache_path):
+                events = cache.EventCacheReader(cache_path,
+                                                event_names).events
+            else:
+                # the cache needs the fields of all the events
+                cache_writer = cache.EventCacheWriter(cache_path)
+                event_names = None
+
+        if events is None:
+            if self._args.decode_jobs > 1:
+                reader = parallel.ParallelTraceReader(
+                    self._args.path, self._args.decode_jobs,
+                    self._get_intersect_mode_arg(), event_names)
+                events = reader.events
+            else:
+                if self._args.snapshots:
+                    events = self._get_snapshot_events()
+                elif self._args.seek:
+                    events = self._get_seek_events()
+                else:
+                    events = self._traces.events
+
+                events = core_event.FieldAccessor().wrap_events(events)
+
+        try:
+            if cache_writer is not None:
+                events = cache_writer.record(events)
+                cached_events = events
+
+            if self._args.snapshots:
+                events = self._snapshot_store.record(
+                    events, self._automaton, self._args.snapshot_interval)
+
+            if self._profiler is not None:
+                events = self._profiler.profile_events(events)
+
+            first_event = True
+            for event in events:
+                if first_event is True:
+                    for an in analyses:
+                        an.begin_analysis(event)
+                    first_event = False
+                self._pb_update(event)
+                for an in analyses:
+                    an.process_event(event)
+                if all(an.ended for an in analyses):
+                    break
+                self._automaton.process_event(event)
+
+            if self._profiler is not None:
+                self._profiler.finish()
+
+            if cache_writer is not None:
+                # the cache contains all the events of the trace, even if
+                # the analysis ended before
+                for event in cached_events:
+                    pass
+
+                cache_writer.close()
+                cache_writer = None
+        finally:
+            # an incomplete cache must not be replayed later
+            if cache_writer is not None:
+                cache_writer.discard()
+
+            if reader is not None:
+                reader.close()
+
+        self._pb_finish()
+
+        for an in analyses:
+            an.end_analysis()
+
+        if self._seek_ts is not None:
+            self._report_incomplete_state()
+
+    # Returns the events to process with --snapshots, restoring the
+    # state of the automaton from the latest snapshot taken before the
+    # beginning of the analysis, if any
+    def _get_snapshot_events(self):
+        path = snapshot.get_snapshot_store_path(self._args.path,
+                                                self._args.intersect_mode)
+        self._snapshot_store = snapshot.SnapshotStore(path)
+        begin_ts = self._analysis_conf.begin_ts
+
+        if begin_ts is None:
+            return self._traces.events
+
+        # timestamp_end is always None in older versions of babeltrace:
+        # check it before restoring the state of the automaton
+        if self._ts_end is None:
+            self._warn('Warning: Cannot find the time range of the trace: '
+                       'ignoring the snapshots')
+            return self._traces.events
+
+        ts = self._snapshot_store.find(begin_ts)
+
+        if ts is None:
+            return self._traces.events
+
+        self._snapshot_store.load(self._automaton, ts)
+
+        return self._traces.events_timestamps(ts, self._ts_end)
+
+    # Returns the events to process with --seek: babeltrace seeks each
+    # stream to the warm-up window preceding the beginning of the
+    # analysis using the packet indexes of the trace.
+    def _get_seek_events(self):
+        begin_ts = self._analysis_conf.begin_ts
+
+        if begin_ts is None:
+            return self._traces.events
+
+        # timestamp_end is always None in older versions of babeltrace
+        if self._ts_end is None:
+            self._warn('Warning: Cannot find the time range of the trace: '
+                       'ignoring --seek')
+            return self._traces.events
+
+        seek_ts = begin_ts - self._args.warmup
+
+        if self._ts_begin is not None and seek_ts <= self._ts_begin:
+            return self._traces.events
+
+        self._seek_ts = seek_ts
+
+        return self._traces.events_timestamps(seek_ts, self._ts_end)
+
+    def _report_incomplete_state(self):
+        proc_count = 0
+        fd_count = 0
+
+        for tid, proc in self._automaton.state.tids.items():
+            # ignore the swapper
+            if tid == 0:
+                continue
+
+            if proc.incomplete:
+                proc_count += 1
+
+            for fd_obj in proc.fds.values():
+                if fd_obj.incomplete:
+                    fd_count += 1
+
+        if proc_count == 0 and fd_count == 0:
+            return
+
+        time = format_utils.format_timestamp(self._seek_ts, print_date=True,
+                                             gmt=self._args.gmt)
+        self._warn('Warning: {} processes and {} file descriptors already '
+                   'existed before the warm-up window beginning at {}: '
+                   'their information might be incomplete (marked with '
+                   '"{}" in the results)'.format(
+                       proc_count, fd_count, time,
+                       self._INCOMPLETE_MARKER.strip()))
+
+    # Returns the `incomplete` attribute of `stats_obj` (stats.Process,
+    # io.FileStats) for an MI data object, or None if the analysis
+    # started from the beginning of the trace (no --seek).
+    def _get_incomplete_flag(self, stats_obj):
+        if self._seek_ts is None:
+            return None
+
+        return stats_obj.incomplete
+
+    # Returns the marker to append to the label of the MI data object
+    # `data_obj` (mi.Process, mi.Path) in text results.
+    def _get_incomplete_marker(self, data_obj):
+        if data_obj.incomplete:
+            return self._INCOMPLETE_MARKER
+
+        return ''
+
+    # Finds, once for all the event classes of the trace, the names of
+    # the events which the automaton or the analyses consume
+    # (self._event_names). The other events only matter for their
+    # timestamp.
+    #
+    # This also resolves the callbacks of the automaton for each event
+    # class of the trace before processing the events.
+    def _find_consumed_event_names(self):
+        analyses = self._get_analyses()
+        self._event_names = set()
+
+        for handle in self._handles.values():
+            for event_decl in handle.events:
+                name = event_decl.name
+
+                if self._automaton.consumes_event(name):
+                    self._event_names.add(name)
+                elif any(an.consumes_event(name) for an in analyses):
+                    self._event_names.add(name)
+
+    def _run_time_shards(self):
+        # timestamp_begin and timestamp_end are always None in older
+        # versions of babeltrace
+        if self._ts_begin is None or self._ts_end is None:
+            self._gen_error('Cannot find the time range of the trace')
+
+        conf = self._analysis_conf
+        begin_ts = conf.begin_ts
+        end_ts = conf.end_ts
+
+        if begin_ts is None:
+            begin_ts = self._ts_begin
+
+        if end_ts is None:
+            end_ts = self._ts_end
+
+        intersect_mode = self._get_intersect_mode_arg()
+        time_shards = time_utils.get_time_shards(begin_ts, end_ts,
+                                                 self._args.jobs)
+        shards = []
+
+        for index, (shard_begin_ts, shard_end_ts) in enumerate(time_shards):
+            shard_conf = copy.copy(conf)
+            read_begin_ts = None
+
+            # The first shard starts like a regular analysis; the other
+            # ones start after a warm-up window which only feeds the
+            # automaton.
+            if index > 0 or conf.begin_ts is not None:
+                shard_conf.begin_ts = shard_begin_ts
+                shard_conf.follows_time_shard = index > 0
+                read_begin_ts = max(shard_begin_ts - self._args.warmup,
+                                    self._ts_begin)
+
+            if index < len(time_shards) - 1:
+                shard_conf.end_ts = shard_end_ts
+
+            shards.append(parallel.TimeShard(
+                path=self._args.path, intersect_mode=intersect_mode,
+                tracer_version=self.state.tracer_version,
+                max_dead_tids=self.state.max_dead_tids,
+                analysis_class=self._ANALYSIS_CLASS, conf=shard_conf,
+                read_begin_ts=read_begin_ts, read_end_ts=shard_end_ts))
+
+        shard_results = parallel.run_time_shards(shards, self._args.jobs)
+        self._analysis.merge_shards(shard_results)
+
     def _print_date(self, begin_ns, end_ns):
         time_range_str = format_utils.format_time_range(
             begin_ns, end_ns, print_date=True, gmt=self._args.gmt
@@ -645,6 +1004,84 @@ Please consider using the --period option.''')
             self._cmdline_error('Cannot specify --period* and --refresh '
                                 'arguments at the same time')
 
+        if args.jobs < 1:
+            self._cmdline_error('Invalid number of jobs: {}'.format(
+                args.jobs))
+
+        if args.jobs > 1:
+            if not self._ANALYSIS_CLASS.MERGEABLE:
+                self._cmdline_error('This analysis does not support the '
+                                    '--jobs argument')
+
+            if args.refresh is not None or not \
+                    self._analysis_conf.period_def_registry.is_empty:
+                self._cmdline_error('Cannot specify --jobs and --period* or '
+                                    '--refresh arguments at the same time')
+
+            if args.decode_jobs > 1:
+                self._cmdline_error('Cannot specify --jobs and '
+                                    '--decode-jobs arguments at the same '
+                                    'time')
+
+            # worker processes do not report their progress
+            args.no_progress = True
+
+        if args.profile:
+            if args.jobs > 1:
+                self._cmdline_error('Cannot specify --jobs and --profile '
+                                    'arguments at the same time')
+
+            for table_class in profiler.TABLE_CLASSES:
+                self._mi_table_classes[table_class.name] = table_class
+
+        if args.jobs > 1 and args.cache:
+            self._cmdline_error('Cannot specify --jobs and --cache arguments '
+                                'at the same time')
+
+        if args.seek:
+            if args.jobs > 1 or args.decode_jobs > 1 or args.cache or \
+                    args.snapshots:
+                self._cmdline_error('Cannot specify --seek and --jobs, '
+                                    '--decode-jobs, --cache, or --snapshots '
+                                    'arguments at the same time')
+
+        if args.snapshots:
+            if args.jobs > 1 or args.decode_jobs > 1 or args.cache:
+                self._cmdline_error('Cannot specify --snapshots and --jobs, '
+                                    '--decode-jobs, or --cache arguments at '
+                                    'the same time')
+
+        try:
+            args.snapshot_interval = parse_utils.parse_duration(
+                args.snapshot_interval)
+        except ValueError as e:
+            self._cmdline_error(str(e))
+
+        if args.snapshot_interval <= 0:
+            self._cmdline_error('Invalid snapshot interval: {}'.format(
+                args.snapshot_interval))
+
+        if args.max_dead_tids < 0:
+            self._cmdline_error('Invalid maximum number of dead TIDs: '
+                                '{}'.format(args.max_dead_tids))
+
+        self.state.max_dead_tids = args.max_dead_tids
+
+        if args.decode_jobs < 1:
+            self._cmdline_error('Invalid number of decoding jobs: '
+                                '{}'.format(args.decode_jobs))
+
+        # the worker processes cannot compute the stream intersection
+        # like babeltrace does, from the packets of all the streams
+        if args.decode_jobs > 1 and args.intersect_mode:
+            self._cmdline_error('Cannot specify --decode-jobs without '
+                                '--no-intersection')
+
+        try:
+            args.warmup = parse_utils.parse_duration(args.warmup)
+        except ValueError as e:
+            self._cmdline_error(str(e))
+
         if args.cpu:
             self._analysis_conf.cpu_list = args.cpu.split(',')
             self._analysis_conf.cpu_list = [int(cpu) for cpu in
@@ -753,6 +1190,46 @@ Please consider using the --period option.''')
                              'variable)'.format(self._DEBUG_ENV_VAR))
         ap.add_argument('--no-color', action='store_false', dest='color',
                         help='Disable colored output')
+        ap.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Split the analyzed time range into this '
+                        'number of time shards and analyze them in '
+                        'parallel (default: 1)')
+        ap.add_argument('--warmup', type=str, default=self._DEFAULT_WARMUP,
+                        help='Duration of the trace replayed before a '
+                        'time shard, or before the beginning of the analysis '
+                        'with --seek, to rebuild the state, with optional '
+                        'units suffix (default: {})'.format(
+                            self._DEFAULT_WARMUP))
+        ap.add_argument('--decode-jobs', type=int, default=1,
+                        help='Decode groups of trace streams in this '
+                        'number of processes (default: 1)')
+        ap.add_argument('--profile', action='store_true',
+                        help='Measure the time spent decoding the trace and '
+                        'in each event handler, and report it after the '
+                        'analysis')
+        ap.add_argument('--cache', action='store_true',
+                        help='Replay the events from a cache of decoded '
+                        'events stored in the trace directory, creating it '
+                        'if needed')
+        ap.add_argument('--seek', action='store_true',
+                        help='Seek close to the beginning of the analysis '
+                        'using the packet indexes of the trace, replaying '
+                        'only the --warmup duration of the trace before it')
+        ap.add_argument('--snapshots', action='store_true',
+                        help='Save snapshots of the state while analyzing '
+                        'the trace, and start from the latest one before '
+                        'the beginning of the analysis if possible')
+        ap.add_argument('--max-dead-tids', type=int,
+                        default=automaton.DEFAULT_MAX_DEAD_TIDS,
+                        help='Maximum number of exited processes of which '
+                        'the TID, PID, and name are kept to label the '
+                        'results (default: {})'.format(
+                            automaton.DEFAULT_MAX_DEAD_TIDS))
+        ap.add_argument('--snapshot-interval', type=str,
+                        default=self._DEFAULT_SNAPSHOT_INTERVAL,
+                        help='Trace duration between two state snapshots, '
+                        'with optional units suffix (default: {})'.format(
+                            self._DEFAULT_SNAPSHOT_INTERVAL))
 
         # MI mode-dependent arguments
         if self._mi_mode:
@@ -829,6 +1306,10 @@ Please consider using the --period option.''')
             help = 'Output the events in chronological order'
 
         ap.add_argument('--log', action='store_true', help=help)
+        ap.add_argument('--stream-log', action='store_true',
+                        help='Output the log rows one at a time as they are '
+                        'created instead of keeping them (one JSON object '
+                        'per line in MI mode)')
 
     @staticmethod
     def _add_top_args(ap, help=None):
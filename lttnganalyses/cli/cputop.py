@@ -125,7 +125,8 @@ class Cputop(Command):
             prio_list = format_utils.format_prio_list(tid.prio_list)
 
             result_table.append_row(
-                process=mi.Process(tid.comm, tid=tid.tid),
+                process=mi.Process(tid.comm, tid=tid.tid,
+                                   incomplete=self._get_incomplete_flag(tid)),
                 migrations=mi.Number(tid.migrate_count),
                 prio_list=mi.String(prio_list),
                 usage=mi.Ratio.from_percentage(tid.usage_percent)
@@ -181,7 +182,8 @@ class Cputop(Command):
 
         def format_label(row):
             return row_format.format(
-                '%s (%d)' % (row.process.name, row.process.tid),
+                '%s (%d)%s' % (row.process.name, row.process.tid,
+                                self._get_incomplete_marker(row.process)),
                 row.migrations.value,
                 row.prio_list.value,
             )
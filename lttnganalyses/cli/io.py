@@ -28,9 +28,10 @@ import statistics
 import sys
 from . import mi
 from . import termgraph
-from ..core import io
+from ..core import io, stats
 from ..common import format_utils
 from .command import Command
+from ..linuxautomaton import sv
 
 
 _UsageTables = collections.namedtuple('_UsageTables', [
@@ -282,24 +283,53 @@ class IoAnalysisCommand(Command):
             end and begin > self._analysis_conf.end_ts
         )
 
-    def _filter_io_request(self, io_rq):
-        return self._filter_size(io_rq.size) and \
-            self._filter_latency(io_rq.duration) and \
-            self._filter_time_range(io_rq.begin_ts, io_rq.end_ts)
+    def _filter_io_requests(self, requests, rq_ids):
+        """Filter the ids of I/O requests.
 
-    def _is_io_rq_out_of_range(self, io_rq):
+        Args:
+            requests (ColumnStore): column store of the requests.
+
+            rq_ids (iterable): ids of the requests to filter.
+
+        Returns:
+            The list of the ids of the requests which pass the size,
+            latency and time range filters.
+        """
+        begin_ts = requests.column('begin_ts')
+        durations = requests.column('duration')
+
+        return [
+            rq_id for rq_id in rq_ids if
+            self._filter_size(requests.get(rq_id, 'size')) and
+            self._filter_latency(durations[rq_id]) and
+            self._filter_time_range(begin_ts[rq_id],
+                                    begin_ts[rq_id] + durations[rq_id])
+        ]
+
+    def _get_io_request_durations(self, io_requests):
+        durations = []
+
+        for io_stats, rq_ids in io_requests:
+            column = io_stats.requests.column('duration')
+            rq_ids = self._filter_io_requests(io_stats.requests, rq_ids)
+            durations += [column[rq_id] for rq_id in rq_ids]
+
+        return durations
+
+    def _is_io_rq_out_of_range(self, begin_ts, end_ts):
         return (
             self._analysis_conf.begin_ts and
-            io_rq.begin_ts < self._analysis_conf.begin_ts or
+            begin_ts < self._analysis_conf.begin_ts or
             self._analysis_conf.end_ts and
-            io_rq.end_ts > self._analysis_conf.end_ts
+            end_ts > self._analysis_conf.end_ts
         )
 
     def _append_per_proc_read_usage_row(self, period_data, proc_stats,
                                         result_table):
         result_table.append_row(
-            process=mi.Process(proc_stats.comm, pid=proc_stats.pid,
-                               tid=proc_stats.tid),
+            process=mi.Process(
+                proc_stats.comm, pid=proc_stats.pid, tid=proc_stats.tid,
+                incomplete=self._get_incomplete_flag(proc_stats)),
             size=mi.Size(proc_stats.total_read),
             disk_size=mi.Size(proc_stats.disk_io.read),
             net_size=mi.Size(proc_stats.net_io.read),
@@ -311,8 +341,9 @@ class IoAnalysisCommand(Command):
     def _append_per_proc_write_usage_row(self, period_data, proc_stats,
                                          result_table):
         result_table.append_row(
-            process=mi.Process(proc_stats.comm, pid=proc_stats.pid,
-                               tid=proc_stats.tid),
+            process=mi.Process(
+                proc_stats.comm, pid=proc_stats.pid, tid=proc_stats.tid,
+                incomplete=self._get_incomplete_flag(proc_stats)),
             size=mi.Size(proc_stats.total_write),
             disk_size=mi.Size(proc_stats.disk_io.write),
             net_size=mi.Size(proc_stats.net_io.write),
@@ -332,8 +363,9 @@ class IoAnalysisCommand(Command):
             proc_name = None
 
         result_table.append_row(
-            process=mi.Process(proc_name, pid=proc_stats.pid,
-                               tid=proc_stats.tid),
+            process=mi.Process(
+                proc_name, pid=proc_stats.pid, tid=proc_stats.tid,
+                incomplete=self._get_incomplete_flag(proc_stats)),
             size=mi.Size(proc_stats.block_io.read),
         )
 
@@ -350,8 +382,9 @@ class IoAnalysisCommand(Command):
             proc_name = None
 
         result_table.append_row(
-            process=mi.Process(proc_name, pid=proc_stats.pid,
-                               tid=proc_stats.tid),
+            process=mi.Process(
+                proc_name, pid=proc_stats.pid, tid=proc_stats.tid,
+                incomplete=self._get_incomplete_flag(proc_stats)),
             size=mi.Size(proc_stats.block_io.write),
         )
 
@@ -428,7 +461,8 @@ class IoAnalysisCommand(Command):
 
         fd_owners = self._get_file_stats_fd_owners_str(period_data, file_stats)
         result_table.append_row(
-            path=mi.Path(file_stats.filename),
+            path=mi.Path(file_stats.filename,
+                         self._get_incomplete_flag(file_stats)),
             size=mi.Size(file_stats.io.read),
             fd_owners=mi.String(fd_owners),
         )
@@ -442,7 +476,8 @@ class IoAnalysisCommand(Command):
 
         fd_owners = self._get_file_stats_fd_owners_str(period_data, file_stats)
         result_table.append_row(
-            path=mi.Path(file_stats.filename),
+            path=mi.Path(file_stats.filename,
+                         self._get_incomplete_flag(file_stats)),
             size=mi.Size(file_stats.io.write),
             fd_owners=mi.String(fd_owners),
         )
@@ -637,7 +672,8 @@ class IoAnalysisCommand(Command):
                 pid_str = str(row.process.pid)
 
             label = label_format.format(
-                '%s (%s)' % (row.process.name, pid_str),
+                '%s (%s)%s' % (row.process.name, pid_str,
+                                self._get_incomplete_marker(row.process)),
                 format_utils.format_size(row.disk_size.value),
                 format_utils.format_size(row.net_size.value),
                 format_utils.format_size(row.unknown_size.value)
@@ -668,7 +704,8 @@ class IoAnalysisCommand(Command):
             else:
                 pid_str = str(row.process.pid)
 
-            return '{} (pid={})'.format(proc_name, pid_str)
+            return '{} (pid={}){}'.format(
+                proc_name, pid_str, self._get_incomplete_marker(row.process))
 
         graph = termgraph.BarGraph(
             title='Block I/O ' + title,
@@ -732,12 +769,15 @@ class IoAnalysisCommand(Command):
     def _print_per_file_io(self, result_table, title):
         # FIXME add option to show FD owners
         # FIXME why are read and write values the same?
+        def get_label(row):
+            return row.path.path + self._get_incomplete_marker(row.path)
+
         graph = termgraph.BarGraph(
             title='Per-file I/O ' + title,
             label_header='Path',
             get_value=lambda row: row.size.value,
             get_value_str=format_utils.format_size,
-            get_label=lambda row: row.path.path,
+            get_label=get_label,
             data=result_table.rows
         )
 
@@ -800,8 +840,8 @@ class IoAnalysisCommand(Command):
         result_tables = []
 
         for disk in period_data.disks.values():
-            rq_durations = [rq.duration for rq in disk.rq_list if
-                            self._filter_io_request(rq)]
+            rq_durations = self._get_io_request_durations(
+                [(disk, range(len(disk.requests)))])
             subtitle = 'disk: {}'.format(disk.diskname)
             result_table = \
                 self._mi_create_result_table(self._MI_TABLE_CLASS_FREQ,
@@ -825,21 +865,17 @@ class IoAnalysisCommand(Command):
             self._mi_create_result_table(self._MI_TABLE_CLASS_FREQ,
                                          begin, end, 'sync')
         self._fill_freq_result_table(
-            [io_rq.duration for io_rq in
-             self._analysis.open_io_requests(period_data)
-             if self._filter_io_request(io_rq)], open_table)
+            self._get_io_request_durations(
+                self._analysis.open_io_requests(period_data)), open_table)
         self._fill_freq_result_table(
-            [io_rq.duration for io_rq in
-             self._analysis.read_io_requests(period_data)
-             if self._filter_io_request(io_rq)], read_table)
+            self._get_io_request_durations(
+                self._analysis.read_io_requests(period_data)), read_table)
         self._fill_freq_result_table(
-            [io_rq.duration for io_rq in
-             self._analysis.write_io_requests(period_data)
-             if self._filter_io_request(io_rq)], write_table)
+            self._get_io_request_durations(
+                self._analysis.write_io_requests(period_data)), write_table)
         self._fill_freq_result_table(
-            [io_rq.duration for io_rq in
-             self._analysis.sync_io_requests(period_data)
-             if self._filter_io_request(io_rq)], sync_table)
+            self._get_io_request_durations(
+                self._analysis.sync_io_requests(period_data)), sync_table)
 
         return [open_table, read_table, write_table, sync_table]
 
@@ -866,67 +902,103 @@ class IoAnalysisCommand(Command):
         for freq_table in freq_tables:
             self._print_one_freq(freq_table)
 
-    def _append_log_row(self, period_data, io_rq, result_table):
-        if io_rq.size is None:
+    # `io_rq` is a row of the `requests` column store of `proc_stats`
+    def _get_log_row(self, period_data, proc_stats, io_rq):
+        begin_ts = io_rq['begin_ts']
+        end_ts = begin_ts + io_rq['duration']
+
+        if io_rq['size'] is None:
             size = mi.Empty()
         else:
-            size = mi.Size(io_rq.size)
+            size = mi.Size(io_rq['size'])
 
-        tid = io_rq.tid
-        proc_stats = period_data.tids[tid]
+        tid = proc_stats.tid
         proc_name = proc_stats.comm
 
         # TODO: handle fd_in/fd_out for RW type operations
-        if io_rq.fd is None:
+        if io_rq['fd'] is None:
             path = mi.Empty()
             fd = mi.Empty()
         else:
-            fd = mi.Fd(io_rq.fd)
+            fd = mi.Fd(io_rq['fd'])
             parent_proc = proc_stats
 
             if parent_proc.pid is not None:
                 parent_proc = period_data.tids[parent_proc.pid]
 
-            fd_stats = parent_proc.get_fd(io_rq.fd, io_rq.end_ts)
+            fd_stats = parent_proc.get_fd(io_rq['fd'], end_ts)
 
             if fd_stats is not None:
                 path = mi.Path(fd_stats.filename)
             else:
                 path = mi.Unknown()
 
-        result_table.append_row(
-            time_range=mi.TimeRange(io_rq.begin_ts, io_rq.end_ts),
-            out_of_range=mi.Boolean(self._is_io_rq_out_of_range(io_rq)),
-            duration=mi.Duration(io_rq.duration),
-            syscall=mi.Syscall(io_rq.syscall_name),
+        return dict(
+            time_range=mi.TimeRange(begin_ts, end_ts),
+            out_of_range=mi.Boolean(self._is_io_rq_out_of_range(begin_ts,
+                                                                end_ts)),
+            duration=mi.Duration(io_rq['duration']),
+            syscall=mi.Syscall(io_rq['syscall_name']),
             size=size,
             process=mi.Process(proc_name, tid=tid),
             path=path,
             fd=fd,
         )
 
-    def _fill_log_result_table(self, period_data, rq_list, sort_key, is_top,
-                               result_table):
-        if not rq_list:
-            return
-
-        count = 0
-
-        for io_rq in sorted(rq_list, key=operator.attrgetter(sort_key),
-                            reverse=is_top):
-            if is_top and count > self._args.limit:
-                break
-
-            self._append_log_row(period_data, io_rq, result_table)
-            count += 1
-
-    def _fill_log_result_table_from_io_requests(self, period_data, io_requests,
-                                                sort_key, is_top,
-                                                result_table):
-        io_requests = [io_rq for io_rq in io_requests if
-                       self._filter_io_request(io_rq)]
-        self._fill_log_result_table(period_data, io_requests, sort_key, is_top,
-                                    result_table)
+    # Generates the (key, proc_stats, rq_id) tuples of the requests
+    # which pass the filters, the key being the value of their
+    # `sort_key` column.
+    def _get_sort_keyed_io_requests(self, io_requests, sort_key):
+        for proc_stats, rq_ids in io_requests:
+            keys = proc_stats.requests.column(sort_key)
+
+            for rq_id in self._filter_io_requests(proc_stats.requests,
+                                                  rq_ids):
+                yield keys[rq_id], proc_stats, rq_id
+
+    # Returns the (proc_stats, io_rq) tuples of the requests of
+    # operation `io_operation`, generated by `io_requests`, with the
+    # greatest durations, the greatest first.
+    #
+    # When the top report is the only one, the analysis tracks them as
+    # the requests arrive. Otherwise, only the rows of the requests
+    # which end up in the table are materialized: the requests are
+    # selected using the columns of their stores.
+    def _get_top_io_requests(self, period_data, io_requests, io_operation):
+        top_io_requests = self._analysis.top_io_requests(period_data,
+                                                         io_operation)
+
+        if top_io_requests is not None:
+            return top_io_requests
+
+        # Bounded heap instead of a sort of all the requests. The top
+        # tables have one more row than the limit.
+        top_requests = stats.TopK(self._args.limit + 1)
+
+        for key, proc_stats, rq_id in self._get_sort_keyed_io_requests(
+                io_requests, 'duration'):
+            top_requests.update(key, (proc_stats, rq_id))
+
+        return [(proc_stats, proc_stats.requests.row(rq_id))
+                for proc_stats, rq_id in top_requests.items()]
+
+    def _fill_top_result_table(self, period_data, io_requests,
+                               io_operation, result_table):
+        top_io_requests = self._get_top_io_requests(period_data, io_requests,
+                                                    io_operation)
+
+        for proc_stats, io_rq in top_io_requests:
+            result_table.append_row(**self._get_log_row(period_data,
+                                                        proc_stats, io_rq))
+
+    def _gen_log_rows(self, period_data, io_requests):
+        keyed_requests = self._get_sort_keyed_io_requests(io_requests,
+                                                          'begin_ts')
+
+        for _, proc_stats, rq_id in sorted(keyed_requests,
+                                           key=operator.itemgetter(0)):
+            yield self._get_log_row(period_data, proc_stats,
+                                    proc_stats.requests.row(rq_id))
 
     def _get_top_result_tables(self, period_data, begin, end):
         open_table = \
@@ -941,18 +1013,18 @@ class IoAnalysisCommand(Command):
         sync_table = \
             self._mi_create_result_table(self._MI_TABLE_CLASS_TOP_SYSCALL,
                                          begin, end, 'sync')
-        self._fill_log_result_table_from_io_requests(
+        self._fill_top_result_table(
             period_data, self._analysis.open_io_requests(period_data),
-            'duration', True, open_table)
-        self._fill_log_result_table_from_io_requests(
+            sv.IORequest.OP_OPEN, open_table)
+        self._fill_top_result_table(
             period_data, self._analysis.read_io_requests(period_data),
-            'duration', True, read_table)
-        self._fill_log_result_table_from_io_requests(
+            sv.IORequest.OP_READ, read_table)
+        self._fill_top_result_table(
             period_data, self._analysis.write_io_requests(period_data),
-            'duration', True, write_table)
-        self._fill_log_result_table_from_io_requests(
+            sv.IORequest.OP_WRITE, write_table)
+        self._fill_top_result_table(
             period_data, self._analysis.sync_io_requests(period_data),
-            'duration', True, sync_table)
+            sv.IORequest.OP_SYNC, sync_table)
 
         return [open_table, read_table, write_table, sync_table]
 
@@ -995,7 +1067,7 @@ class IoAnalysisCommand(Command):
                          size, proc_name, tid, file_str))
 
     def _print_log(self, result_table):
-        if not result_table.rows:
+        if result_table.is_empty:
             return
 
         has_out_of_range_rq = False
@@ -1023,13 +1095,10 @@ class IoAnalysisCommand(Command):
             self._print_log(table)
 
     def _get_log_result_table(self, period_data, begin, end):
-        log_table = self._mi_create_result_table(self._MI_TABLE_CLASS_LOG,
-                                                 begin, end)
-        self._fill_log_result_table_from_io_requests(
-            period_data, self._analysis.io_requests(period_data),
-            'begin_ts', False, log_table)
-
-        return log_table
+        return self._create_log_result_table(
+            self._MI_TABLE_CLASS_LOG, begin, end,
+            self._gen_log_rows(period_data,
+                               self._analysis.io_requests(period_data)))
 
     def _append_latency_stats_row(self, obj, rq_durations, result_table):
         rq_count = len(rq_durations)
@@ -1063,8 +1132,7 @@ class IoAnalysisCommand(Command):
 
     def _append_latency_stats_row_from_requests(self, obj, io_requests,
                                                 result_table):
-        rq_durations = [io_rq.duration for io_rq in io_requests if
-                        self._filter_io_request(io_rq)]
+        rq_durations = self._get_io_request_durations(io_requests)
         self._append_latency_stats_row(obj, rq_durations, result_table)
 
     def _get_syscall_latency_stats_result_table(self, period_data, begin, end):
@@ -1091,8 +1159,8 @@ class IoAnalysisCommand(Command):
 
         for disk in period_data.disks.values():
             if disk.rq_count:
-                rq_durations = [rq.duration for rq in disk.rq_list if
-                                self._filter_io_request(rq)]
+                rq_durations = self._get_io_request_durations(
+                    [(disk, range(len(disk.requests)))])
                 disk = mi.Disk(disk.diskname)
                 self._append_latency_stats_row(disk, rq_durations,
                                                result_table)
@@ -1147,6 +1215,19 @@ class IoAnalysisCommand(Command):
         self._print_syscall_latency_stats(syscall_latency_stats_table)
         self._print_disk_latency_stats(disk_latency_stats_table)
 
+    def _validate_transform_args(self):
+        args = self._args
+
+        # When the top report is the only one, the analysis tracks the
+        # requests with the greatest durations as they arrive instead
+        # of keeping all of them.
+        if args.top and not (args.log or args.stats or args.freq or
+                             args.usage):
+            self._analysis_conf.keep_events = False
+            self._analysis_conf.top_limit = args.limit
+            self._analysis_conf.min_size = args.minsize
+            self._analysis_conf.max_size = args.maxsize
+
     def _add_arguments(self, ap):
         Command._add_min_max_args(ap)
         Command._add_log_args(
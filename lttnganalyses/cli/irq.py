@@ -24,7 +24,6 @@
 
 import itertools
 import math
-import statistics
 import sys
 from . import mi
 from . import termgraph
@@ -170,10 +169,7 @@ class IrqAnalysisCommand(Command):
         self._mi_clear_result_tables()
         self._mi_append_result_table(summary_table)
 
-    def _get_log_result_table(self, period_data, begin_ns, end_ns):
-        result_table = self._mi_create_result_table(self._MI_TABLE_CLASS_LOG,
-                                                    begin_ns, end_ns)
-
+    def _gen_log_rows(self, period_data):
         for irq in period_data.irq_list:
             if not self._filter_irq(irq):
                 continue
@@ -192,17 +188,20 @@ class IrqAnalysisCommand(Command):
 
                 name = period_data.softirq_stats[irq.id].name
 
-            result_table.append_row(
+            yield dict(
                 time_range=mi.TimeRange(irq.begin_ts, irq.end_ts),
                 raised_ts=raised_ts_do,
                 cpu=mi.Cpu(irq.cpu_id),
                 irq=mi.Irq(is_hard, irq.id, name),
             )
 
-        return result_table
+    def _get_log_result_table(self, period_data, begin_ns, end_ns):
+        return self._create_log_result_table(self._MI_TABLE_CLASS_LOG,
+                                             begin_ns, end_ns,
+                                             self._gen_log_rows(period_data))
 
     def _get_common_stats_result_table_row(self, is_hard, irq_nr, irq_stats):
-        stdev = self._compute_duration_stdev(irq_stats)
+        stdev = irq_stats.duration_stats.stdev
 
         if math.isnan(stdev):
             stdev = mi.Unknown()
@@ -246,7 +245,7 @@ class IrqAnalysisCommand(Command):
             avg_latency = irq_stats.total_raise_latency / irq_stats.raise_count
             avg_latency = mi.Duration(avg_latency)
             max_latency = mi.Duration(irq_stats.max_raise_latency)
-            stdev = self._compute_raise_latency_stdev(irq_stats)
+            stdev = irq_stats.raise_latency_stats.stdev
 
             if math.isnan(stdev):
                 stdev_latency = mi.Unknown()
@@ -286,7 +285,16 @@ class IrqAnalysisCommand(Command):
         # histogram's step
         if self._args.freq_uniform:
             # TODO: perform only one time
-            durations = [irq.duration for irq in period_data.irq_list]
+            # only the extreme durations of all the interrupts matter
+            durations = []
+
+            for all_irq_stats in (period_data.hard_irq_stats,
+                                  period_data.softirq_stats):
+                for other_irq_stats in all_irq_stats.values():
+                    if other_irq_stats.count > 0:
+                        durations += [other_irq_stats.min_duration,
+                                      other_irq_stats.max_duration]
+
             min_duration, max_duration, step = \
                 self._find_uniform_freq_values(durations)
         else:
@@ -302,19 +310,19 @@ class IrqAnalysisCommand(Command):
             buckets.append(i * step)
             counts.append(0)
 
-        for irq in irq_stats.irq_list:
-            duration = irq.duration / 1000
+        for duration, count in self._get_duration_counts(irq_stats):
+            duration /= 1000
             index = int((duration - min_duration) / step)
 
             if index >= resolution:
                 # special case for max value: put in last bucket (includes
                 # its upper bound)
                 if duration == max_duration:
-                    counts[index - 1] += 1
+                    counts[index - 1] += count
 
                 continue
 
-            counts[index] += 1
+            counts[index] += count
 
         for index, count in enumerate(counts):
             lower_bound = index * step + min_duration
@@ -325,6 +333,20 @@ class IrqAnalysisCommand(Command):
                 count=mi.Number(count),
             )
 
+    # Returns the (duration, count) pairs of the interrupts of
+    # `irq_stats`: each interrupt if the analysis keeps events,
+    # otherwise the buckets of the duration histogram, within the exact
+    # minimum and maximum durations.
+    def _get_duration_counts(self, irq_stats):
+        if self._analysis_conf.keep_events:
+            return [(irq.duration, 1) for irq in irq_stats.irq_list]
+
+        duration_stats = irq_stats.duration_stats
+
+        return [(min(max(duration, duration_stats.min), duration_stats.max),
+                 count)
+                for duration, count in duration_stats.histogram.items()]
+
     def _fill_stats_freq_result_tables(self, period_data, begin_ns,
                                        end_ns, is_hard,
                                        analysis_stats, filter_list,
@@ -472,28 +494,9 @@ class IrqAnalysisCommand(Command):
         if args.softirq:
             args.softirq_filter_list = args.softirq.split(',')
 
-    def _compute_duration_stdev(self, irq_stats_item):
-        if irq_stats_item.count < 2:
-            return float('nan')
-
-        durations = []
-        for irq in irq_stats_item.irq_list:
-            durations.append(irq.end_ts - irq.begin_ts)
-
-        return statistics.stdev(durations)
-
-    def _compute_raise_latency_stdev(self, irq_stats_item):
-        if irq_stats_item.raise_count < 2:
-            return float('nan')
-
-        raise_latencies = []
-        for irq in irq_stats_item.irq_list:
-            if irq.raise_ts is None:
-                continue
-
-            raise_latencies.append(irq.begin_ts - irq.raise_ts)
-
-        return statistics.stdev(raise_latencies)
+        # only the log needs each interrupt, the statistics and the
+        # frequency distributions use constant memory without them
+        self._analysis_conf.keep_events = args.log
 
     def _print_frequency_distribution(self, freq_table):
         title_fmt = 'Handler duration frequency distribution {}'
@@ -123,7 +123,8 @@ class Memtop(Command):
                           key=operator.attrgetter(attr),
                           reverse=True):
             result_table.append_row(
-                process=mi.Process(tid.comm, tid=tid.tid),
+                process=mi.Process(tid.comm, tid=tid.tid,
+                                   incomplete=self._get_incomplete_flag(tid)),
                 pages=mi.Number(getattr(tid, attr)),
             )
             count += 1
@@ -167,8 +168,9 @@ class Memtop(Command):
             title=title,
             unit='pages',
             get_value=lambda row: row.pages.value,
-            get_label=lambda row: '%s (%d)' % (row.process.name,
-                                               row.process.tid),
+            get_label=lambda row: '%s (%d)%s' % (
+                row.process.name, row.process.tid,
+                self._get_incomplete_marker(row.process)),
             label_header='Process',
             data=result_table.rows
         )
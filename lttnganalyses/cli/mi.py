@@ -21,6 +21,8 @@
 # SOFTWARE.
 
 from collections import namedtuple
+import itertools
+import json
 import sys
 
 
@@ -152,6 +154,10 @@ class ResultTable:
     def rows(self):
         return self._rows
 
+    @property
+    def is_empty(self):
+        return not self._rows
+
     def to_native_object(self):
         obj = {
             'class': self._table_class.name,
@@ -170,17 +176,58 @@ class ResultTable:
             obj['class'] = self._table_class.to_native_object()
 
         for row in self._rows:
-            row_obj = []
-
-            for cell in row:
-                row_obj.append(cell.to_native_object())
-
-            row_objs.append(row_obj)
+            row_objs.append(self._row_to_native_object(row))
 
         obj['data'] = row_objs
 
         return obj
 
+    @staticmethod
+    def _row_to_native_object(row):
+        return [cell.to_native_object() for cell in row]
+
+
+# Result table of which the rows are not kept: `gen_rows` is an
+# iterable of dicts of column values, and each row is created from it
+# as the `rows` attribute is iterated, which can only happen once.
+class StreamedResultTable(ResultTable):
+    def __init__(self, table_class, begin, end, gen_rows, subtitle=None):
+        super().__init__(table_class, begin, end, subtitle)
+        self._gen_rows = iter(gen_rows)
+        # first row, generated ahead by is_empty
+        self._peeked_rows = []
+
+    def append_row(self, **kwargs):
+        raise TypeError('Cannot append a row to a streamed result table')
+
+    def append_row_tuple(self, row_tuple):
+        raise TypeError('Cannot append a row to a streamed result table')
+
+    @property
+    def rows(self):
+        gen_rows = itertools.chain(self._peeked_rows, self._gen_rows)
+        self._peeked_rows = []
+
+        return (self._column_named_tuple(**row) for row in gen_rows)
+
+    # Generates the first row, if not already done, without consuming
+    # it.
+    @property
+    def is_empty(self):
+        if not self._peeked_rows:
+            self._peeked_rows = list(itertools.islice(self._gen_rows, 1))
+
+        return not self._peeked_rows
+
+    # Generates, for each row, the native object of a result table
+    # containing only this row.
+    def gen_native_objects(self):
+        obj = self.to_native_object()
+
+        for row in self.rows:
+            obj['data'] = [self._row_to_native_object(row)]
+            yield obj
+
 
 class _DataObject:
     def to_native_object(self):
@@ -394,10 +441,13 @@ class Syscall(_SimpleName):
 class Process(_DataObject):
     CLASS = 'process'
 
-    def __init__(self, name=None, pid=None, tid=None):
+    # `incomplete` is None when unknown, or whether the process existed
+    # before the analyzed events without any event describing it
+    def __init__(self, name=None, pid=None, tid=None, incomplete=None):
         self._name = name
         self._pid = pid
         self._tid = tid
+        self._incomplete = incomplete
 
     @property
     def name(self):
@@ -411,6 +461,10 @@ class Process(_DataObject):
     def tid(self):
         return self._tid
 
+    @property
+    def incomplete(self):
+        return self._incomplete
+
     def _to_native_object(self):
         ret_dict = {}
 
@@ -423,11 +477,14 @@ class Process(_DataObject):
         if self._tid is not None:
             ret_dict['tid'] = self._tid
 
+        if self._incomplete is not None:
+            ret_dict['incomplete'] = self._incomplete
+
         return ret_dict
 
     def _eq(self, other):
-        self_tuple = (self.name, self.pid, self.tid)
-        other_tuple = (other.name, other.pid, other.tid)
+        self_tuple = (self.name, self.pid, self.tid, self.incomplete)
+        other_tuple = (other.name, other.pid, other.tid, other.incomplete)
 
         return self_tuple == other_tuple
 
@@ -435,18 +492,31 @@ class Process(_DataObject):
 class Path(_DataObject):
     CLASS = 'path'
 
-    def __init__(self, path):
+    # `incomplete` is None when unknown, or whether a file descriptor
+    # of this path was opened before the analyzed events without any
+    # event describing it
+    def __init__(self, path, incomplete=None):
         self._path = path
+        self._incomplete = incomplete
 
     @property
     def path(self):
         return self._path
 
+    @property
+    def incomplete(self):
+        return self._incomplete
+
     def _to_native_object(self):
-        return {'path': self._path}
+        ret_dict = {'path': self._path}
+
+        if self._incomplete is not None:
+            ret_dict['incomplete'] = self._incomplete
+
+        return ret_dict
 
     def _eq(self, other):
-        return self.path == other.path
+        return (self.path, self.incomplete) == (other.path, other.incomplete)
 
 
 class Fd(_DataObject):
@@ -584,3 +654,12 @@ def get_version_string():
 def print_progress(at=None, msg=None):
     print(get_progress(at, msg))
     sys.stdout.flush()
+
+
+# Prints each row of a streamed result table right away, as a result
+# table of a single row on its own line (NDJSON).
+def print_streamed_result_table(result_table):
+    for obj in result_table.gen_native_objects():
+        print(json.dumps(obj))
+
+    sys.stdout.flush()
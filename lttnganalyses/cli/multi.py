@@ -0,0 +1,198 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import argparse
+import collections
+import copy
+import json
+from . import mi
+from . import cputop, io, irq, memtop, sched, syscallstats
+from .command import Command
+from ..core import analysis
+
+
+_SubAnalysis = collections.namedtuple('_SubAnalysis', [
+    'cmd_class',
+    'mode_args',
+])
+
+
+# Each sub-analysis is the command of the same name, run with the
+# given mode arguments.
+_SUB_ANALYSES = collections.OrderedDict([
+    ('cputop', _SubAnalysis(cputop.Cputop, {})),
+    ('iousagetop', _SubAnalysis(io.IoAnalysisCommand, {'usage': True})),
+    ('iolatencystats', _SubAnalysis(io.IoAnalysisCommand, {'stats': True})),
+    ('irqstats', _SubAnalysis(irq.IrqAnalysisCommand, {'stats': True})),
+    ('schedstats', _SubAnalysis(sched.SchedAnalysisCommand,
+                                {'stats': True})),
+    ('memtop', _SubAnalysis(memtop.Memtop, {})),
+    ('syscallstats', _SubAnalysis(syscallstats.SyscallsAnalysis, {})),
+])
+
+
+# Returns the default values of the specific arguments of the command
+# `cmd`, by parsing an empty command line with a parser of those
+# arguments only.
+def _get_default_args(cmd):
+    ap = argparse.ArgumentParser()
+    cmd._add_arguments(ap)
+
+    return vars(ap.parse_args([]))
+
+
+class MultiAnalysisCommand(Command):
+    _DESC = """The multi-analysis command."""
+    _ANALYSIS_CLASS = analysis.Analysis
+    _MI_TITLE = 'Multiple analyses'
+    _MI_DESCRIPTION = 'Several analyses performed in a single pass over ' + \
+                      'the trace'
+    _MI_TAGS = [mi.Tags.CPU, mi.Tags.MEMORY, mi.Tags.INTERRUPT,
+                mi.Tags.SCHED, mi.Tags.SYSCALL, mi.Tags.IO, mi.Tags.TOP,
+                mi.Tags.STATS]
+    _MI_TABLE_CLASSES = []
+
+    def __init__(self, mi_mode=False):
+        self._sub_cmds = []
+        self._mi_results = []
+        super().__init__(mi_mode=mi_mode)
+
+    @staticmethod
+    def _create_mi_table_classes(name, cmd_class):
+        # Table class names are prefixed with the name of the
+        # sub-analysis since different commands reuse the same names.
+        table_classes = {}
+
+        for tc_tuple in cmd_class._MI_TABLE_CLASSES:
+            full_name = '{}.{}'.format(name, tc_tuple[0])
+            table_classes[tc_tuple[0]] = mi.TableClass(full_name, tc_tuple[1],
+                                                       tc_tuple[2])
+
+        return table_classes
+
+    def _mi_setup(self):
+        self._mi_table_classes = {}
+
+        for name, sub_analysis in _SUB_ANALYSES.items():
+            table_classes = self._create_mi_table_classes(
+                name, sub_analysis.cmd_class)
+
+            for table_class in table_classes.values():
+                self._mi_table_classes[table_class.name] = table_class
+
+        self._mi_clear_result_tables()
+
+    def _create_sub_cmd(self, name):
+        sub_analysis = _SUB_ANALYSES[name]
+        sub_cmd = sub_analysis.cmd_class(mi_mode=self._mi_mode)
+        args = copy.copy(self._args)
+
+        # the arguments of the sub-command which the multi-analysis
+        # command does not accept (mode arguments, for example)
+        for arg_name, value in _get_default_args(sub_cmd).items():
+            if not hasattr(args, arg_name):
+                setattr(args, arg_name, value)
+
+        for arg_name, value in sub_analysis.mode_args.items():
+            setattr(args, arg_name, value)
+
+        # share the trace, the state, and the configuration
+        sub_cmd._args = args
+        sub_cmd._analysis_conf = copy.deepcopy(self._analysis_conf)
+        sub_cmd._automaton = self._automaton
+        sub_cmd.state = self.state
+        sub_cmd._handles = self._handles
+        sub_cmd._traces = self._traces
+        sub_cmd._ts_begin = self._ts_begin
+        sub_cmd._ts_end = self._ts_end
+        sub_cmd._bt_intersect_mode_supported = \
+            self._bt_intersect_mode_supported
+        sub_cmd._mi_table_classes = self._create_mi_table_classes(
+            name, sub_analysis.cmd_class)
+        sub_cmd._mi_results_sink = self._mi_results
+        sub_cmd._validate_transform_args()
+        sub_cmd._create_analysis()
+
+        return sub_cmd
+
+    def _create_analysis(self):
+        for name in self._args.analyses:
+            self._sub_cmds.append(self._create_sub_cmd(name))
+
+    def _get_analyses(self):
+        return [sub_cmd._analysis for sub_cmd in self._sub_cmds]
+
+    def _post_analysis(self):
+        for sub_cmd in self._sub_cmds:
+            sub_cmd._post_analysis()
+
+        if self._mi_mode:
+            print(json.dumps({
+                'results': self._mi_results + self._mi_get_results(),
+            }))
+
+    def _validate_transform_args(self):
+        args = self._args
+        names = [name.strip() for name in args.analyses.split(',')]
+        args.analyses = []
+
+        for name in names:
+            if name not in _SUB_ANALYSES:
+                self._cmdline_error('Unknown analysis "{}" (available: '
+                                    '{})'.format(name,
+                                                 ', '.join(_SUB_ANALYSES)))
+
+            if name not in args.analyses:
+                args.analyses.append(name)
+
+    def _add_arguments(self, ap):
+        ap.add_argument('--analyses', type=str,
+                        default=','.join(_SUB_ANALYSES),
+                        help='Comma-separated list of analyses to perform '
+                        '(default: {})'.format(','.join(_SUB_ANALYSES)))
+        Command._add_proc_filter_args(ap)
+        Command._add_min_max_args(ap)
+        ap.add_argument('--limit', type=int, default=10,
+                        help='Limit to top X (default = 10)')
+        ap.add_argument('--minsize', type=float,
+                        help='Filter out, I/O operations working with '
+                        'less that minsize bytes')
+        ap.add_argument('--maxsize', type=float,
+                        help='Filter out, I/O operations working with '
+                        'more that maxsize bytes')
+        ap.add_argument('--irq', type=str, default=None,
+                        help='Output results only for the list of IRQ')
+        ap.add_argument('--softirq', type=str, default=None,
+                        help='Output results only for the list of SoftIRQ')
+
+
+def _run(mi_mode):
+    multicmd = MultiAnalysisCommand(mi_mode=mi_mode)
+    multicmd.run()
+
+
+def run():
+    _run(mi_mode=False)
+
+
+def run_mi():
+    _run(mi_mode=True)
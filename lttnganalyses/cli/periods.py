@@ -28,6 +28,7 @@ import ast
 from collections import OrderedDict
 from . import mi, termgraph
 from ..core import periods
+from ..core import stats as core_stats
 from .command import Command
 
 
@@ -868,13 +869,11 @@ class PeriodAnalysisCommand(Command):
         return self._analysis_conf.period_def_registry.period_full_path(
             period_name)
 
-    def _get_log_result_table(self, begin_ns, end_ns, period_list):
-        result_table = self._mi_create_result_table(self._MI_TABLE_CLASS_LOG,
-                                                    begin_ns, end_ns)
+    def _gen_log_rows(self, period_list):
         for period_event in period_list:
             if not self._filter_event_duration(period_event):
                 continue
-            result_table.append_row(
+            yield dict(
                 begin_ts=mi.Timestamp(period_event.start_ts),
                 end_ts=mi.Timestamp(period_event.end_ts),
                 duration=mi.Duration(period_event.duration),
@@ -882,23 +881,35 @@ class PeriodAnalysisCommand(Command):
                 begin_captures=mi.String(period_event.begin_captures),
                 end_captures=mi.String(period_event.end_captures),
             )
-        return result_table
+
+    def _get_log_result_table(self, begin_ns, end_ns, period_list):
+        return self._create_log_result_table(self._MI_TABLE_CLASS_LOG,
+                                             begin_ns, end_ns,
+                                             self._gen_log_rows(period_list))
 
     def _get_top_result_table(self, begin_ns, end_ns, event_list):
         result_table = self._mi_create_result_table(
             self._MI_TABLE_CLASS_TOP, begin_ns, end_ns)
 
-        top_events = sorted(event_list,
-                            key=operator.attrgetter('duration'),
-                            reverse=True)
-        count = 0
+        # When the top report is the only one, the analysis tracks the
+        # top periods as they end.
+        top_event_list = self._analysis.top_periods
 
-        for period_event in top_events:
-            if not self._filter_event_duration(period_event):
-                continue
-            if self._args.select and period_event.name not in \
-                    self._args.select:
-                continue
+        if top_event_list is None:
+            # Bounded heap instead of a sort of all the periods
+            top_events = core_stats.TopK(self._args.limit)
+
+            for period_event in event_list:
+                if not self._filter_event_duration(period_event):
+                    continue
+                if self._args.select and period_event.name not in \
+                        self._args.select:
+                    continue
+                top_events.update(period_event.duration, period_event)
+
+            top_event_list = top_events.items()
+
+        for period_event in top_event_list:
             result_table.append_row(
                 begin_ts=mi.Timestamp(period_event.start_ts),
                 end_ts=mi.Timestamp(period_event.end_ts),
@@ -907,9 +918,6 @@ class PeriodAnalysisCommand(Command):
                 begin_captures=mi.String(period_event.begin_captures),
                 end_captures=mi.String(period_event.end_captures),
             )
-            count += 1
-            if count == self._args.limit:
-                break
         return result_table
 
     def _get_ordered_period_stats_list(self, parent_name, period_stats_list,
@@ -1948,6 +1956,21 @@ class PeriodAnalysisCommand(Command):
                 self._analysis_conf._select.append(ag.strip())
         self._analysis_conf._aggregate_by = args.aggregate_by
 
+        # When the top report is the only one, the analysis tracks the
+        # periods with the greatest durations as they end instead of
+        # keeping all of them, filtering them like the report does.
+        if args.top and not (args.log or args.stats or args.freq or
+                             args.select or args.order_by == 'hierarchy'):
+            self._analysis_conf.top_limit = args.limit
+            self._analysis_conf.min_duration = None
+            self._analysis_conf.max_duration = None
+
+            if args.min_duration is not None:
+                self._analysis_conf.min_duration = args.min_duration * 1000
+
+            if args.max_duration is not None:
+                self._analysis_conf.max_duration = args.max_duration * 1000
+
     def _add_arguments(self, ap):
         Command._add_min_max_args(ap)
         Command._add_freq_args(
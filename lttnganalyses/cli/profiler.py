@@ -0,0 +1,257 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import time
+from . import mi
+
+
+TABLE_CLASS_SUMMARY = mi.TableClass('profile-summary', 'Profile - summary', [
+    ('event_count', 'Event count', mi.Number, 'events'),
+    ('event_rate', 'Event rate', mi.Number, 'events/s'),
+    ('duration', 'Total duration', mi.Duration),
+    ('decode_duration', 'Decoding duration', mi.Duration),
+    ('decode_ratio', 'Decoding share', mi.Ratio),
+])
+TABLE_CLASS_PER_HANDLER = mi.TableClass(
+    'profile-per-handler', 'Profile - per handler', [
+        ('handler', 'Handler', mi.String),
+        ('count', 'Call count', mi.Number, 'calls'),
+        ('duration', 'Cumulative inclusive duration', mi.Duration),
+        ('self_duration', 'Cumulative self duration', mi.Duration),
+        ('ratio', 'Share of total duration (self)', mi.Ratio),
+    ])
+TABLE_CLASS_PER_EVENT = mi.TableClass(
+    'profile-per-event', 'Profile - per event name', [
+        ('event', 'Event name', mi.String),
+        ('count', 'Event count', mi.Number, 'events'),
+        ('duration', 'Cumulative processing duration', mi.Duration),
+        ('ratio', 'Share of total duration', mi.Ratio),
+    ])
+TABLE_CLASSES = [
+    TABLE_CLASS_SUMMARY,
+    TABLE_CLASS_PER_HANDLER,
+    TABLE_CLASS_PER_EVENT,
+]
+
+
+# Counts the calls and the cumulative duration of the wrapped handlers
+# of state providers, state notification subscribers, analyses, and
+# period engines, as well as the time spent decoding and processing
+# each event.
+#
+# A handler can call other wrapped handlers, for example a state
+# provider sending notifications: its inclusive duration contains
+# theirs, while its self duration does not.
+#
+# The instrumented objects are only modified when the profiler wraps
+# them, so that profiling costs nothing when it is disabled.
+class Profiler:
+    def __init__(self):
+        # handler name to [call count, cumulative inclusive duration (s),
+        # cumulative self duration (s)]
+        self._handler_stats = {}
+
+        # inclusive duration (s) of the wrapped handlers called so far
+        # by each wrapped handler being called, innermost last
+        self._nested_durations = []
+
+        # event name to [event count, cumulative duration (s)]
+        self._event_stats = {}
+        self._event_count = 0
+        self._decode_duration = 0
+        self._begin_time = None
+        self._end_time = None
+
+    def _wrap(self, name, fn):
+        if name not in self._handler_stats:
+            self._handler_stats[name] = [0, 0, 0]
+
+        stats = self._handler_stats[name]
+        nested_durations = self._nested_durations
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            nested_durations.append(0)
+            begin = clock()
+
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                duration = clock() - begin
+                stats[0] += 1
+                stats[1] += duration
+                stats[2] += duration - nested_durations.pop()
+
+                if nested_durations:
+                    nested_durations[-1] += duration
+
+        return wrapper
+
+    def instrument_automaton(self, automaton):
+        automaton.wrap_cbs(lambda sp, name, cb: self._wrap(
+            '{}: {}'.format(type(sp).__name__, name), cb))
+
+        def wrap_notification_cb(name, cb):
+            return self._wrap('{} -> {}'.format(name, cb.__qualname__), cb)
+
+        automaton.state.set_notification_cb_wrapper(wrap_notification_cb)
+
+    def instrument_analysis(self, analysis):
+        prefix = type(analysis).__name__
+
+        analysis.wrap_cbs(lambda name, cb:
+                          self._wrap('{}: {}'.format(prefix, name), cb))
+
+    # Yields the events of `events`, measuring the time spent getting
+    # each event (decoding) and the time spent by the caller processing
+    # it.
+    def profile_events(self, events):
+        clock = time.perf_counter
+        event_stats = self._event_stats
+        iterator = iter(events)
+        self._begin_time = clock()
+
+        while True:
+            begin = clock()
+
+            try:
+                event = next(iterator)
+            except StopIteration:
+                break
+
+            decoded = clock()
+            self._decode_duration += decoded - begin
+            self._event_count += 1
+            yield event
+            name = event.name
+
+            if name not in event_stats:
+                event_stats[name] = [0, 0]
+
+            stats = event_stats[name]
+            stats[0] += 1
+            stats[1] += clock() - decoded
+
+    def finish(self):
+        self._end_time = time.perf_counter()
+
+    @property
+    def duration(self):
+        if self._begin_time is None or self._end_time is None:
+            return 0
+
+        return self._end_time - self._begin_time
+
+    def _get_ratio(self, duration):
+        if self.duration == 0:
+            return mi.Unknown()
+
+        return mi.Ratio(duration / self.duration)
+
+    def get_result_tables(self, begin_ns, end_ns):
+        duration = self.duration
+        summary_table = mi.ResultTable(TABLE_CLASS_SUMMARY, begin_ns, end_ns)
+        event_rate = mi.Unknown()
+
+        if duration > 0:
+            event_rate = mi.Number(round(self._event_count / duration))
+
+        summary_table.append_row(
+            event_count=mi.Number(self._event_count),
+            event_rate=event_rate,
+            duration=mi.Duration(round(duration * 1e9)),
+            decode_duration=mi.Duration(round(self._decode_duration * 1e9)),
+            decode_ratio=self._get_ratio(self._decode_duration),
+        )
+        handler_table = mi.ResultTable(TABLE_CLASS_PER_HANDLER, begin_ns,
+                                       end_ns)
+
+        for name, (count, handler_duration, self_duration) in sorted(
+                self._handler_stats.items(), key=lambda item: item[1][2],
+                reverse=True):
+            if count == 0:
+                continue
+
+            handler_table.append_row(
+                handler=mi.String(name),
+                count=mi.Number(count),
+                duration=mi.Duration(round(handler_duration * 1e9)),
+                self_duration=mi.Duration(round(self_duration * 1e9)),
+                ratio=self._get_ratio(self_duration),
+            )
+
+        event_table = mi.ResultTable(TABLE_CLASS_PER_EVENT, begin_ns, end_ns)
+
+        for name, (count, event_duration) in sorted(
+                self._event_stats.items(), key=lambda item: item[1][1],
+                reverse=True):
+            event_table.append_row(
+                event=mi.String(name),
+                count=mi.Number(count),
+                duration=mi.Duration(round(event_duration * 1e9)),
+                ratio=self._get_ratio(event_duration),
+            )
+
+        return [summary_table, handler_table, event_table]
+
+
+def _format_ratio(ratio):
+    if type(ratio) is mi.Unknown:
+        return '?'
+
+    return '%0.02f' % ratio.to_percentage()
+
+
+def print_result_tables(result_tables):
+    summary_table, handler_table, event_table = result_tables
+    summary = summary_table.rows[0]
+
+    print('\nProfile')
+    print('Events: {}'.format(summary.event_count.value))
+
+    if type(summary.event_rate) is not mi.Unknown:
+        print('Event rate: {} events/s'.format(summary.event_rate.value))
+
+    print('Total duration: %0.03f ms' % summary.duration.to_ms())
+    print('Decoding duration: %0.03f ms (%s %%)' % (
+        summary.decode_duration.to_ms(),
+        _format_ratio(summary.decode_ratio)))
+
+    handler_format = '{:<60} {:>12} {:>14} {:>14} {:>8}'
+    print()
+    print(handler_format.format('Handler', 'Count', 'Incl. (ms)',
+                                'Self (ms)', 'Self %'))
+
+    for row in handler_table.rows:
+        print(handler_format.format(row.handler.value, row.count.value,
+                                    '%0.03f' % row.duration.to_ms(),
+                                    '%0.03f' % row.self_duration.to_ms(),
+                                    _format_ratio(row.ratio)))
+
+    event_format = '{:<60} {:>12} {:>14} {:>8}'
+    print()
+    print(event_format.format('Event name', 'Count', 'Duration (ms)', '%'))
+
+    for row in event_table.rows:
+        print(event_format.format(row.event.value, row.count.value,
+                                  '%0.03f' % row.duration.to_ms(),
+                                  _format_ratio(row.ratio)))
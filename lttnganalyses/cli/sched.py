@@ -23,8 +23,6 @@
 
 import sys
 import math
-import operator
-import statistics
 import collections
 from . import mi, termgraph
 from ..core import sched
@@ -32,15 +30,6 @@ from .command import Command
 from ..common import format_utils
 
 
-_SchedStats = collections.namedtuple('_SchedStats', [
-    'count',
-    'min',
-    'max',
-    'stdev',
-    'total',
-])
-
-
 class SchedAnalysisCommand(Command):
     _DESC = """The sched command."""
     _ANALYSIS_CLASS = sched.SchedAnalysis
@@ -235,90 +224,39 @@ class SchedAnalysisCommand(Command):
             if top_table:
                 self._print_sched_events(top_table)
 
-    def _get_total_sched_lists_stats(self, period_data):
-        total_list = period_data.sched_list
-        stdev = self._compute_sched_latency_stdev(total_list)
-        total_stats = _SchedStats(
-            count=self._analysis.count(period_data),
-            min=period_data.min_latency,
-            max=period_data.max_latency,
-            stdev=stdev,
-            total=period_data.total_latency
-        )
+    # The following methods return, for each group of wakeups, the
+    # latency statistics of the group and the list of its wakeups (empty
+    # if the analysis does not keep events).
+    def _get_total_latency_groups(self, period_data):
+        return {None: (period_data.latency_stats, period_data.sched_list)}
 
-        return [total_list], total_stats
+    def _get_tid_latency_groups(self, period_data):
+        return {tid: (tid_stats.latency_stats, tid_stats.sched_list)
+                for tid, tid_stats in period_data.tids.items()
+                if tid_stats.count > 0}
 
-    def _get_tid_sched_lists_stats(self, period_data):
-        tid_sched_lists = {}
-        tid_stats = {}
+    def _get_prio_latency_groups(self, period_data):
+        prio_sched_lists = collections.defaultdict(list)
 
         for sched_event in period_data.sched_list:
-            tid = sched_event.wakee_proc.tid
-            if tid not in tid_sched_lists:
-                tid_sched_lists[tid] = []
-
-            tid_sched_lists[tid].append(sched_event)
-
-        for tid in tid_sched_lists:
-            sched_list = tid_sched_lists[tid]
-
-            if not sched_list:
-                continue
-
-            stdev = self._compute_sched_latency_stdev(sched_list)
-            latencies = [sched.latency for sched in sched_list]
-            count = len(latencies)
-            min_latency = min(latencies)
-            max_latency = max(latencies)
-            total_latency = sum(latencies)
-
-            tid_stats[tid] = _SchedStats(
-                count=count,
-                min=min_latency,
-                max=max_latency,
-                stdev=stdev,
-                total=total_latency,
-            )
-
-        return tid_sched_lists, tid_stats
-
-    def _get_prio_sched_lists_stats(self, period_data):
-        prio_sched_lists = {}
-        prio_stats = {}
-
-        for sched_event in period_data.sched_list:
-            if sched_event.prio not in prio_sched_lists:
-                prio_sched_lists[sched_event.prio] = []
-
             prio_sched_lists[sched_event.prio].append(sched_event)
 
-        for prio in prio_sched_lists:
-            sched_list = prio_sched_lists[prio]
-
-            if not sched_list:
-                continue
+        return {prio: (latency_stats, prio_sched_lists[prio])
+                for prio, latency_stats
+                in period_data.prio_latency_stats.items()}
 
-            stdev = self._compute_sched_latency_stdev(sched_list)
-            latencies = [sched.latency for sched in sched_list]
-            count = len(latencies)
-            min_latency = min(latencies)
-            max_latency = max(latencies)
-            total_latency = sum(latencies)
-
-            prio_stats[prio] = _SchedStats(
-                count=count,
-                min=min_latency,
-                max=max_latency,
-                stdev=stdev,
-                total=total_latency,
-            )
+    # Returns the (latency, count) pairs of a group of wakeups: each
+    # wakeup if the analysis keeps events, otherwise the buckets of the
+    # latency histogram, within the exact minimum and maximum latencies.
+    def _get_latency_counts(self, latency_stats, sched_list):
+        if self._analysis_conf.keep_events:
+            return [(sched_event.latency, 1) for sched_event in sched_list]
 
-        return prio_sched_lists, prio_stats
-
-    def _get_log_result_table(self, period_data, begin_ns, end_ns):
-        result_table = self._mi_create_result_table(self._MI_TABLE_CLASS_LOG,
-                                                    begin_ns, end_ns)
+        return [(min(max(latency, latency_stats.min), latency_stats.max),
+                 count)
+                for latency, count in latency_stats.histogram.items()]
 
+    def _gen_log_rows(self, period_data):
         for sched_event in period_data.sched_list:
             wakee_proc = mi.Process(sched_event.wakee_proc.comm,
                                     sched_event.wakee_proc.pid,
@@ -331,7 +269,7 @@ class SchedAnalysisCommand(Command):
             else:
                 waker_proc = mi.Empty()
 
-            result_table.append_row(
+            yield dict(
                 wakeup_ts=mi.Timestamp(sched_event.wakeup_ts),
                 switch_ts=mi.Timestamp(sched_event.switch_ts),
                 latency=mi.Duration(sched_event.latency),
@@ -341,18 +279,16 @@ class SchedAnalysisCommand(Command):
                 waker_proc=waker_proc,
             )
 
-        return result_table
+    def _get_log_result_table(self, period_data, begin_ns, end_ns):
+        return self._create_log_result_table(self._MI_TABLE_CLASS_LOG,
+                                             begin_ns, end_ns,
+                                             self._gen_log_rows(period_data))
 
     def _get_top_result_table(self, period_data, begin_ns, end_ns):
         result_table = self._mi_create_result_table(
             self._MI_TABLE_CLASS_TOP, begin_ns, end_ns)
 
-        top_events = sorted(period_data.sched_list,
-                            key=operator.attrgetter('latency'),
-                            reverse=True)
-        top_events = top_events[:self._args.limit]
-
-        for sched_event in top_events:
+        for sched_event in period_data.top_sched.items():
             wakee_proc = mi.Process(sched_event.wakee_proc.comm,
                                     sched_event.wakee_proc.pid,
                                     sched_event.wakee_proc.tid)
@@ -381,7 +317,7 @@ class SchedAnalysisCommand(Command):
             self._mi_create_result_table(self._MI_TABLE_CLASS_TOTAL_STATS,
                                          begin_ns, end_ns)
 
-        stdev = self._compute_sched_latency_stdev(period_data.sched_list)
+        stdev = period_data.latency_stats.stdev
         if math.isnan(stdev):
             stdev = mi.Unknown()
         else:
@@ -422,10 +358,10 @@ class SchedAnalysisCommand(Command):
                                 key=lambda proc: proc.comm.lower())
 
         for tid_stats in tid_stats_list:
-            if not tid_stats.sched_list:
+            if tid_stats.count == 0:
                 continue
 
-            stdev = self._compute_sched_latency_stdev(tid_stats.sched_list)
+            stdev = tid_stats.latency_stats.stdev
             if math.isnan(stdev):
                 stdev = mi.Unknown()
             else:
@@ -434,7 +370,9 @@ class SchedAnalysisCommand(Command):
             prio_list = format_utils.format_prio_list(tid_stats.prio_list)
 
             stats_table.append_row(
-                process=mi.Process(tid=tid_stats.tid, name=tid_stats.comm),
+                process=mi.Process(
+                    tid=tid_stats.tid, name=tid_stats.comm,
+                    incomplete=self._get_incomplete_flag(tid_stats)),
                 count=mi.Number(tid_stats.count),
                 min_latency=mi.Duration(tid_stats.min_latency),
                 avg_latency=mi.Duration(tid_stats.total_latency /
@@ -451,7 +389,7 @@ class SchedAnalysisCommand(Command):
             self._mi_create_result_table(self._MI_TABLE_CLASS_PER_PRIO_STATS,
                                          begin_ns, end_ns)
 
-        _, prio_stats = self._get_prio_sched_lists_stats(period_data)
+        prio_stats = period_data.prio_latency_stats
 
         for prio in sorted(prio_stats):
             stats = prio_stats[prio]
@@ -552,7 +490,7 @@ class SchedAnalysisCommand(Command):
 
         return result_table
 
-    def _fill_freq_result_table(self, sched_list, stats, min_duration,
+    def _fill_freq_result_table(self, latency_counts, stats, min_duration,
                                 max_duration, step, freq_table):
         # The number of bins for the histogram
         resolution = self._args.freq_resolution
@@ -591,19 +529,19 @@ class SchedAnalysisCommand(Command):
             buckets.append(i * step)
             counts.append(0)
 
-        for sched_event in sched_list:
-            duration = sched_event.latency / 1000
+        for latency, count in latency_counts:
+            duration = latency / 1000
             index = int((duration - min_duration) / step)
 
             if index >= resolution:
                 # special case for max value: put in last bucket (includes
                 # its upper bound)
                 if duration == max_duration:
-                    counts[index - 1] += 1
+                    counts[index - 1] += count
 
                 continue
 
-            counts[index] += 1
+            counts[index] += count
 
         for index, count in enumerate(counts):
             lower_bound = index * step + min_duration
@@ -614,100 +552,60 @@ class SchedAnalysisCommand(Command):
                 count=mi.Number(count),
             )
 
-    def _get_total_freq_result_tables(self, period_data, begin_ns, end_ns):
+    # Returns the frequency distribution tables of the groups of wakeups
+    # `groups` (see _get_total_latency_groups()), in the order of their
+    # keys, with the subtitle `subtitle_fmt` formatted with the key.
+    def _get_freq_result_tables(self, groups, begin_ns, end_ns,
+                                subtitle_fmt=None):
         freq_tables = []
-        sched_lists, sched_stats = self._get_total_sched_lists_stats(
-            period_data)
         min_duration = None
         max_duration = None
         step = None
 
         if self._args.freq_uniform:
+            # only the extreme latencies of the groups matter
             latencies = []
 
-            for sched_list in sched_lists:
-                latencies += [sched.latency for sched in sched_list]
+            for latency_stats, _ in groups.values():
+                if latency_stats.count > 0:
+                    latencies += [latency_stats.min, latency_stats.max]
 
             min_duration, max_duration, step = \
                 self._find_uniform_freq_values(latencies)
 
-        for sched_list in sched_lists:
-            freq_table = \
-                self._mi_create_result_table(self._MI_TABLE_CLASS_FREQ,
-                                             begin_ns, end_ns)
-            self._fill_freq_result_table(sched_list, sched_stats, min_duration,
-                                         max_duration, step, freq_table)
-            freq_tables.append(freq_table)
-
-        return freq_tables
-
-    def _get_per_tid_freq_result_tables(self, period_data, begin_ns, end_ns):
-        freq_tables = []
-        tid_sched_lists, tid_stats = self._get_tid_sched_lists_stats(
-            period_data)
-        min_duration = None
-        max_duration = None
-        step = None
-
-        if self._args.freq_uniform:
-            latencies = []
+        for key in sorted(groups):
+            latency_stats, sched_list = groups[key]
 
-            for sched_list in tid_sched_lists.values():
-                latencies += [sched.latency for sched in sched_list]
-
-            min_duration, max_duration, step = \
-                self._find_uniform_freq_values(latencies)
+            if subtitle_fmt is None:
+                subtitle = None
+            else:
+                subtitle = subtitle_fmt.format(key)
 
-        for tid in sorted(tid_sched_lists):
-            sched_list = tid_sched_lists[tid]
-            stats = tid_stats[tid]
-            subtitle = 'TID: {}'.format(tid)
             freq_table = \
                 self._mi_create_result_table(self._MI_TABLE_CLASS_FREQ,
                                              begin_ns, end_ns, subtitle)
-            self._fill_freq_result_table(sched_list, stats, min_duration,
-                                         max_duration, step, freq_table)
+            latency_counts = self._get_latency_counts(latency_stats,
+                                                      sched_list)
+            self._fill_freq_result_table(latency_counts, latency_stats,
+                                         min_duration, max_duration, step,
+                                         freq_table)
             freq_tables.append(freq_table)
 
         return freq_tables
 
-    def _get_per_prio_freq_result_tables(self, period_data, begin_ns, end_ns):
-        freq_tables = []
-        prio_sched_lists, prio_stats = self._get_prio_sched_lists_stats(
-            period_data)
-        min_duration = None
-        max_duration = None
-        step = None
-
-        if self._args.freq_uniform:
-            latencies = []
-
-            for sched_list in prio_sched_lists.values():
-                latencies += [sched.latency for sched in sched_list]
-
-            min_duration, max_duration, step = \
-                self._find_uniform_freq_values(latencies)
-
-        for prio in sorted(prio_sched_lists):
-            sched_list = prio_sched_lists[prio]
-            stats = prio_stats[prio]
-            subtitle = 'Priority: {}'.format(prio)
-            freq_table = \
-                self._mi_create_result_table(self._MI_TABLE_CLASS_FREQ,
-                                             begin_ns, end_ns, subtitle)
-            self._fill_freq_result_table(sched_list, stats, min_duration,
-                                         max_duration, step, freq_table)
-            freq_tables.append(freq_table)
+    def _get_total_freq_result_tables(self, period_data, begin_ns, end_ns):
+        return self._get_freq_result_tables(
+            self._get_total_latency_groups(period_data), begin_ns, end_ns)
 
-        return freq_tables
+    def _get_per_tid_freq_result_tables(self, period_data, begin_ns, end_ns):
+        return self._get_freq_result_tables(
+            self._get_tid_latency_groups(period_data), begin_ns, end_ns,
+            'TID: {}')
 
-    def _compute_sched_latency_stdev(self, sched_events):
-        sched_latencies = []
-        for sched_event in sched_events:
-            sched_latencies.append(sched_event.latency)
-        if len(sched_latencies) < 2:
-            return float('nan')
-        return statistics.stdev(sched_latencies)
+    def _get_per_prio_freq_result_tables(self, period_data, begin_ns, end_ns):
+        return self._get_freq_result_tables(
+            self._get_prio_latency_groups(period_data), begin_ns, end_ns,
+            'Priority: {}')
 
     def _print_sched_events(self, result_table):
         fmt = '[{:<18}, {:<18}] {:>15} {:>10}  {:>3}   {:<25}  {:<25}'
@@ -779,7 +677,8 @@ class SchedAnalysisCommand(Command):
                     stdev_str = '%0.03f' % row.stdev_latency.to_us()
 
                 proc = row.process
-                proc_str = '%s (%d)' % (proc.name, proc.tid)
+                proc_str = '%s (%d)%s' % (proc.name, proc.tid,
+                                          self._get_incomplete_marker(proc))
 
                 row_str = row_format.format(
                     '%s' % proc_str,
@@ -845,6 +744,14 @@ class SchedAnalysisCommand(Command):
         if not (args.total or args.per_prio):
             args.per_tid = True
 
+        # only the log needs each wakeup, the statistics and the
+        # frequency distributions use constant memory without them,
+        # and the analysis tracks the top latencies as wakeups arrive
+        self._analysis_conf.keep_events = args.log
+
+        if args.top:
+            self._analysis_conf.top_limit = args.limit
+
     def _add_arguments(self, ap):
         Command._add_min_max_args(ap)
         Command._add_proc_filter_args(ap)
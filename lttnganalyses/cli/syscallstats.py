@@ -26,7 +26,7 @@ import errno
 import operator
 import statistics
 from . import mi
-from ..core import syscalls
+from ..core import stats, syscalls
 from .command import Command
 
 
@@ -140,19 +140,21 @@ class SyscallsAnalysis(Command):
             for syscall in sorted(proc_stats.syscalls.values(),
                                   key=operator.attrgetter('count'),
                                   reverse=True):
-                durations = []
+                durations = syscall.calls.column('duration')
                 return_count = {}
 
-                for syscall_event in syscall.syscalls_list:
-                    durations.append(syscall_event.duration)
+                for ret in syscall.calls.column('ret'):
+                    # No return value recorded for this system call
+                    if ret == stats.ColumnStore.NULL:
+                        continue
 
-                    if syscall_event.ret >= 0:
+                    if ret >= 0:
                         return_key = 'success'
                     else:
                         try:
-                            return_key = errno.errorcode[-syscall_event.ret]
+                            return_key = errno.errorcode[-ret]
                         except KeyError:
-                            return_key = str(syscall_event.ret)
+                            return_key = str(ret)
 
                     if return_key not in return_count:
                         return_count[return_key] = 1
@@ -177,8 +179,9 @@ class SyscallsAnalysis(Command):
 
             per_tid_tables.append(result_table)
             total_table.append_row(
-                process=mi.Process(proc_stats.comm, pid=proc_stats.pid,
-                                   tid=proc_stats.tid),
+                process=mi.Process(
+                    proc_stats.comm, pid=proc_stats.pid, tid=proc_stats.tid,
+                    incomplete=self._get_incomplete_flag(proc_stats)),
                 count=mi.Number(proc_stats.total_syscalls),
             )
 
@@ -191,7 +194,9 @@ class SyscallsAnalysis(Command):
         total_calls = 0
 
         for total_row, table in zip(total_table.rows, per_tid_tables):
-            print(line_format.format(table.subtitle,
+            title = table.subtitle + \
+                self._get_incomplete_marker(total_row.process)
+            print(line_format.format(title,
                                      'Count', 'Min', 'Average', 'Max',
                                      'Stdev', 'Return values'))
             for row in table.rows:
@@ -0,0 +1,317 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import collections
+import hashlib
+import json
+import os
+import struct
+from multiprocessing.pool import ThreadPool
+from . import metadata_utils, trace_utils
+
+
+# Magic number of an LTTng packet index file
+_INDEX_MAGIC = 0xc1f1dcc1
+
+# Version of the format of the cached lost events
+_CACHE_VERSION = 2
+
+_HEADER_FMT = '>IIII'
+_HEADER_SIZE = struct.calcsize(_HEADER_FMT)
+
+# Index entry fields are all 64-bit big-endian unsigned integers; index
+# format 1.1 adds the last two ones.
+_ENTRY_FIELD_COUNT_1_0 = 7
+_ENTRY_FIELD_COUNT_1_1 = 9
+
+
+PacketIndexEntry = collections.namedtuple('PacketIndexEntry', [
+    'offset',
+    'packet_size',
+    'content_size',
+    'timestamp_begin',
+    'timestamp_end',
+    'events_discarded',
+    'stream_id',
+    'stream_instance_id',
+    'packet_seq_num',
+])
+
+
+# Events and packets lost between two timestamps. The timestamps are
+# clock values (cycles) as returned by get_lost_events(), and
+# nanoseconds since the Epoch as returned by get_trace_lost_events().
+LostEvents = collections.namedtuple('LostEvents', [
+    'begin_ts',
+    'end_ts',
+    'event_count',
+    'packet_count',
+])
+
+
+def decode_index(data):
+    """Decode the content of an LTTng packet index file.
+
+    Args:
+        data (bytes): content of the index file.
+
+    Returns:
+        A list of PacketIndexEntry objects, one per packet. The
+        `stream_instance_id` and `packet_seq_num` attributes are None
+        for index format 1.0.
+
+    Raises:
+        ValueError: if the index is malformed.
+    """
+    if len(data) < _HEADER_SIZE:
+        raise ValueError('truncated index header')
+
+    magic, major, minor, entry_size = struct.unpack_from(_HEADER_FMT, data)
+
+    if magic != _INDEX_MAGIC:
+        raise ValueError('invalid index magic number: {:#x}'.format(magic))
+
+    if major != 1:
+        raise ValueError('unsupported index version: {}.{}'.format(major,
+                                                                   minor))
+
+    field_count = _ENTRY_FIELD_COUNT_1_1 if minor >= 1 else \
+        _ENTRY_FIELD_COUNT_1_0
+    entry_fmt = '>{}Q'.format(field_count)
+
+    if entry_size < struct.calcsize(entry_fmt):
+        raise ValueError('invalid index entry size: {}'.format(entry_size))
+
+    padding = (None,) * (_ENTRY_FIELD_COUNT_1_1 - field_count)
+    entries = []
+
+    for offset in range(_HEADER_SIZE, len(data) - entry_size + 1,
+                        entry_size):
+        fields = struct.unpack_from(entry_fmt, data, offset)
+        entries.append(PacketIndexEntry(*(fields + padding)))
+
+    return entries
+
+
+def read_index(path):
+    """Read an LTTng packet index file.
+
+    Args:
+        path (str): path of the index file.
+
+    Returns:
+        A list of PacketIndexEntry objects, one per packet.
+    """
+    with open(path, 'rb') as f:
+        return decode_index(f.read())
+
+
+def get_lost_events(entries, events_discarded_size=64):
+    """Find the events and packets lost by the tracer in a stream.
+
+    The packet context of each packet contains the number of events
+    which the tracer discarded in its stream so far, and, starting
+    with index format 1.1, the sequence number of the packet.
+
+    Args:
+        entries (list): PacketIndexEntry objects of the packets of a
+        stream, in order.
+
+        events_discarded_size (int): size of the events_discarded field
+        of the packet contexts (bits), at which the counter wraps
+        around (default: 64).
+
+    Returns:
+        A list of LostEvents objects, one per packet which follows lost
+        events or packets. The time range of each one spans from the
+        end of the previous packet to the end of this packet.
+    """
+    lost_events = []
+    prev_entry = None
+
+    for entry in entries:
+        if prev_entry is None:
+            begin_ts = entry.timestamp_begin
+            event_count = entry.events_discarded
+            packet_count = 0
+        else:
+            begin_ts = prev_entry.timestamp_end
+            # the counter wraps around at the size of its field
+            event_count = (entry.events_discarded -
+                           prev_entry.events_discarded) % \
+                (1 << events_discarded_size)
+            packet_count = 0
+
+            if entry.packet_seq_num is not None and \
+                    prev_entry.packet_seq_num is not None:
+                packet_count = max(entry.packet_seq_num -
+                                   prev_entry.packet_seq_num - 1, 0)
+
+        if event_count > 0 or packet_count > 0:
+            lost_events.append(LostEvents(begin_ts, entry.timestamp_end,
+                                          event_count, packet_count))
+
+        prev_entry = entry
+
+    return lost_events
+
+
+def find_index_files(trace_path):
+    """Find the packet index files of a trace (collection).
+
+    Args:
+        trace_path (str): path of the trace (collection).
+
+    Returns:
+        A sorted list of paths of index files.
+    """
+    paths = []
+
+    for root, dirs, files in os.walk(trace_path):
+        if trace_utils.CACHE_DIR_NAME in dirs:
+            dirs.remove(trace_utils.CACHE_DIR_NAME)
+
+        if os.path.basename(root) != 'index':
+            continue
+
+        for name in files:
+            if name.endswith('.idx'):
+                paths.append(os.path.join(root, name))
+
+    return sorted(paths)
+
+
+def _get_stream_lost_events(index_path, trace_metadata):
+    clock = _get_clock(trace_metadata)
+    lost_events = []
+
+    for lost in get_lost_events(read_index(index_path),
+                                trace_metadata.events_discarded_size):
+        lost_events.append(lost._replace(
+            begin_ts=clock.cycles_to_ns(lost.begin_ts),
+            end_ts=clock.cycles_to_ns(lost.end_ts)))
+
+    return lost_events
+
+
+def get_trace_dir(index_path):
+    """Get the directory of the trace described by an index file.
+
+    Args:
+        index_path (str): path of the index file.
+
+    Returns:
+        The path of the trace directory.
+    """
+    # index/<stream>.idx is in the directory of its trace
+    return os.path.dirname(os.path.dirname(index_path))
+
+
+def _get_clock(trace_metadata):
+    if not trace_metadata.clocks:
+        return metadata_utils.Clock(None)
+
+    return trace_metadata.clocks[0]
+
+
+def _get_cache_path(trace_path, index_paths):
+    key = hashlib.sha1(str(_CACHE_VERSION).encode())
+
+    for path in index_paths:
+        stat = os.stat(path)
+        key.update('{} {} {}\n'.format(os.path.relpath(path, trace_path),
+                                       stat.st_size,
+                                       stat.st_mtime_ns).encode())
+
+    return os.path.join(trace_utils.get_cache_dir(trace_path),
+                        'lost-events-{}.json'.format(key.hexdigest()))
+
+
+def get_trace_lost_events(trace_path, index_paths, jobs=None):
+    """Find the events and packets lost by the tracer in a trace.
+
+    The index files are read concurrently, and the result is cached in
+    the cache directory of the trace.
+
+    Args:
+        trace_path (str): path of the trace (collection).
+
+        index_paths (list): paths of the index files of the trace, as
+        returned by find_index_files().
+
+        jobs (int): number of index files to read concurrently (default:
+        number of CPUs).
+
+    Returns:
+        A dictionary mapping the path of each stream, relative to
+        `trace_path`, to a list of LostEvents objects with timestamps
+        in nanoseconds. Streams without lost events are not included.
+    """
+    cache_path = _get_cache_path(trace_path, index_paths)
+
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+
+        return {stream: [LostEvents(*lost) for lost in lost_events]
+                for stream, lost_events in cached.items()}
+    except (OSError, ValueError, TypeError):
+        pass
+
+    trace_metadatas = {}
+
+    for index_path in index_paths:
+        trace_dir = get_trace_dir(index_path)
+
+        if trace_dir not in trace_metadatas:
+            trace_metadatas[trace_dir] = metadata_utils.get_trace_metadata(
+                os.path.join(trace_dir, 'metadata'),
+                trace_utils.get_cache_dir(trace_path))
+
+    with ThreadPool(jobs) as pool:
+        results = pool.starmap(_get_stream_lost_events, [
+            (index_path, trace_metadatas[get_trace_dir(index_path)])
+            for index_path in index_paths
+        ])
+
+    trace_lost_events = {}
+
+    for index_path, lost_events in zip(index_paths, results):
+        if not lost_events:
+            continue
+
+        # index/<stream>.idx describes the <stream> file
+        stream_path = os.path.join(get_trace_dir(index_path),
+                                   os.path.basename(index_path)[:-4])
+        stream = os.path.relpath(stream_path, trace_path)
+        trace_lost_events[stream] = lost_events
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+        with open(cache_path, 'w') as f:
+            json.dump(trace_lost_events, f)
+    except OSError:
+        # the cache is optional (read-only trace, for example)
+        pass
+
+    return trace_lost_events
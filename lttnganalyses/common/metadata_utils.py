@@ -0,0 +1,412 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+import re
+import struct
+import uuid
+from .time_utils import NSEC_PER_SEC
+from .version_utils import Version
+
+
+# Magic number of a packet of packetized metadata
+_PACKET_MAGIC = 0x75d11d57
+
+# Size of the header of a packet of packetized metadata (bytes)
+_PACKET_HEADER_SIZE = 37
+
+# Version of the format of the cached metadata
+_CACHE_VERSION = 2
+
+# Default size of the events_discarded field of packet contexts (bits)
+_DEFAULT_EVENTS_DISCARDED_SIZE = 64
+
+# Number of bytes read at the beginning of a plain text metadata file to
+# find the UUID of its trace
+_UUID_READ_SIZE = 4096
+
+_CLOCK_RE = re.compile(r'\bclock\s*\{(.*?)\}\s*;', re.DOTALL)
+_CLOCK_ATTR_RE = re.compile(r'(\w+)\s*=\s*"?([^";]*)"?\s*;')
+_TRACE_UUID_RE = re.compile(r'\btrace\s*\{[^}]*?uuid\s*=\s*"([0-9a-fA-F-]+)"',
+                            re.DOTALL)
+_EVENT_NAME_RE = re.compile(r'\bevent\s*\{\s*name\s*=\s*"?([^";]+)"?\s*;')
+_TRACER_MAJOR_RE = re.compile(r'tracer_major\s*=\s*"?(\d+)"?\s*;')
+_TRACER_MINOR_RE = re.compile(r'tracer_minor\s*=\s*"?(\d+)"?\s*;')
+_TRACER_PATCH_RE = re.compile(r'tracer_patchlevel\s*=\s*"?(\d+)"?\s*;')
+_EVENTS_DISCARDED_RE = re.compile(
+    r'(integer\s*\{[^}]*\}|[A-Za-z_][\w ]*?)\s*\bevents_discarded\s*;')
+_INTEGER_ALIAS_RE = re.compile(
+    r'\btypealias\s+integer\s*\{([^}]*)\}\s*:=\s*([\w ]+?)\s*;')
+_INTEGER_SIZE_RE = re.compile(r'\bsize\s*=\s*(\d+)\s*;')
+
+# Cache of TraceMetadata objects, by trace UUID
+_trace_metadata_cache = {}
+
+
+class Clock:
+    """Clock of a trace, as described by its metadata.
+
+    Args:
+        name (str): name of the clock.
+
+        freq (int): frequency of the clock (Hz).
+
+        offset_s (int): offset of the clock from the Epoch (s).
+
+        offset (int): additional offset of the clock from the Epoch
+        (cycles).
+    """
+
+    def __init__(self, name, freq=NSEC_PER_SEC, offset_s=0, offset=0):
+        self.name = name
+        self.freq = freq
+        self.offset_s = offset_s
+        self.offset = offset
+
+    def cycles_to_ns(self, cycles):
+        """Convert a clock value to a timestamp.
+
+        Args:
+            cycles (int): clock value (cycles).
+
+        Returns:
+            The number of nanoseconds since the Epoch.
+        """
+        cycles += self.offset
+
+        return self.offset_s * NSEC_PER_SEC + \
+            cycles * NSEC_PER_SEC // self.freq
+
+    def to_native_object(self):
+        return [self.name, self.freq, self.offset_s, self.offset]
+
+
+class TraceMetadata:
+    """Information extracted from the metadata of a trace.
+
+    Args:
+        uuid (str): UUID of the trace, or None.
+
+        tracer_version (Version): version of the tracer, or None.
+
+        clocks (list): Clock objects of the trace.
+
+        event_names (list): names of the event classes of the trace.
+
+        events_discarded_size (int): size of the events_discarded field
+        of the packet contexts (bits).
+    """
+
+    def __init__(self, uuid, tracer_version, clocks, event_names,
+                 events_discarded_size=_DEFAULT_EVENTS_DISCARDED_SIZE):
+        self.uuid = uuid
+        self.tracer_version = tracer_version
+        self.clocks = clocks
+        self.event_names = event_names
+        self.events_discarded_size = events_discarded_size
+
+    @classmethod
+    def new_from_metadata(cls, metadata):
+        """Extract information from the text of CTF metadata.
+
+        Args:
+            metadata (str): text of the metadata.
+
+        Returns:
+            A TraceMetadata object.
+        """
+        uuid_match = _TRACE_UUID_RE.search(metadata)
+        trace_uuid = uuid_match.group(1).lower() if uuid_match else None
+
+        return cls(trace_uuid, get_tracer_version(metadata),
+                   get_clocks(metadata), _EVENT_NAME_RE.findall(metadata),
+                   get_events_discarded_size(metadata))
+
+    @classmethod
+    def new_from_native_object(cls, obj):
+        tracer_version = obj['tracer-version']
+
+        if tracer_version is not None:
+            tracer_version = Version(*tracer_version)
+
+        return cls(obj['uuid'], tracer_version,
+                   [Clock(*clock) for clock in obj['clocks']],
+                   obj['event-names'], obj['events-discarded-size'])
+
+    def to_native_object(self):
+        tracer_version = None
+
+        if self.tracer_version is not None:
+            tracer_version = [self.tracer_version.major,
+                              self.tracer_version.minor,
+                              self.tracer_version.patch]
+
+        return {
+            'uuid': self.uuid,
+            'tracer-version': tracer_version,
+            'clocks': [clock.to_native_object() for clock in self.clocks],
+            'event-names': self.event_names,
+            'events-discarded-size': self.events_discarded_size,
+        }
+
+
+def decode_metadata(data):
+    """Decode the text of CTF metadata.
+
+    Args:
+        data (bytes): content of a metadata file, either plain text or
+        packetized.
+
+    Returns:
+        The text of the metadata.
+
+    Raises:
+        ValueError: if a metadata packet is malformed.
+    """
+    if len(data) < 4:
+        return data.decode('utf-8', 'replace')
+
+    for byte_order in ('<', '>'):
+        if struct.unpack(byte_order + 'I', data[:4])[0] == _PACKET_MAGIC:
+            break
+    else:
+        # plain text metadata
+        return data.decode('utf-8', 'replace')
+
+    header_fmt = byte_order + 'I16sIIIBBBBB'
+    offset = 0
+    chunks = []
+
+    while offset < len(data):
+        if len(data) - offset < _PACKET_HEADER_SIZE:
+            raise ValueError('truncated metadata packet header')
+
+        header = struct.unpack_from(header_fmt, data, offset)
+        magic, content_size, packet_size = header[0], header[3], header[4]
+
+        if magic != _PACKET_MAGIC:
+            raise ValueError('invalid metadata packet magic number: '
+                             '{:#x}'.format(magic))
+
+        if packet_size == 0 or content_size < _PACKET_HEADER_SIZE * 8:
+            raise ValueError('invalid metadata packet size')
+
+        chunks.append(data[offset + _PACKET_HEADER_SIZE:
+                           offset + content_size // 8])
+        offset += packet_size // 8
+
+    return b''.join(chunks).decode('utf-8', 'replace')
+
+
+def read_metadata(path):
+    """Read the text of a CTF metadata file.
+
+    Args:
+        path (str): path of the metadata file.
+
+    Returns:
+        The text of the metadata.
+    """
+    with open(path, 'rb') as f:
+        return decode_metadata(f.read())
+
+
+def get_clocks(metadata):
+    """Get the clocks described by CTF metadata.
+
+    Args:
+        metadata (str): text of the metadata.
+
+    Returns:
+        A list of Clock objects, in order of declaration.
+    """
+    clocks = []
+
+    for match in _CLOCK_RE.finditer(metadata):
+        attrs = dict(_CLOCK_ATTR_RE.findall(match.group(1)))
+        clocks.append(Clock(attrs.get('name'),
+                            int(attrs.get('freq', str(NSEC_PER_SEC)), 0),
+                            int(attrs.get('offset_s', '0'), 0),
+                            int(attrs.get('offset', '0'), 0)))
+
+    return clocks
+
+
+def get_tracer_version(metadata):
+    """Get the version of the tracer which recorded a trace.
+
+    Args:
+        metadata (str): text of the metadata of the trace.
+
+    Returns:
+        A Version object, or None if the metadata does not contain the
+        version of the tracer.
+    """
+    matches = [regex.search(metadata) for regex in
+               (_TRACER_MAJOR_RE, _TRACER_MINOR_RE, _TRACER_PATCH_RE)]
+
+    if None in matches:
+        return None
+
+    return Version(*[int(match.group(1)) for match in matches])
+
+
+def get_events_discarded_size(metadata):
+    """Get the size of the events_discarded field of packet contexts.
+
+    The counter of discarded events wraps around at this size, which
+    depends on the architecture of the traced system for LTTng kernel
+    traces (unsigned long).
+
+    Args:
+        metadata (str): text of the metadata of the trace.
+
+    Returns:
+        The size of the field (bits), or 64 if it cannot be found.
+    """
+    match = _EVENTS_DISCARDED_RE.search(metadata)
+
+    if match is None:
+        return _DEFAULT_EVENTS_DISCARDED_SIZE
+
+    field_type = ' '.join(match.group(1).split())
+
+    if not field_type.startswith('integer'):
+        for alias_match in _INTEGER_ALIAS_RE.finditer(metadata):
+            if ' '.join(alias_match.group(2).split()) == field_type:
+                field_type = alias_match.group(1)
+                break
+        else:
+            return _DEFAULT_EVENTS_DISCARDED_SIZE
+
+    size_match = _INTEGER_SIZE_RE.search(field_type)
+
+    if size_match is None:
+        return _DEFAULT_EVENTS_DISCARDED_SIZE
+
+    return int(size_match.group(1))
+
+
+def read_uuid(path):
+    """Read the UUID of a trace from the beginning of its metadata.
+
+    Args:
+        path (str): path of the metadata file.
+
+    Returns:
+        The UUID as a lowercase string, or None if it cannot be found.
+    """
+    with open(path, 'rb') as f:
+        data = f.read(_UUID_READ_SIZE)
+
+    for byte_order in ('<', '>'):
+        if len(data) >= 20 and \
+                struct.unpack(byte_order + 'I', data[:4])[0] == _PACKET_MAGIC:
+            return str(uuid.UUID(bytes=data[4:20]))
+
+    match = _TRACE_UUID_RE.search(data.decode('utf-8', 'replace'))
+
+    if match is None:
+        return None
+
+    return match.group(1).lower()
+
+
+def _read_cached_trace_metadata(cache_path, size):
+    try:
+        with open(cache_path, 'r') as f:
+            obj = json.load(f)
+
+        if obj['version'] != _CACHE_VERSION or obj['size'] != size:
+            return None
+
+        return TraceMetadata.new_from_native_object(obj['metadata'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cached_trace_metadata(cache_path, size, trace_metadata):
+    obj = {
+        'version': _CACHE_VERSION,
+        'size': size,
+        'metadata': trace_metadata.to_native_object(),
+    }
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+        with open(cache_path, 'w') as f:
+            json.dump(obj, f)
+    except OSError:
+        # the cache is optional (read-only trace, for example)
+        pass
+
+
+def get_trace_metadata(path, cache_dir=None):
+    """Get information about a trace from its metadata file.
+
+    The information is cached in memory and, if `cache_dir` is set,
+    on disk, per trace UUID. The cache is discarded when the size of
+    the metadata file changes, for example when new event classes are
+    added to a live trace.
+
+    Args:
+        path (str): path of the metadata file.
+
+        cache_dir (str): directory in which to cache the information,
+        or None.
+
+    Returns:
+        A TraceMetadata object.
+
+    Raises:
+        ValueError: if the metadata is malformed.
+    """
+    size = os.path.getsize(path)
+    trace_uuid = read_uuid(path)
+    cache_path = None
+
+    if trace_uuid is not None:
+        cached = _trace_metadata_cache.get(trace_uuid)
+
+        if cached is not None and cached[0] == size:
+            return cached[1]
+
+        if cache_dir is not None:
+            cache_path = os.path.join(cache_dir,
+                                      'metadata-{}.json'.format(trace_uuid))
+            trace_metadata = _read_cached_trace_metadata(cache_path, size)
+
+            if trace_metadata is not None:
+                _trace_metadata_cache[trace_uuid] = (size, trace_metadata)
+                return trace_metadata
+
+    trace_metadata = TraceMetadata.new_from_metadata(read_metadata(path))
+
+    if trace_uuid is not None:
+        _trace_metadata_cache[trace_uuid] = (size, trace_metadata)
+
+        if cache_path is not None:
+            _write_cached_trace_metadata(cache_path, size, trace_metadata)
+
+    return trace_metadata
@@ -21,3 +21,32 @@
 # SOFTWARE.
 
 NSEC_PER_SEC = 1000000000
+
+
+def get_time_shards(begin_ts, end_ts, count):
+    """Split a time range into consecutive, non-overlapping shards.
+
+    Args:
+        begin_ts (int): beginning timestamp of the time range (ns).
+
+        end_ts (int): end timestamp of the time range (ns), inclusive.
+
+        count (int): number of shards to create.
+
+    Returns:
+        A list of (begin_ts, end_ts) tuples, both ends inclusive,
+        sorted chronologically. Less than `count` shards are returned
+        if the time range is too small to be split `count` times.
+    """
+    if count < 1:
+        raise ValueError('invalid shard count: {}'.format(count))
+
+    bounds = [begin_ts + (end_ts - begin_ts + 1) * i // count
+              for i in range(count + 1)]
+    shards = []
+
+    for shard_begin_ts, next_begin_ts in zip(bounds, bounds[1:]):
+        if next_begin_ts > shard_begin_ts:
+            shards.append((shard_begin_ts, next_begin_ts - 1))
+
+    return shards
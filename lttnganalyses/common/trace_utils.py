@@ -22,14 +22,17 @@
 
 import time
 import datetime
-import subprocess
-import sys
+import os
 from .version_utils import Version
 from .time_utils import NSEC_PER_SEC
 
 
 BT_INTERSECT_VERSION = Version(1, 4, 0)
 
+# Name of the directory, within a trace directory, in which LTTng
+# analyses cache data about the trace
+CACHE_DIR_NAME = '.lttng-analyses-cache'
+
 
 def is_multi_day_trace_collection_bt_1_3_2(collection, handles=None):
     """is_multi_day_trace_collection for BT < 1.3.3.
@@ -149,17 +152,33 @@ def get_syscall_name(event):
         raise ValueError('Not a syscall event')
 
 
-def read_babeltrace_version():
-    try:
-        output = subprocess.check_output('babeltrace')
-    except subprocess.CalledProcessError:
-        raise ValueError('Could not run babeltrace to verify version')
+def get_event_cb(cbs, name):
+    """Get the callback handling the events of a given name.
+
+    Callbacks are looked up by event name first. Otherwise, the
+    'syscall_entry' and 'syscall_exit' callbacks handle all the
+    system call entry and exit events, whatever their prefix.
+
+    Args:
+        cbs (dict): callbacks indexed by event name, or by
+        'syscall_entry' or 'syscall_exit'.
+
+        name (str): the name of the event.
+
+    Returns:
+        The callback handling the events named `name`, or None if
+        there's none.
+    """
+    if name in cbs:
+        return cbs[name]
+
+    if name.startswith('sys_') or name.startswith('syscall_entry_'):
+        return cbs.get('syscall_entry')
 
-    output = output.decode(sys.stdout.encoding)
-    first_line = output.splitlines()[0]
-    version_string = first_line.split()[-1]
+    if name.startswith('exit_syscall') or name.startswith('syscall_exit_'):
+        return cbs.get('syscall_exit')
 
-    return Version.new_from_string(version_string)
+    return None
 
 
 def check_field_exists(handles, ev_name, field_name):
@@ -201,3 +220,15 @@ def check_event_exists(handles, name):
             if event.name == name:
                 return True
     return False
+
+
+def get_cache_dir(trace_path):
+    """Get the path of the cache directory of a trace.
+
+    Args:
+        trace_path (str): path of the trace (collection).
+
+    Returns:
+        The path of the cache directory, which may not exist.
+    """
+    return os.path.join(trace_path, CACHE_DIR_NAME)
@@ -21,6 +21,7 @@
 # SOFTWARE.
 
 from . import period as core_period
+from ..common import trace_utils
 import enum
 
 
@@ -31,9 +32,26 @@ class AnalysisConfig:
         self.end_ts = None
         self.min_duration = None
         self.max_duration = None
+        # Bounds of the size of the I/O requests, in bytes, which the
+        # I/O analysis tracks for top reports (see top_limit)
+        self.min_size = None
+        self.max_size = None
         self.proc_list = None
         self.tid_list = None
         self.cpu_list = None
+        # Whether the analyses keep each event they measure, or only
+        # the statistics and histograms of their durations, in order to
+        # use a constant amount of memory.
+        self.keep_events = True
+        # Number of items with the greatest durations which the
+        # analyses track as events arrive, for top reports, or None
+        # not to track them.
+        self.top_limit = None
+        # Whether the analyses run over a time shard which follows
+        # another one in a parallel run, in which case the state at the
+        # beginning of the shard (FDs opened before it, for example)
+        # must be accounted for as if the previous events were analyzed.
+        self.follows_time_shard = False
         self.period_def_registry = core_period.PeriodDefinitionRegistry()
 
 
@@ -53,6 +71,10 @@ class AnalysisCallbackType(enum.Enum):
 
 
 class Analysis:
+    # True if this analysis implements _merge_period_data(), that is,
+    # if it can run over separate time shards of a trace in parallel
+    MERGEABLE = False
+
     def __init__(self, state, conf, state_cbs):
         self._state = state
         self._conf = conf
@@ -62,6 +84,10 @@ class Analysis:
         self._last_event_ts = None
         self._notification_cli_cbs = {}
         self._cbs = {}
+
+        # event name to the callback of self._cbs which handles the
+        # events of this name, or None
+        self._event_cbs = {}
         period_cbs = {
             core_period.PeriodEngineCallbackType.PERIOD_BEGIN:
                 self._on_period_begin,
@@ -90,6 +116,21 @@ class Analysis:
     def last_event_ts(self):
         return self._last_event_ts
 
+    # Names of the state notifications which this analysis handles
+    @property
+    def notification_names(self):
+        return set(self._state_cbs.keys())
+
+    # Returns True if this analysis needs the fields of the events named
+    # `name`. The analysis needs the timestamps of all the events
+    # anyway.
+    def consumes_event(self, name):
+        # any event can begin or end a period
+        if not self._conf.period_def_registry.is_empty:
+            return True
+
+        return trace_utils.get_event_cb(self._cbs, name) is not None
+
     def period_nesting_level(self, period_name):
         if self._conf.period_def_registry.is_empty or period_name is None:
             return 0
@@ -137,6 +178,13 @@ class Analysis:
     def _create_period_data(self):
         raise NotImplementedError()
 
+    # Merges `other`, a period data object filled by another instance
+    # of this analysis over the time range following the one of
+    # `period_data`, into `period_data`. This must be implemented by a
+    # specific analysis which sets MERGEABLE.
+    def _merge_period_data(self, period_data, other):
+        raise NotImplementedError()
+
     def _begin_period_cb(self, period_data):
         pass
 
@@ -188,6 +236,15 @@ class Analysis:
         # remove this period data object
         self._remove_period_data(period)
 
+    # Replaces each event callback by `wrap(name, cb)`, where `name`
+    # is the name of the consumed event, and the period engine's event
+    # processing function by `wrap('period engine', fn)`.
+    def wrap_cbs(self, wrap):
+        self._cbs = {name: wrap(name, cb) for name, cb in self._cbs.items()}
+        self._event_cbs.clear()
+        self._period_engine.process_event = wrap(
+            'period engine', self._period_engine.process_event)
+
     # This is called by the owner of this analysis when an event must
     # be processed (`ev`).
     def process_event(self, ev):
@@ -212,7 +269,8 @@ class Analysis:
         # back _on_period_begin() or _on_period_end(), zero or more
         # times, for each beginning and ending period according to the
         # registered period definitions.
-        self._period_engine.process_event(ev)
+        if not self._conf.period_def_registry.is_empty:
+            self._period_engine.process_event(ev)
 
         # check the refresh period conditions
         self._check_refresh(ev)
@@ -260,6 +318,38 @@ class Analysis:
         self._send_notification_cb(AnalysisCallbackType.TICK_CB, None,
                                    end_ns=self._last_event_ts)
 
+    # Called by the owner of this analysis, instead of feeding it
+    # events, to combine the results of other instances of this
+    # analysis which ran over consecutive time shards of the same
+    # trace. `shard_results` is a chronologically sorted list of
+    # (period data, last event timestamp) tuples, where the period data
+    # object is None for a shard without any analyzed event.
+    def merge_shards(self, shard_results):
+        merged_period_data = None
+
+        for period_data, last_event_ts in shard_results:
+            if period_data is None:
+                continue
+
+            self._last_event_ts = last_event_ts
+
+            if merged_period_data is None:
+                self._first_event_ts = period_data.period.begin_evt.timestamp
+                merged_period_data = period_data
+            else:
+                self._merge_period_data(merged_period_data, period_data)
+
+        self.started = True
+        self.ended = True
+
+        if merged_period_data is not None:
+            self._send_notification_cb(AnalysisCallbackType.TICK_CB,
+                                       merged_period_data,
+                                       end_ns=self._last_event_ts)
+
+        self._send_notification_cb(AnalysisCallbackType.TICK_CB, None,
+                                   end_ns=self._last_event_ts)
+
     def register_notification_cbs(self, cbs):
         for name in cbs:
             if name not in self._notification_cli_cbs:
@@ -274,19 +364,19 @@ class Analysis:
 
     def _register_cbs(self, cbs):
         self._cbs = cbs
+        self._event_cbs.clear()
 
     def _process_event_cb(self, ev):
         name = ev.name
 
-        if name in self._cbs:
-            self._cbs[name](ev)
-        elif 'syscall_entry' in self._cbs and \
-             (name.startswith('sys_') or name.startswith('syscall_entry_')):
-            self._cbs['syscall_entry'](ev)
-        elif 'syscall_exit' in self._cbs and \
-                (name.startswith('exit_syscall') or
-                 name.startswith('syscall_exit_')):
-            self._cbs['syscall_exit'](ev)
+        try:
+            cb = self._event_cbs[name]
+        except KeyError:
+            cb = trace_utils.get_event_cb(self._cbs, name)
+            self._event_cbs[name] = cb
+
+        if cb is not None:
+            cb(ev)
 
     def _check_analysis_begin(self, ev):
         if self._conf.begin_ts and ev.timestamp >= self._conf.begin_ts:
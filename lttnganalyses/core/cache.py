@@ -0,0 +1,567 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import array
+import collections
+import hashlib
+import mmap
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import babeltrace as bt
+from . import event as core_event
+from ..common import trace_utils
+
+
+# Version of the on-disk format, part of the cache key
+_FORMAT_VERSION = 2
+
+# Number of rows kept in memory by a column before being appended to
+# its file
+_FLUSH_ROW_COUNT = 65536
+
+# Scopes of which the fields are cached in columns. The packet header
+# fields are not cached. The packet context fields, which are the same
+# for all the events of a packet, are cached once per distinct packet
+# context, and each event refers to its packet context by ID.
+_CACHED_SCOPES = (
+    bt.CTFScope.EVENT_FIELDS,
+    bt.CTFScope.EVENT_CONTEXT,
+    bt.CTFScope.STREAM_EVENT_CONTEXT,
+)
+
+_INDEX_FILE_NAME = 'index.pickle'
+_TIMESTAMPS_FILE_NAME = 'timestamps'
+_PACKET_IDS_FILE_NAME = 'packet-ids'
+_CLASS_IDS_FILE_NAME = 'class-ids'
+
+# Column kinds: 64-bit integers, 64-bit floats, UTF-8 strings, and
+# pickled objects.
+_KIND_INT = 'q'
+_KIND_FLOAT = 'd'
+_KIND_STR = 's'
+_KIND_OBJ = 'o'
+
+_INT_MIN = -(1 << 63)
+_INT_MAX = (1 << 63) - 1
+_UINT_MAX = (1 << 64) - 1
+
+
+# Description of a cached field column.
+#
+# `unsigned` is True if 64-bit unsigned integers which do not fit in a
+# signed integer were stored in the column: the column's negative
+# values are then converted back to unsigned values when they are
+# read. `exceptions` maps row indexes to values which do not fit the
+# column's kind.
+_ColumnDesc = collections.namedtuple('_ColumnDesc', [
+    'scope',
+    'name',
+    'kind',
+    'unsigned',
+    'exceptions',
+])
+
+
+# Description of a cached event class: a distinct event name and field
+# layout.
+_ClassDesc = collections.namedtuple('_ClassDesc', [
+    'name',
+    'columns',
+])
+
+
+def get_trace_key(trace_path, *values):
+    """Get a key identifying the content of a trace.
+
+    The key depends on the metadata (which contains the UUID of the
+    trace) and on the sizes of the files of the trace, so that data
+    cached with this key is not reused for a modified trace.
+
+    Args:
+        trace_path (str): path of the trace (collection).
+
+        values: additional values of which the key depends.
+
+    Returns:
+        The key, as a string of hexadecimal digits.
+    """
+
+    key = hashlib.sha1(' '.join(str(value) for value in values).encode())
+
+    for root, dirs, files in os.walk(trace_path):
+        if root == trace_path and trace_utils.CACHE_DIR_NAME in dirs:
+            dirs.remove(trace_utils.CACHE_DIR_NAME)
+
+        dirs.sort()
+
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, trace_path)
+            key.update('{} {}\n'.format(rel_path,
+                                        os.path.getsize(path)).encode())
+
+            if name == 'metadata':
+                with open(path, 'rb') as f:
+                    key.update(f.read())
+
+    return key.hexdigest()
+
+
+def get_event_cache_path(trace_path, intersect_mode):
+    """Get the path of the decoded event cache of a trace.
+
+    The name of the cache depends on the cache format version and on
+    the content of the trace (see get_trace_key()).
+
+    Args:
+        trace_path (str): path of the trace (collection).
+        intersect_mode (bool): whether the events are read in stream
+        intersection mode.
+
+    Returns:
+        The path of the cache directory, which may not exist.
+    """
+
+    key = get_trace_key(trace_path, _FORMAT_VERSION, sys.byteorder,
+                        array.array('q').itemsize, bool(intersect_mode))
+
+    return os.path.join(trace_utils.get_cache_dir(trace_path),
+                        'events-' + key)
+
+
+def _map_array(path, typecode):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return array.array(typecode)
+
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return memoryview(mapping).cast(typecode)
+
+
+def _map_bytes(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _ArrayWriter:
+    def __init__(self, path, typecode):
+        self._path = path
+        self._typecode = typecode
+        self.values = array.array(typecode)
+
+    def flush(self):
+        with open(self._path, 'ab') as f:
+            self.values.tofile(f)
+
+        self.values = array.array(self._typecode)
+
+
+class _ColumnWriter:
+    def __init__(self, path, scope, name):
+        self._path = path
+        self._scope = scope
+        self._name = name
+        self._kind = None
+        self._unsigned = False
+        self._exceptions = {}
+        self._row_count = 0
+        self._values = None
+        self._offsets = None
+        self._offset = 0
+
+    def _set_kind(self, value):
+        value_type = type(value)
+
+        if value_type is int:
+            self._kind = _KIND_INT
+            self._values = _ArrayWriter(self._path, 'q')
+        elif value_type is float:
+            self._kind = _KIND_FLOAT
+            self._values = _ArrayWriter(self._path, 'd')
+        elif value_type is str:
+            self._kind = _KIND_STR
+            self._values = bytearray()
+            self._offsets = _ArrayWriter(self._path + '.off', 'q')
+        else:
+            self._kind = _KIND_OBJ
+            self._values = []
+
+    def append(self, value):
+        if self._kind is None:
+            self._set_kind(value)
+
+        row = self._row_count
+        self._row_count += 1
+        value_type = type(value)
+
+        if self._kind == _KIND_INT:
+            if value_type is int and _INT_MIN <= value <= _UINT_MAX:
+                if value > _INT_MAX:
+                    value -= 1 << 64
+                    self._unsigned = True
+            else:
+                self._exceptions[row] = value
+                value = 0
+
+            self._values.values.append(value)
+        elif self._kind == _KIND_FLOAT:
+            if value_type is not float:
+                self._exceptions[row] = value
+                value = 0.
+
+            self._values.values.append(value)
+        elif self._kind == _KIND_STR:
+            if value_type is str:
+                data = value.encode('utf-8', 'surrogateescape')
+                self._values += data
+                self._offset += len(data)
+            else:
+                self._exceptions[row] = value
+
+            self._offsets.values.append(self._offset)
+        else:
+            self._values.append(value)
+
+        if row % _FLUSH_ROW_COUNT == _FLUSH_ROW_COUNT - 1:
+            self.flush()
+
+    def flush(self):
+        if self._kind in (_KIND_INT, _KIND_FLOAT):
+            self._values.flush()
+        elif self._kind == _KIND_STR:
+            with open(self._path, 'ab') as f:
+                f.write(self._values)
+
+            self._values = bytearray()
+            self._offsets.flush()
+
+    def close(self):
+        self.flush()
+
+        if self._kind == _KIND_OBJ:
+            with open(self._path, 'wb') as f:
+                pickle.dump(self._values, f, pickle.HIGHEST_PROTOCOL)
+
+        return _ColumnDesc(self._scope, self._name, self._kind,
+                           self._unsigned, self._exceptions)
+
+
+class EventCacheWriter:
+    """Writer of a decoded event cache.
+
+    The cache is written to a temporary directory next to its final
+    path, and moved to its final path by close().
+
+    Args:
+        path (str): path of the cache directory, as returned by
+        get_event_cache_path().
+    """
+
+    def __init__(self, path):
+        self._path = path
+        parent_path = os.path.dirname(path)
+        os.makedirs(parent_path, exist_ok=True)
+        self._tmp_path = tempfile.mkdtemp(prefix='tmp-', dir=parent_path)
+        self._timestamps = self._create_array_writer(_TIMESTAMPS_FILE_NAME)
+        self._packet_ids = self._create_array_writer(_PACKET_IDS_FILE_NAME)
+        self._class_ids = self._create_array_writer(_CLASS_IDS_FILE_NAME)
+        self._event_count = 0
+
+        # event class key to (class ID, column writers)
+        self._classes = {}
+        self._class_names = []
+
+        # packet context key to packet context ID
+        self._packet_contexts = {}
+        self._packet_context_list = []
+
+    def _create_array_writer(self, name):
+        return _ArrayWriter(os.path.join(self._tmp_path, name), 'q')
+
+    def _get_class(self, name, fields):
+        key = (name, tuple((scope, field_name)
+                           for scope, field_name, _ in fields))
+        cls = self._classes.get(key)
+
+        if cls is None:
+            class_id = len(self._classes)
+            columns = []
+
+            for index, (scope, field_name, _) in enumerate(fields):
+                path = os.path.join(self._tmp_path,
+                                    'c{}-{}'.format(class_id, index))
+                columns.append(_ColumnWriter(path, scope, field_name))
+
+            cls = (class_id, columns)
+            self._classes[key] = cls
+            self._class_names.append(name)
+
+        return cls
+
+    def _get_packet_context_id(self, event):
+        scope = bt.CTFScope.STREAM_PACKET_CONTEXT
+        packet_context = tuple(
+            (field_name, event.field_with_scope(field_name, scope))
+            for field_name in event.field_list_with_scope(scope))
+
+        key = packet_context
+
+        try:
+            hash(key)
+        except TypeError:
+            # array or sequence field
+            key = repr(packet_context)
+
+        packet_context_id = self._packet_contexts.get(key)
+
+        if packet_context_id is None:
+            packet_context_id = len(self._packet_context_list)
+            self._packet_contexts[key] = packet_context_id
+            self._packet_context_list.append(dict(packet_context))
+
+        return packet_context_id
+
+    def append(self, event):
+        """Append an event to the cache.
+
+        Args:
+            event: a babeltrace event or a core Event.
+        """
+
+        fields = []
+
+        for scope in _CACHED_SCOPES:
+            for field_name in event.field_list_with_scope(scope):
+                fields.append((scope, field_name,
+                               event.field_with_scope(field_name, scope)))
+
+        packet_context_id = self._get_packet_context_id(event)
+        class_id, columns = self._get_class(event.name, fields)
+
+        for column, (_, _, value) in zip(columns, fields):
+            column.append(value)
+
+        self._timestamps.values.append(event.timestamp)
+        self._packet_ids.values.append(packet_context_id)
+        self._class_ids.values.append(class_id)
+        self._event_count += 1
+
+        if self._event_count % _FLUSH_ROW_COUNT == 0:
+            self._flush()
+
+    def record(self, events):
+        """Append events to the cache while yielding them.
+
+        Args:
+            events: an iterable of events.
+        """
+
+        for event in events:
+            self.append(event)
+            yield event
+
+    def _flush(self):
+        self._timestamps.flush()
+        self._packet_ids.flush()
+        self._class_ids.flush()
+
+    def close(self):
+        """Complete the cache and move it to its final path.
+
+        If a cache was concurrently created at the same path, this
+        cache is discarded.
+        """
+
+        self._flush()
+        class_descs = [None] * len(self._classes)
+
+        for class_id, columns in self._classes.values():
+            column_descs = [column.close() for column in columns]
+            class_descs[class_id] = _ClassDesc(self._class_names[class_id],
+                                               column_descs)
+
+        index = {
+            'version': _FORMAT_VERSION,
+            'event-count': self._event_count,
+            # plain tuples, so that the index does not depend on the
+            # names of this module's classes
+            'classes': [(desc.name, [tuple(col) for col in desc.columns])
+                        for desc in class_descs],
+            'packet-contexts': self._packet_context_list,
+        }
+
+        with open(os.path.join(self._tmp_path, _INDEX_FILE_NAME), 'wb') as f:
+            pickle.dump(index, f, pickle.HIGHEST_PROTOCOL)
+
+        try:
+            os.rename(self._tmp_path, self._path)
+        except OSError:
+            self.discard()
+
+    def discard(self):
+        """Remove the incomplete cache."""
+
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+
+
+class _ColumnReader:
+    def __init__(self, path, desc):
+        self._desc = desc
+        kind = desc.kind
+
+        if kind in (_KIND_INT, _KIND_FLOAT):
+            self._values = _map_array(path, kind)
+        elif kind == _KIND_STR:
+            self._values = _map_bytes(path)
+            self._offsets = _map_array(path + '.off', 'q')
+        elif kind == _KIND_OBJ:
+            with open(path, 'rb') as f:
+                self._values = pickle.load(f)
+
+        if kind == _KIND_STR:
+            get = self._get_str
+        elif kind == _KIND_INT and desc.unsigned:
+            get = self._get_uint
+        else:
+            get = self._values.__getitem__
+
+        if desc.exceptions:
+            def get_with_exceptions(row):
+                if row in desc.exceptions:
+                    return desc.exceptions[row]
+
+                return get(row)
+
+            self.get = get_with_exceptions
+        else:
+            self.get = get
+
+    @property
+    def scope(self):
+        return self._desc.scope
+
+    @property
+    def name(self):
+        return self._desc.name
+
+    def _get_uint(self, row):
+        value = self._values[row]
+
+        if value < 0:
+            value += 1 << 64
+
+        return value
+
+    def _get_str(self, row):
+        begin = self._offsets[row - 1] if row > 0 else 0
+        end = self._offsets[row]
+
+        return self._values[begin:end].decode('utf-8', 'surrogateescape')
+
+
+class EventCacheReader:
+    """Reader of a decoded event cache.
+
+    The events are replayed in the order in which they were written,
+    as core Event objects.
+
+    Args:
+        path (str): path of the cache directory.
+        event_names (set): names of the events of which the fields are
+        needed, or None for all of them. The other events have no
+        fields.
+    """
+
+    def __init__(self, path, event_names=None):
+        self._path = path
+        self._event_names = event_names
+
+        with open(os.path.join(path, _INDEX_FILE_NAME), 'rb') as f:
+            index = pickle.load(f)
+
+        if index['version'] != _FORMAT_VERSION:
+            raise ValueError('Unsupported event cache format version: '
+                             '{}'.format(index['version']))
+
+        self._event_count = index['event-count']
+        self._packet_contexts = index['packet-contexts']
+        self._class_descs = []
+
+        for name, columns in index['classes']:
+            column_descs = [_ColumnDesc(*col) for col in columns]
+            self._class_descs.append(_ClassDesc(name, column_descs))
+
+    @staticmethod
+    def exists(path):
+        return os.path.isfile(os.path.join(path, _INDEX_FILE_NAME))
+
+    def _map_file(self, name):
+        return _map_array(os.path.join(self._path, name), 'q')
+
+    def _get_class_columns(self, class_id, class_desc):
+        if self._event_names is not None and \
+                class_desc.name not in self._event_names:
+            return None
+
+        columns = []
+
+        for index, desc in enumerate(class_desc.columns):
+            path = os.path.join(self._path, 'c{}-{}'.format(class_id, index))
+            columns.append(_ColumnReader(path, desc))
+
+        return columns
+
+    @property
+    def events(self):
+        timestamps = self._map_file(_TIMESTAMPS_FILE_NAME)
+        packet_ids = self._map_file(_PACKET_IDS_FILE_NAME)
+        packet_contexts = self._packet_contexts
+        class_ids = self._map_file(_CLASS_IDS_FILE_NAME)
+        names = [desc.name for desc in self._class_descs]
+        columns = [self._get_class_columns(class_id, desc)
+                   for class_id, desc in enumerate(self._class_descs)]
+        rows = [0] * len(self._class_descs)
+        spc_scope = bt.CTFScope.STREAM_PACKET_CONTEXT
+        new_event = core_event.Event.new_from_fields
+
+        for index in range(self._event_count):
+            class_id = class_ids[index]
+            row = rows[class_id]
+            rows[class_id] = row + 1
+            fields = {}
+            class_columns = columns[class_id]
+
+            if class_columns is not None:
+                fields[spc_scope] = packet_contexts[packet_ids[index]]
+
+                for column in class_columns:
+                    scope_fields = fields.setdefault(column.scope, {})
+                    scope_fields[column.name] = column.get(row)
+
+            yield new_event(names[class_id], timestamps[index], fields)
@@ -33,6 +33,8 @@ class _PeriodData(PeriodData):
 
 
 class Cputop(Analysis):
+    MERGEABLE = True
+
     def __init__(self, state, conf):
         notification_cbs = {
             'sched_migrate_task': self._process_sched_migrate_task,
@@ -46,6 +48,28 @@ class Cputop(Analysis):
     def _create_period_data(self):
         return _PeriodData()
 
+    def _merge_period_data(self, period_data, other):
+        for cpu_id, cpu in other.cpus.items():
+            if cpu_id not in period_data.cpus:
+                period_data.cpus[cpu_id] = cpu
+            else:
+                period_data.cpus[cpu_id].merge(cpu)
+
+        for tid, proc in other.tids.items():
+            if tid not in period_data.tids:
+                period_data.tids[tid] = proc
+            else:
+                period_data.tids[tid].merge(proc)
+
+        # Usage percentages are relative to the whole merged time range
+        duration = self.last_event_ts - period_data.period.begin_evt.timestamp
+
+        for cpu in period_data.cpus.values():
+            cpu.compute_stats(duration)
+
+        for proc in period_data.tids.values():
+            proc.compute_stats(duration)
+
     def _begin_period_cb(self, period_data):
         period = period_data.period
         period_data.period_begin_ts = period.begin_evt.timestamp
@@ -84,10 +108,10 @@ class Cputop(Analysis):
 
             proc.compute_stats(duration)
 
-    def _process_sched_switch_per_cpu(self, period_data, **kwargs):
-        timestamp = kwargs['timestamp']
-        cpu_id = kwargs['cpu_id']
-        wakee_proc = kwargs['wakee_proc']
+    def _process_sched_switch_per_cpu(self, period_data, notification):
+        timestamp = notification.timestamp
+        cpu_id = notification.cpu_id
+        wakee_proc = notification.wakee_proc
 
         if not self._filter_cpu(cpu_id):
             return
@@ -106,14 +130,14 @@ class Cputop(Analysis):
         else:
             cpu.current_task_start_ts = timestamp
 
-    def _process_sched_switch_per_tid(self, period_data, **kwargs):
-        cpu_id = kwargs['cpu_id']
-        wakee_proc = kwargs['wakee_proc']
-        timestamp = kwargs['timestamp']
-        prev_tid = kwargs['prev_tid']
-        next_tid = kwargs['next_tid']
-        next_comm = kwargs['next_comm']
-        prev_comm = kwargs['prev_comm']
+    def _process_sched_switch_per_tid(self, period_data, notification):
+        cpu_id = notification.cpu_id
+        wakee_proc = notification.wakee_proc
+        timestamp = notification.timestamp
+        prev_tid = notification.prev_tid
+        next_tid = notification.next_tid
+        next_comm = notification.next_comm
+        prev_comm = notification.prev_comm
 
         if not self._filter_cpu(cpu_id):
             return
@@ -144,9 +168,9 @@ class Cputop(Analysis):
         next_proc = period_data.tids[next_tid]
         next_proc.last_sched_ts = timestamp
 
-    def _process_sched_migrate_task(self, period_data, **kwargs):
-        cpu_id = kwargs['cpu_id']
-        proc = kwargs['proc']
+    def _process_sched_migrate_task(self, period_data, notification):
+        cpu_id = notification.cpu_id
+        proc = notification.proc
         tid = proc.tid
 
         if not self._filter_process(proc):
@@ -159,10 +183,10 @@ class Cputop(Analysis):
 
         period_data.tids[tid].migrate_count += 1
 
-    def _process_prio_changed(self, period_data, **kwargs):
-        timestamp = kwargs['timestamp']
-        prio = kwargs['prio']
-        tid = kwargs['tid']
+    def _process_prio_changed(self, period_data, notification):
+        timestamp = notification.timestamp
+        prio = notification.prio
+        tid = notification.tid
 
         if tid not in period_data.tids:
             return
@@ -191,6 +215,9 @@ class CpuUsageStats():
         else:
             self.usage_percent = 0
 
+    def merge(self, other):
+        self.total_usage_time += other.total_usage_time
+
     def reset(self):
         self.total_usage_time = 0
         self.usage_percent = None
@@ -212,6 +239,11 @@ class ProcessCpuStats(stats.Process):
         else:
             self.usage_percent = 0
 
+    def merge(self, other):
+        super().merge(other)
+        self.total_cpu_time += other.total_cpu_time
+        self.migrate_count += other.migrate_count
+
     def reset(self):
         super().reset()
         self.total_cpu_time = 0
@@ -41,11 +41,39 @@ class Event(collections.Mapping):
     def __init__(self, bt_ev):
         self._copy_bt_event(bt_ev)
 
+    # Creates an event with the name and timestamp of `bt_ev`, but
+    # without any field, for events of which only the timestamp
+    # matters.
+    @classmethod
+    def new_without_fields(cls, bt_ev):
+        event = cls.__new__(cls)
+        event._name = bt_ev.name
+        event._cycles = bt_ev.cycles
+        event._timestamp = bt_ev.timestamp
+        event._fields = {scope: {} for scope in _CTF_SCOPES}
+        event._flat_fields = {}
+
+        return event
+
+    # Creates an event from the fields of each scope in `fields`, a
+    # dictionary which may not contain all the scopes.
+    @classmethod
+    def new_from_fields(cls, name, timestamp, fields):
+        event = cls.__new__(cls)
+        event._name = name
+        event._cycles = None
+        event._timestamp = timestamp
+        event._fields = {scope: fields.get(scope, {}) for scope in _CTF_SCOPES}
+        event._flat_fields = None
+
+        return event
+
     def _copy_bt_event(self, bt_ev):
         self._name = bt_ev.name
         self._cycles = bt_ev.cycles
         self._timestamp = bt_ev.timestamp
         self._fields = {}
+        self._flat_fields = None
 
         for scope in _CTF_SCOPES:
             self._fields[scope] = {}
@@ -74,10 +102,20 @@ class Event(collections.Mapping):
     def trace_collection(self):
         raise NotImplementedError()
 
+    # Fields of all the scopes, built on first use. When several scopes
+    # contain a field with the same name, the first scope of
+    # _CTF_SCOPES wins.
+    def _get_flat_fields(self):
+        if self._flat_fields is None:
+            self._flat_fields = {}
+
+            for scope in reversed(_CTF_SCOPES):
+                self._flat_fields.update(self._fields[scope])
+
+        return self._flat_fields
+
     def _get_first_field(self, field_name):
-        for scope_fields in self._fields.values():
-            if field_name in scope_fields:
-                return scope_fields[field_name]
+        return self._get_flat_fields().get(field_name)
 
     def field_with_scope(self, field_name, scope):
         if scope not in self._fields:
@@ -133,3 +171,134 @@ class Event(collections.Mapping):
 
     def items(self):
         raise NotImplementedError()
+
+
+# Finds, once per event name, the scope of each field of the events,
+# so that getting a field of a babeltrace event does not search all
+# the scopes.
+#
+# Events with the same name may come from streams with different
+# contexts: the found scope of a field is only a hint, and the field
+# is searched in all the scopes when the event does not contain it in
+# this scope.
+class FieldAccessor:
+    def __init__(self):
+        # event name to a dictionary of field name to scope
+        self._field_scopes = {}
+
+    def _get_field_scopes(self, bt_ev):
+        name = bt_ev.name
+        field_scopes = self._field_scopes.get(name)
+
+        if field_scopes is None:
+            field_scopes = {}
+
+            for scope in reversed(_CTF_SCOPES):
+                for field_name in bt_ev.field_list_with_scope(scope):
+                    field_scopes[field_name] = scope
+
+            self._field_scopes[name] = field_scopes
+
+        return field_scopes
+
+    # Yields an AccessorEvent for each babeltrace event of `events`.
+    def wrap_events(self, events):
+        for bt_ev in events:
+            yield AccessorEvent(bt_ev, self._get_field_scopes(bt_ev))
+
+
+# This class has an interface which is compatible with the
+# babeltrace.reader.Event class. It wraps a babeltrace event, of which
+# it gets each field at most once, in its scope found by a
+# FieldAccessor. All the users of the event share the values of the
+# fields.
+#
+# Like the wrapped event, an AccessorEvent is only valid until the
+# next event is read.
+class AccessorEvent(collections.Mapping):
+    def __init__(self, bt_ev, field_scopes):
+        self._bt_ev = bt_ev
+        self._field_scopes = field_scopes
+        self._name = bt_ev.name
+        self._timestamp = bt_ev.timestamp
+        self._values = {}
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def cycles(self):
+        return self._bt_ev.cycles
+
+    @property
+    def timestamp(self):
+        return self._timestamp
+
+    @property
+    def handle(self):
+        return self._bt_ev.handle
+
+    @property
+    def trace_collection(self):
+        return self._bt_ev.trace_collection
+
+    def _get_first_field(self, field_name):
+        try:
+            return self._values[field_name]
+        except KeyError:
+            pass
+
+        field = None
+        scope = self._field_scopes.get(field_name)
+
+        if scope is not None:
+            field = self._bt_ev.field_with_scope(field_name, scope)
+
+        if field is None:
+            for scope in _CTF_SCOPES:
+                field = self._bt_ev.field_with_scope(field_name, scope)
+
+                if field is not None:
+                    break
+
+        self._values[field_name] = field
+
+        return field
+
+    def field_with_scope(self, field_name, scope):
+        return self._bt_ev.field_with_scope(field_name, scope)
+
+    def field_list_with_scope(self, scope):
+        return self._bt_ev.field_list_with_scope(scope)
+
+    def __getitem__(self, field_name):
+        field = self._get_first_field(field_name)
+
+        if field is None:
+            raise KeyError(field_name)
+
+        return field
+
+    def __iter__(self):
+        return iter(self._bt_ev.keys())
+
+    def __len__(self):
+        return len(self._bt_ev)
+
+    def __contains__(self, field_name):
+        return self._get_first_field(field_name) is not None
+
+    def keys(self):
+        return self._bt_ev.keys()
+
+    def get(self, field_name, default=None):
+        field = self._get_first_field(field_name)
+
+        if field is None:
+            return default
+
+        return field
+
+    def items(self):
+        raise NotImplementedError()
@@ -25,14 +25,36 @@ from .analysis import Analysis, PeriodData
 from ..linuxautomaton import sv
 
 
+# Columns of the I/O requests of the DiskStats objects
+_RQ_COLUMNS = ('begin_ts', 'duration', 'size', 'op')
+# Columns of the system call I/O requests of the ProcessIOStats objects
+_SYSCALL_RQ_COLUMNS = _RQ_COLUMNS + ('fd', 'syscall_name')
+
+
+# Operations of the system call I/O requests of the top reports
+_TOP_OPERATIONS = (sv.IORequest.OP_OPEN, sv.IORequest.OP_READ,
+                   sv.IORequest.OP_WRITE, sv.IORequest.OP_SYNC)
+
+
 class _PeriodData(PeriodData):
-    def __init__(self):
+    def __init__(self, top_limit):
         self.disks = {}
         self.ifaces = {}
         self.tids = {}
+        # Operation to the (proc_stats, io_rq) tuples of the system call
+        # I/O requests with the greatest durations, only tracked if the
+        # analysis has a top limit. The top tables have one more row
+        # than the limit.
+        self.top_requests = None
+
+        if top_limit is not None:
+            self.top_requests = {op: stats.TopK(top_limit + 1)
+                                 for op in _TOP_OPERATIONS}
 
 
 class IoAnalysis(Analysis):
+    MERGEABLE = True
+
     def __init__(self, state, conf):
         notification_cbs = {
             'net_dev_xmit': self._process_net_dev_xmit,
@@ -55,13 +77,35 @@ class IoAnalysis(Analysis):
         self._process_event_cb(ev)
 
     def _create_period_data(self):
-        return _PeriodData()
+        return _PeriodData(self._conf.top_limit)
+
+    def _merge_period_data(self, period_data, other):
+        for dev, disk_stats in other.disks.items():
+            if dev not in period_data.disks:
+                period_data.disks[dev] = disk_stats
+            else:
+                period_data.disks[dev].merge(disk_stats)
+
+        for name, iface_stats in other.ifaces.items():
+            if name not in period_data.ifaces:
+                period_data.ifaces[name] = iface_stats
+            else:
+                period_data.ifaces[name].merge(iface_stats)
+
+        for tid, proc_stats in other.tids.items():
+            if tid not in period_data.tids:
+                period_data.tids[tid] = proc_stats
+            else:
+                period_data.tids[tid].merge(
+                    proc_stats, other.period.begin_evt.timestamp)
+
+        if period_data.top_requests is not None:
+            for op, top_requests in other.top_requests.items():
+                period_data.top_requests[op].merge(top_requests)
 
-    @property
     def disk_io_requests(self, period_data):
         for disk in period_data.disks.values():
-            for io_rq in disk.rq_list:
-                yield io_rq
+            yield disk, range(len(disk.requests))
 
     def io_requests(self, period_data):
         return self._get_io_requests(period_data)
@@ -84,22 +128,53 @@ class IoAnalysis(Analysis):
     def read_write_io_requests(self, period_data):
         return self._get_io_requests(period_data, sv.IORequest.OP_READ_WRITE)
 
+    # Returns the (proc_stats, io_rq) tuples of the system call I/O
+    # requests of operation `io_operation` (one of _TOP_OPERATIONS)
+    # with the greatest durations, the greatest first, or None if the
+    # analysis does not track them. `io_rq` is a dictionary with the
+    # same keys as the rows of the `requests` column store of
+    # `proc_stats`.
+    def top_io_requests(self, period_data, io_operation):
+        if period_data.top_requests is None:
+            return None
+
+        return [(proc_stats, self._get_io_rq_row(io_rq))
+                for proc_stats, io_rq in
+                period_data.top_requests[io_operation].items()]
+
+    @staticmethod
+    def _get_io_rq_row(io_rq):
+        return {
+            'begin_ts': io_rq.begin_ts,
+            'duration': io_rq.duration,
+            'size': io_rq.size,
+            'op': io_rq.operation,
+            'fd': io_rq.fd,
+            'syscall_name': io_rq.syscall_name,
+        }
+
     def _get_io_requests(self, period_data, io_operation=None):
         """Create a generator of syscall io requests by operation.
 
+        The generated items are (proc_stats, rq_ids) tuples, where
+        rq_ids are the ids of the matching requests in the
+        proc_stats.requests column store.
+
         Args:
             io_operation (IORequest.OP_*, optional): The operation of
             the io_requests to return. Return all IO requests if None.
         """
         for proc in period_data.tids.values():
-            for io_rq in proc.rq_list:
-                if isinstance(io_rq, sv.BlockIORequest):
-                    continue
+            ops = proc.requests.column('op')
+
+            if io_operation is None:
+                rq_ids = range(len(ops))
+            else:
+                rq_ids = [rq_id for rq_id, op in enumerate(ops) if
+                          sv.IORequest.is_equivalent_operation(io_operation,
+                                                               op)]
 
-                if io_operation is None or \
-                   sv.IORequest.is_equivalent_operation(io_operation,
-                                                        io_rq.operation):
-                    yield io_rq
+            yield proc, rq_ids
 
     def get_files_stats(self, period_data):
         files_stats = {}
@@ -135,9 +210,9 @@ class IoAnalysis(Analysis):
             for fd in toremove:
                 del proc.fds[fd]
 
-    def _process_net_dev_xmit(self, period_data, **kwargs):
-        name = kwargs['iface_name']
-        sent_bytes = kwargs['sent_bytes']
+    def _process_net_dev_xmit(self, period_data, notification):
+        name = notification.iface_name
+        sent_bytes = notification.size
 
         if name not in period_data.ifaces:
             period_data.ifaces[name] = IfaceStats(name)
@@ -145,9 +220,9 @@ class IoAnalysis(Analysis):
         period_data.ifaces[name].sent_packets += 1
         period_data.ifaces[name].sent_bytes += sent_bytes
 
-    def _process_netif_receive_skb(self, period_data, **kwargs):
-        name = kwargs['iface_name']
-        recv_bytes = kwargs['recv_bytes']
+    def _process_netif_receive_skb(self, period_data, notification):
+        name = notification.iface_name
+        recv_bytes = notification.size
 
         if name not in period_data.ifaces:
             period_data.ifaces[name] = IfaceStats(name)
@@ -155,15 +230,15 @@ class IoAnalysis(Analysis):
         period_data.ifaces[name].recv_packets += 1
         period_data.ifaces[name].recv_bytes += recv_bytes
 
-    def _process_block_rq_complete(self, period_data, **kwargs):
-        req = kwargs['req']
-        proc = kwargs['proc']
-        disk = kwargs['disk']
+    def _process_block_rq_complete(self, period_data, notification):
+        req = notification.req
+        proc = notification.proc
+        disk = notification.disk
 
         if disk.dev not in period_data.disks:
             period_data.disks[disk.dev] = DiskStats.new_from_disk(disk)
 
-        period_data.disks[disk.dev].update_stats(req)
+        period_data.disks[disk.dev].update_stats(req, self._conf.keep_events)
 
         if proc is not None:
             if proc.tid not in period_data.tids:
@@ -172,10 +247,32 @@ class IoAnalysis(Analysis):
 
             period_data.tids[proc.tid].update_block_stats(req)
 
-    def _process_io_rq_exit(self, period_data, **kwargs):
-        proc = kwargs['proc']
-        parent_proc = kwargs['parent_proc']
-        io_rq = kwargs['io_rq']
+    # Returns the FDStats object of the FD `fd` of `parent_proc`. In a
+    # time shard which follows another one, it is created from the
+    # current state if this FD was opened before the beginning of the
+    # shard, so that the requests on FDs opened during a previous
+    # shard are not dropped. Otherwise, like a sequential run, the
+    # requests on FDs opened before the analysis are ignored.
+    def _get_fd_stats(self, period_data, parent_stats, parent_proc, fd):
+        fd_stats = parent_stats.get_fd(fd)
+
+        if fd_stats is not None or fd not in parent_proc.fds or \
+                not self._conf.follows_time_shard:
+            return fd_stats
+
+        if fd not in parent_stats.fds:
+            parent_stats.fds[fd] = []
+
+        fd_stats = FDStats.new_from_fd(parent_proc.fds[fd],
+                                       period_data.period.begin_evt.timestamp)
+        parent_stats.fds[fd].append(fd_stats)
+
+        return fd_stats
+
+    def _process_io_rq_exit(self, period_data, notification):
+        proc = notification.proc
+        parent_proc = notification.parent_proc
+        io_rq = notification.io_rq
 
         if proc.tid not in period_data.tids:
             period_data.tids[proc.tid] = ProcessIOStats.new_from_process(proc)
@@ -191,20 +288,29 @@ class IoAnalysis(Analysis):
         if io_rq.errno is None:
             if io_rq.operation == sv.IORequest.OP_READ or \
                io_rq.operation == sv.IORequest.OP_WRITE:
-                if parent_stats.get_fd(io_rq.fd) is None:
+                fd_stats = self._get_fd_stats(period_data, parent_stats,
+                                              parent_proc, io_rq.fd)
+                if fd_stats is None:
                     return
-                fd_types['fd'] = parent_stats.get_fd(io_rq.fd).fd_type
+                fd_types['fd'] = fd_stats.fd_type
             elif io_rq.operation == sv.IORequest.OP_READ_WRITE:
-                if parent_stats.get_fd(io_rq.fd_in) is None:
+                fd_in_stats = self._get_fd_stats(period_data, parent_stats,
+                                                 parent_proc, io_rq.fd_in)
+                if fd_in_stats is None:
                     return
-                if parent_stats.get_fd(io_rq.fd_out) is None:
+                fd_out_stats = self._get_fd_stats(period_data, parent_stats,
+                                                  parent_proc, io_rq.fd_out)
+                if fd_out_stats is None:
                     return
-                fd_types['fd_in'] = parent_stats.get_fd(io_rq.fd_in).fd_type
-                fd_types['fd_out'] = parent_stats.get_fd(io_rq.fd_out).fd_type
+                fd_types['fd_in'] = fd_in_stats.fd_type
+                fd_types['fd_out'] = fd_out_stats.fd_type
 
-        proc_stats.update_io_stats(io_rq, fd_types)
+        proc_stats.update_io_stats(io_rq, fd_types, self._conf.keep_events)
         parent_stats.update_fd_stats(io_rq)
 
+        if period_data.top_requests is not None:
+            self._update_top_requests(period_data, proc_stats, io_rq)
+
         # Check if the proc stats comm corresponds to the actual
         # process comm. It might be that it was missing so far.
         if proc_stats.comm != proc.comm:
@@ -212,9 +318,41 @@ class IoAnalysis(Analysis):
         if parent_stats.comm != parent_proc.comm:
             parent_stats.comm = parent_proc.comm
 
-    def _process_create_parent_proc(self, period_data, **kwargs):
-        proc = kwargs['proc']
-        parent_proc = kwargs['parent_proc']
+    # Same filters as the ones of the I/O commands for their reports:
+    # size, duration, and requests beginning after the end of the
+    # analysis
+    def _filter_top_io_request(self, io_rq):
+        conf = self._conf
+
+        if io_rq.size is not None:
+            if conf.max_size is not None and io_rq.size > conf.max_size:
+                return False
+
+            if conf.min_size is not None and io_rq.size < conf.min_size:
+                return False
+
+        if conf.max_duration is not None and \
+                io_rq.duration > conf.max_duration:
+            return False
+
+        if conf.min_duration is not None and \
+                io_rq.duration < conf.min_duration:
+            return False
+
+        return not (conf.begin_ts and conf.end_ts and io_rq.end_ts and
+                    io_rq.begin_ts > conf.end_ts)
+
+    def _update_top_requests(self, period_data, proc_stats, io_rq):
+        if not self._filter_top_io_request(io_rq):
+            return
+
+        for op, top_requests in period_data.top_requests.items():
+            if sv.IORequest.is_equivalent_operation(op, io_rq.operation):
+                top_requests.update(io_rq.duration, (proc_stats, io_rq))
+
+    def _process_create_parent_proc(self, period_data, notification):
+        proc = notification.proc
+        parent_proc = notification.parent_proc
 
         if proc.tid not in period_data.tids:
             period_data.tids[proc.tid] = ProcessIOStats.new_from_process(proc)
@@ -229,19 +367,19 @@ class IoAnalysis(Analysis):
         proc_stats.pid = parent_stats.tid
         IoAnalysis._assign_fds_to_parent(proc_stats, parent_stats)
 
-    def _process_statedump_block(self, period_data, **kwargs):
-        dev = kwargs['dev']
-        diskname = kwargs['diskname']
+    def _process_statedump_block(self, period_data, notification):
+        dev = notification.dev
+        diskname = notification.diskname
         if dev not in period_data.disks:
             period_data.disks[dev] = DiskStats(dev, diskname)
         else:
             period_data.disks[dev].diskname = diskname
 
-    def _process_create_fd(self, period_data, **kwargs):
-        timestamp = kwargs['timestamp']
-        parent_proc = kwargs['parent_proc']
+    def _process_create_fd(self, period_data, notification):
+        timestamp = notification.timestamp
+        parent_proc = notification.parent_proc
         tid = parent_proc.tid
-        fd = kwargs['fd']
+        fd = notification.fd
 
         if tid not in period_data.tids:
             period_data.tids[tid] = ProcessIOStats.new_from_process(
@@ -253,25 +391,35 @@ class IoAnalysis(Analysis):
         parent_stats.fds[fd].append(FDStats.new_from_fd(parent_proc.fds[fd],
                                                         timestamp))
 
-    def _process_close_fd(self, period_data, **kwargs):
-        timestamp = kwargs['timestamp']
-        parent_proc = kwargs['parent_proc']
+    def _process_close_fd(self, period_data, notification):
+        timestamp = notification.timestamp
+        parent_proc = notification.parent_proc
         tid = parent_proc.tid
-        fd = kwargs['fd']
+        fd = notification.fd
 
         if tid not in period_data.tids:
-            return
+            if not self._conf.follows_time_shard:
+                return
+
+            period_data.tids[tid] = ProcessIOStats.new_from_process(
+                parent_proc)
+
         parent_stats = period_data.tids[tid]
-        last_fd = parent_stats.get_fd(fd)
+
+        # The closed FD may have been opened during a previous time
+        # shard: record its closing so that it is not confused, when
+        # merging, with a new FD reusing the same number.
+        last_fd = self._get_fd_stats(period_data, parent_stats, parent_proc,
+                                     fd)
         if last_fd is None:
             return
         last_fd.close_ts = timestamp
 
-    def _process_update_fd(self, period_data, **kwargs):
-        timestamp = kwargs['timestamp']
-        parent_proc = kwargs['parent_proc']
+    def _process_update_fd(self, period_data, notification):
+        timestamp = notification.timestamp
+        parent_proc = notification.parent_proc
         tid = parent_proc.tid
-        fd = kwargs['fd']
+        fd = notification.fd
 
         if fd not in parent_proc.fds:
             return
@@ -301,17 +449,14 @@ class DiskStats():
         self.max_rq_duration = None
         self.total_rq_sectors = 0
         self.total_rq_duration = 0
-        self.rq_list = []
+        self.rq_count = 0
+        self.requests = stats.ColumnStore(_RQ_COLUMNS)
 
     @classmethod
     def new_from_disk(cls, disk):
         return cls(disk.dev, disk.diskname)
 
-    @property
-    def rq_count(self):
-        return len(self.rq_list)
-
-    def update_stats(self, req):
+    def update_stats(self, req, keep_request=True):
         if self.min_rq_duration is None or req.duration < self.min_rq_duration:
             self.min_rq_duration = req.duration
         if self.max_rq_duration is None or req.duration > self.max_rq_duration:
@@ -319,14 +464,34 @@ class DiskStats():
 
         self.total_rq_sectors += req.nr_sector
         self.total_rq_duration += req.duration
-        self.rq_list.append(req)
+        self.rq_count += 1
+
+        if keep_request:
+            self.requests.append(req.begin_ts, req.duration, req.size,
+                                 req.operation)
+
+    def merge(self, other):
+        if other.min_rq_duration is not None and \
+           (self.min_rq_duration is None or
+                other.min_rq_duration < self.min_rq_duration):
+            self.min_rq_duration = other.min_rq_duration
+        if other.max_rq_duration is not None and \
+           (self.max_rq_duration is None or
+                other.max_rq_duration > self.max_rq_duration):
+            self.max_rq_duration = other.max_rq_duration
+
+        self.total_rq_sectors += other.total_rq_sectors
+        self.total_rq_duration += other.total_rq_duration
+        self.rq_count += other.rq_count
+        self.requests.merge(other.requests)
 
     def reset(self):
         self.min_rq_duration = None
         self.max_rq_duration = None
         self.total_rq_sectors = 0
         self.total_rq_duration = 0
-        self.rq_list = []
+        self.rq_count = 0
+        self.requests.reset()
 
     @staticmethod
     def _get_name_from_dev(dev):
@@ -345,6 +510,12 @@ class IfaceStats():
         self.sent_bytes = 0
         self.sent_packets = 0
 
+    def merge(self, other):
+        self.recv_bytes += other.recv_bytes
+        self.recv_packets += other.recv_packets
+        self.sent_bytes += other.sent_bytes
+        self.sent_packets += other.sent_packets
+
     def reset(self):
         self.recv_bytes = 0
         self.recv_packets = 0
@@ -353,6 +524,9 @@ class IfaceStats():
 
 
 class ProcessIOStats(stats.Process):
+    __slots__ = ('disk_io', 'net_io', 'unk_io', 'block_io', 'fds',
+                 'requests')
+
     def __init__(self, pid, tid, comm):
         super().__init__(pid, tid, comm)
         self.disk_io = stats.IO()
@@ -361,11 +535,37 @@ class ProcessIOStats(stats.Process):
         self.block_io = stats.IO()
         # FDStats objects, indexed by fd (fileno)
         self.fds = {}
-        self.rq_list = []
-
-    @classmethod
-    def new_from_process(cls, proc):
-        return cls(proc.pid, proc.tid, proc.comm)
+        # System call I/O requests of this process
+        self.requests = stats.ColumnStore(_SYSCALL_RQ_COLUMNS,
+                                          ('syscall_name',))
+
+    # `other_begin_ts` is the beginning timestamp of the time shard
+    # of `other`, which follows the one of this object.
+    def merge(self, other, other_begin_ts=None):
+        super().merge(other)
+        self.disk_io += other.disk_io
+        self.net_io += other.net_io
+        self.unk_io += other.unk_io
+        self.block_io += other.block_io
+        self.requests.merge(other.requests)
+
+        for fd, other_fd_list in other.fds.items():
+            fd_list = self.fds.get(fd)
+
+            if not fd_list:
+                self.fds[fd] = other_fd_list
+                continue
+
+            # An FD which is still open at the end of this object's
+            # time range is the same as the first one of the following
+            # time range if the latter was created from the state at
+            # the beginning of this following time range.
+            if fd_list[-1].close_ts is None and other_fd_list and \
+                    other_fd_list[0].open_ts == other_begin_ts:
+                fd_list[-1].merge(other_fd_list[0])
+                other_fd_list = other_fd_list[1:]
+
+            fd_list += other_fd_list
 
     # Total read/write does not account for block layer I/O
     @property
@@ -392,15 +592,15 @@ class ProcessIOStats(stats.Process):
                 self.get_fd(req.fd_out).update_stats(req)
 
     def update_block_stats(self, req):
-        self.rq_list.append(req)
-
         if req.operation is sv.IORequest.OP_READ:
             self.block_io.read += req.size
         elif req.operation is sv.IORequest.OP_WRITE:
             self.block_io.write += req.size
 
-    def update_io_stats(self, req, fd_types):
-        self.rq_list.append(req)
+    def update_io_stats(self, req, fd_types, keep_request=True):
+        if keep_request:
+            self.requests.append(req.begin_ts, req.duration, req.size,
+                                 req.operation, req.fd, req.syscall_name)
 
         if req.size is None or req.errno is not None:
             return
@@ -495,7 +695,7 @@ class ProcessIOStats(stats.Process):
         self.net_io.reset()
         self.unk_io.reset()
         self.block_io.reset()
-        self.rq_list = []
+        self.requests.reset()
 
         for fd in self.fds:
             fd_stats = self.get_fd(fd)
@@ -504,6 +704,9 @@ class ProcessIOStats(stats.Process):
 
 
 class FDStats():
+    __slots__ = ('fd', 'filename', 'fd_type', 'cloexec', 'family', 'open_ts',
+                 'close_ts', 'io', 'incomplete')
+
     def __init__(self, fd, filename, fd_type, cloexec, family, open_ts):
         self.fd = fd
         self.filename = filename
@@ -513,13 +716,17 @@ class FDStats():
         self.open_ts = open_ts
         self.close_ts = None
         self.io = stats.IO()
-        # IO Requests that acted upon the FD
-        self.rq_list = []
+        # whether the FD was opened before the analyzed events without
+        # any event describing it (see sv.FD)
+        self.incomplete = False
 
     @classmethod
     def new_from_fd(cls, fd, open_ts):
-        return cls(fd.fd, fd.filename, fd.fd_type, fd.cloexec, fd.family,
-                   open_ts)
+        fd_stats = cls(fd.fd, fd.filename, fd.fd_type, fd.cloexec, fd.family,
+                       open_ts)
+        fd_stats.incomplete = fd.incomplete
+
+        return fd_stats
 
     def update_stats(self, req):
         if req.operation is sv.IORequest.OP_READ:
@@ -532,11 +739,16 @@ class FDStats():
             elif self.fd == req.fd_out:
                 self.io.write += req.returned_size
 
-        self.rq_list.append(req)
+    def merge(self, other):
+        if self.filename == 'unknown':
+            self.filename = other.filename
+            self.fd_type = other.fd_type
+
+        self.close_ts = other.close_ts
+        self.io += other.io
 
     def reset(self):
         self.io.reset()
-        self.rq_list = []
 
 
 class FileStats():
@@ -549,10 +761,16 @@ class FileStats():
         # parent pid
         # FIXME this doesn't cover FD reuse cases
         self.fd_by_pid = {}
+        # whether any of these file descriptors is incomplete (see
+        # FDStats)
+        self.incomplete = False
 
     def update_stats(self, fd_stats, proc_stats):
         self.io += fd_stats.io
 
+        if fd_stats.incomplete:
+            self.incomplete = True
+
         if proc_stats.pid is not None:
             pid = proc_stats.pid
         else:
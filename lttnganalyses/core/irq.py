@@ -20,6 +20,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from . import stats
 from .analysis import Analysis, PeriodData
 
 
@@ -28,11 +29,14 @@ class _PeriodData(PeriodData):
         # Indexed by irq 'id' (irq or vec)
         self.hard_irq_stats = {}
         self.softirq_stats = {}
-        # Log of individual interrupts
+        # Log of individual interrupts, only kept if the analysis keeps
+        # events
         self.irq_list = []
 
 
 class IrqAnalysis(Analysis):
+    MERGEABLE = True
+
     def __init__(self, state, conf):
         notification_cbs = {
             'irq_handler_entry': self._process_irq_handler_entry,
@@ -44,16 +48,32 @@ class IrqAnalysis(Analysis):
     def _create_period_data(self):
         return _PeriodData()
 
-    def _process_irq_handler_entry(self, period_data, **kwargs):
-        id = kwargs['id']
-        name = kwargs['irq_name']
+    def _merge_period_data(self, period_data, other):
+        for id, irq_stats in other.hard_irq_stats.items():
+            if id not in period_data.hard_irq_stats:
+                period_data.hard_irq_stats[id] = irq_stats
+            else:
+                period_data.hard_irq_stats[id].merge(irq_stats)
+
+        for id, irq_stats in other.softirq_stats.items():
+            if id not in period_data.softirq_stats:
+                period_data.softirq_stats[id] = irq_stats
+            else:
+                period_data.softirq_stats[id].merge(irq_stats)
+
+        period_data.irq_list += other.irq_list
+
+    def _process_irq_handler_entry(self, period_data, notification):
+        id = notification.id
+        name = notification.irq_name
         if id not in period_data.hard_irq_stats:
-            period_data.hard_irq_stats[id] = HardIrqStats(name)
+            period_data.hard_irq_stats[id] = HardIrqStats(
+                name, self._conf.keep_events)
         elif name not in period_data.hard_irq_stats[id].names:
             period_data.hard_irq_stats[id].names.append(name)
 
-    def _process_irq_handler_exit(self, period_data, **kwargs):
-        irq = kwargs['hard_irq']
+    def _process_irq_handler_exit(self, period_data, notification):
+        irq = notification.irq
 
         if not self._filter_cpu(irq.cpu_id):
             return
@@ -65,14 +85,17 @@ class IrqAnalysis(Analysis):
            irq.duration > self._conf.max_duration:
             return
 
-        period_data.irq_list.append(irq)
+        if self._conf.keep_events:
+            period_data.irq_list.append(irq)
+
         if irq.id not in period_data.hard_irq_stats:
-            period_data.hard_irq_stats[irq.id] = HardIrqStats()
+            period_data.hard_irq_stats[irq.id] = HardIrqStats(
+                keep_events=self._conf.keep_events)
 
         period_data.hard_irq_stats[irq.id].update_stats(irq)
 
-    def _process_softirq_exit(self, period_data, **kwargs):
-        irq = kwargs['softirq']
+    def _process_softirq_exit(self, period_data, notification):
+        irq = notification.irq
 
         if not self._filter_cpu(irq.cpu_id):
             return
@@ -84,20 +107,24 @@ class IrqAnalysis(Analysis):
            irq.duration > self._conf.max_duration:
             return
 
-        period_data.irq_list.append(irq)
+        if self._conf.keep_events:
+            period_data.irq_list.append(irq)
+
         if irq.id not in period_data.softirq_stats:
             name = SoftIrqStats.names[irq.id]
-            period_data.softirq_stats[irq.id] = SoftIrqStats(name)
+            period_data.softirq_stats[irq.id] = SoftIrqStats(
+                name, self._conf.keep_events)
 
         period_data.softirq_stats[irq.id].update_stats(irq)
 
 
 class IrqStats():
-    def __init__(self, name):
+    def __init__(self, name, keep_events=True):
         self._name = name
-        self.min_duration = None
-        self.max_duration = None
-        self.total_duration = 0
+        self.keep_events = keep_events
+        # duration statistics, with their histogram if the interrupts
+        # are not kept
+        self.duration_stats = stats.RunningStats(not keep_events)
         self.irq_list = []
 
     @property
@@ -106,32 +133,49 @@ class IrqStats():
 
     @property
     def count(self):
-        return len(self.irq_list)
+        return self.duration_stats.count
+
+    @property
+    def min_duration(self):
+        return self.duration_stats.min
+
+    @property
+    def max_duration(self):
+        return self.duration_stats.max
+
+    @property
+    def total_duration(self):
+        return self.duration_stats.total
 
     def update_stats(self, irq):
-        if self.min_duration is None or irq.duration < self.min_duration:
-            self.min_duration = irq.duration
+        self.duration_stats.update(irq.duration)
 
-        if self.max_duration is None or irq.duration > self.max_duration:
-            self.max_duration = irq.duration
+        if self.keep_events:
+            self.irq_list.append(irq)
 
-        self.total_duration += irq.duration
-        self.irq_list.append(irq)
+    def merge(self, other):
+        self.duration_stats.merge(other.duration_stats)
+        self.irq_list += other.irq_list
 
     def reset(self):
-        self.min_duration = None
-        self.max_duration = None
-        self.total_duration = 0
+        self.duration_stats.reset()
         self.irq_list = []
 
 
 class HardIrqStats(IrqStats):
     NAMES_SEPARATOR = ', '
 
-    def __init__(self, name='unknown'):
-        super().__init__(name)
+    def __init__(self, name='unknown', keep_events=True):
+        super().__init__(name, keep_events)
         self.names = [name]
 
+    def merge(self, other):
+        super().merge(other)
+
+        for name in other.names:
+            if name not in self.names:
+                self.names.append(name)
+
     @property
     def name(self):
         return self.NAMES_SEPARATOR.join(self.names)
@@ -150,12 +194,25 @@ class SoftIrqStats(IrqStats):
              8: 'HRTIMER_SOFTIRQ',
              9: 'RCU_SOFTIRQ'}
 
-    def __init__(self, name):
-        super().__init__(name)
-        self.min_raise_latency = None
-        self.max_raise_latency = None
-        self.total_raise_latency = 0
-        self.raise_count = 0
+    def __init__(self, name, keep_events=True):
+        super().__init__(name, keep_events)
+        self.raise_latency_stats = stats.RunningStats(not keep_events)
+
+    @property
+    def raise_count(self):
+        return self.raise_latency_stats.count
+
+    @property
+    def min_raise_latency(self):
+        return self.raise_latency_stats.min
+
+    @property
+    def max_raise_latency(self):
+        return self.raise_latency_stats.max
+
+    @property
+    def total_raise_latency(self):
+        return self.raise_latency_stats.total
 
     def update_stats(self, irq):
         super().update_stats(irq)
@@ -163,21 +220,12 @@ class SoftIrqStats(IrqStats):
         if irq.raise_ts is None:
             return
 
-        raise_latency = irq.begin_ts - irq.raise_ts
-        if self.min_raise_latency is None or \
-           raise_latency < self.min_raise_latency:
-            self.min_raise_latency = raise_latency
-
-        if self.max_raise_latency is None or \
-           raise_latency > self.max_raise_latency:
-            self.max_raise_latency = raise_latency
+        self.raise_latency_stats.update(irq.begin_ts - irq.raise_ts)
 
-        self.total_raise_latency += raise_latency
-        self.raise_count += 1
+    def merge(self, other):
+        super().merge(other)
+        self.raise_latency_stats.merge(other.raise_latency_stats)
 
     def reset(self):
         super().reset()
-        self.min_raise_latency = None
-        self.max_raise_latency = None
-        self.total_raise_latency = 0
-        self.raise_count = 0
+        self.raise_latency_stats.reset()
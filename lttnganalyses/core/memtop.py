@@ -30,6 +30,8 @@ class _PeriodData(PeriodData):
 
 
 class Memtop(Analysis):
+    MERGEABLE = True
+
     def __init__(self, state, conf):
         notification_cbs = {
             'tid_page_alloc': self._process_tid_page_alloc,
@@ -40,9 +42,16 @@ class Memtop(Analysis):
     def _create_period_data(self):
         return _PeriodData()
 
-    def _process_tid_page_alloc(self, period_data, **kwargs):
-        cpu_id = kwargs['cpu_id']
-        proc = kwargs['proc']
+    def _merge_period_data(self, period_data, other):
+        for tid, proc_stats in other.tids.items():
+            if tid not in period_data.tids:
+                period_data.tids[tid] = proc_stats
+            else:
+                period_data.tids[tid].merge(proc_stats)
+
+    def _process_tid_page_alloc(self, period_data, notification):
+        cpu_id = notification.cpu_id
+        proc = notification.proc
 
         if not self._filter_process(proc):
             return
@@ -55,9 +64,9 @@ class Memtop(Analysis):
 
         period_data.tids[tid].allocated_pages += 1
 
-    def _process_tid_page_free(self, period_data, **kwargs):
-        cpu_id = kwargs['cpu_id']
-        proc = kwargs['proc']
+    def _process_tid_page_free(self, period_data, notification):
+        cpu_id = notification.cpu_id
+        proc = notification.proc
 
         if not self._filter_process(proc):
             return
@@ -78,6 +87,11 @@ class ProcessMemStats(stats.Process):
         self.allocated_pages = 0
         self.freed_pages = 0
 
+    def merge(self, other):
+        super().merge(other)
+        self.allocated_pages += other.allocated_pages
+        self.freed_pages += other.freed_pages
+
     def reset(self):
         self.allocated_pages = 0
         self.freed_pages = 0
@@ -0,0 +1,316 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import collections
+import heapq
+import multiprocessing
+import operator
+import os
+import shutil
+import tempfile
+from babeltrace import TraceCollection
+from . import event as core_event
+from .analysis import AnalysisCallbackType
+from ..linuxautomaton import automaton
+
+
+# Number of events sent at once by a decoding worker process
+_DECODE_BATCH_SIZE = 2048
+
+# Maximum number of batches waiting to be merged, per worker process
+_DECODE_QUEUE_SIZE = 8
+
+
+# Everything a worker process needs to run an analysis over one time
+# shard of a trace.
+#
+# `read_begin_ts` is the timestamp from which events are read: it is
+# earlier than `conf.begin_ts` by the duration of the warm-up window,
+# during which events only feed the automaton in order to rebuild the
+# state. If it is None, events are read from the beginning of the
+# trace. Events are read up to `read_end_ts` (inclusive).
+TimeShard = collections.namedtuple('TimeShard', [
+    'path',
+    'intersect_mode',
+    'tracer_version',
+    'max_dead_tids',
+    'analysis_class',
+    'conf',
+    'read_begin_ts',
+    'read_end_ts',
+])
+
+
+def _run_time_shard(shard):
+    if shard.intersect_mode is None:
+        traces = TraceCollection()
+    else:
+        traces = TraceCollection(intersect_mode=shard.intersect_mode)
+
+    handles = traces.add_traces_recursive(shard.path, 'ctf')
+
+    if handles == {}:
+        raise ValueError('Failed to open ' + shard.path)
+
+    shard_automaton = automaton.Automaton()
+    shard_automaton.state.tracer_version = shard.tracer_version
+    shard_automaton.state.max_dead_tids = shard.max_dead_tids
+    analysis = shard.analysis_class(shard_automaton.state, shard.conf)
+    shard_automaton.select_state_providers(analysis.notification_names)
+    period_data_list = []
+
+    def tick_cb(period_data, end_ns):
+        if period_data is not None:
+            period_data_list.append(period_data)
+
+    analysis.register_notification_cbs({
+        AnalysisCallbackType.TICK_CB: tick_cb,
+    })
+
+    if shard.read_begin_ts is None:
+        events = traces.events
+    else:
+        events = traces.events_timestamps(shard.read_begin_ts,
+                                          shard.read_end_ts)
+
+    events = core_event.FieldAccessor().wrap_events(events)
+
+    first_event = True
+
+    for event in events:
+        if first_event:
+            analysis.begin_analysis(event)
+            first_event = False
+
+        analysis.process_event(event)
+
+        if analysis.ended:
+            break
+
+        shard_automaton.process_event(event)
+
+    analysis.end_analysis()
+
+    for handle in handles.values():
+        traces.remove_trace(handle)
+
+    if not period_data_list:
+        return None, analysis.last_event_ts
+
+    return period_data_list[0], analysis.last_event_ts
+
+
+def run_time_shards(shards, jobs):
+    """Run an analysis over each time shard in a pool of processes.
+
+    Args:
+        shards (list): list of TimeShard objects, sorted
+        chronologically.
+
+        jobs (int): number of worker processes.
+
+    Returns:
+        A list of (period data, last event timestamp) tuples, in the
+        same order as `shards`. The period data object is None if the
+        analysis did not process any event within a given shard.
+    """
+    with multiprocessing.Pool(jobs) as pool:
+        return pool.map(_run_time_shard, shards, chunksize=1)
+
+
+def _find_trace_streams(path):
+    """Find the stream files of all the CTF traces found under a path.
+
+    Returns:
+        A dict mapping each trace directory (a directory containing a
+        `metadata` file) to the list of names of its stream files.
+    """
+    traces = {}
+
+    for root, _, files in os.walk(path):
+        if 'metadata' not in files:
+            continue
+
+        streams = []
+
+        for name in sorted(files):
+            if name == 'metadata' or name.startswith('.'):
+                continue
+
+            if os.path.isfile(os.path.join(root, name)):
+                streams.append(name)
+
+        traces[root] = streams
+
+    return traces
+
+
+def _create_stream_groups(path, count):
+    """Distribute the stream files of the traces found under a path into
+    groups of similar total sizes.
+
+    Returns:
+        A list of at most `count` groups. Each group is a dict mapping
+        a trace directory to the list of names of the stream files of
+        this trace which belong to this group.
+    """
+    streams = []
+
+    for trace_path, names in _find_trace_streams(path).items():
+        for name in names:
+            size = os.path.getsize(os.path.join(trace_path, name))
+            streams.append((size, trace_path, name))
+
+    count = min(count, len(streams))
+    groups = [{} for i in range(count)]
+    group_sizes = [0] * count
+
+    # largest streams first, each one into the smallest group so far
+    for size, trace_path, name in sorted(streams, reverse=True):
+        index = group_sizes.index(min(group_sizes))
+        group_sizes[index] += size
+        groups[index].setdefault(trace_path, []).append(name)
+
+    return groups
+
+
+def _link_stream_group(group, group_path):
+    # Each trace of the group becomes a directory containing links to
+    # its metadata, to the group's stream files and to their indexes,
+    # so that babeltrace only decodes those streams.
+    for index, (trace_path, names) in enumerate(sorted(group.items())):
+        trace_group_path = os.path.join(group_path, str(index))
+        os.makedirs(trace_group_path)
+        os.symlink(os.path.join(trace_path, 'metadata'),
+                   os.path.join(trace_group_path, 'metadata'))
+
+        for name in names:
+            os.symlink(os.path.join(trace_path, name),
+                       os.path.join(trace_group_path, name))
+            index_path = os.path.join(trace_path, 'index', name + '.idx')
+
+            if os.path.isfile(index_path):
+                index_group_path = os.path.join(trace_group_path, 'index')
+                os.makedirs(index_group_path, exist_ok=True)
+                os.symlink(index_path,
+                           os.path.join(index_group_path, name + '.idx'))
+
+
+def _decode_stream_group(group_path, intersect_mode, event_names, queue):
+    try:
+        if intersect_mode is None:
+            traces = TraceCollection()
+        else:
+            traces = TraceCollection(intersect_mode=intersect_mode)
+
+        if traces.add_traces_recursive(group_path, 'ctf') == {}:
+            raise ValueError('Failed to open ' + group_path)
+
+        batch = []
+
+        for event in traces.events:
+            if event_names is None or event.name in event_names:
+                batch.append(core_event.Event(event))
+            else:
+                batch.append(core_event.Event.new_without_fields(event))
+
+            if len(batch) == _DECODE_BATCH_SIZE:
+                queue.put(batch)
+                batch = []
+
+        if batch:
+            queue.put(batch)
+
+        queue.put(None)
+    except Exception as e:
+        queue.put(e)
+
+
+class ParallelTraceReader:
+    """Trace reader which decodes groups of streams in worker processes.
+
+    Each worker process decodes its own group of stream files with
+    babeltrace and sends copies of the decoded events
+    (core.event.Event objects) to the parent process, which merges
+    them by timestamp. Events sharing the same timestamp are ordered
+    by group, then in the order of their group: unlike babeltrace,
+    which orders them by stream, the order of such events depends on
+    how the streams are grouped.
+
+    Intersect mode is not supported: babeltrace computes the stream
+    intersection from the packet bounds of all the streams, which no
+    single worker process sees. `intersect_mode` must be False, or
+    None if babeltrace does not support this mode.
+
+    If `event_names` is not None, the fields of the events which are
+    not named in this set are not copied.
+    """
+
+    def __init__(self, path, jobs, intersect_mode=None, event_names=None):
+        if intersect_mode:
+            raise ValueError('Intersect mode is not supported when '
+                             'decoding streams in parallel')
+
+        self._tmp_path = tempfile.mkdtemp(prefix='lttng-analyses-')
+        self._queues = []
+        self._workers = []
+
+        for index, group in enumerate(_create_stream_groups(path, jobs)):
+            group_path = os.path.join(self._tmp_path, str(index))
+            _link_stream_group(group, group_path)
+            queue = multiprocessing.Queue(_DECODE_QUEUE_SIZE)
+            worker = multiprocessing.Process(target=_decode_stream_group,
+                                             args=(group_path, intersect_mode,
+                                                   event_names, queue),
+                                             daemon=True)
+            worker.start()
+            self._queues.append(queue)
+            self._workers.append(worker)
+
+    @property
+    def events(self):
+        group_events = [self._get_group_events(queue)
+                        for queue in self._queues]
+
+        return heapq.merge(*group_events,
+                           key=operator.attrgetter('timestamp'))
+
+    def _get_group_events(self, queue):
+        while True:
+            batch = queue.get()
+
+            if batch is None:
+                break
+
+            if isinstance(batch, Exception):
+                raise batch
+
+            yield from batch
+
+    def close(self):
+        for worker in self._workers:
+            if worker.is_alive():
+                worker.terminate()
+
+            worker.join()
+
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
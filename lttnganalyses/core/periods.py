@@ -20,6 +20,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from . import stats
 from .analysis import Analysis, PeriodData
 
 
@@ -46,6 +47,13 @@ class PeriodAnalysis(Analysis):
         # Internal map between currently active periods and their
         # corresponding PeriodEvent object.
         self._current_periods = {}
+        # Completed periods with the greatest durations, only tracked
+        # if the analysis has a top limit, in which case the analysis
+        # keeps neither the list of all the periods nor their children.
+        self._top_periods = None
+
+        if conf.top_limit is not None:
+            self._top_periods = stats.TopK(conf.top_limit)
 
     def _create_period_data(self):
         return _PeriodData()
@@ -62,6 +70,15 @@ class PeriodAnalysis(Analysis):
     def all_period_list(self):
         return self._all_period_list
 
+    # Returns the completed periods with the greatest durations, the
+    # greatest first, or None if the analysis does not track them.
+    @property
+    def top_periods(self):
+        if self._top_periods is None:
+            return None
+
+        return self._top_periods.items()
+
     @property
     def all_min_duration(self):
         return self._all_min_duration
@@ -84,6 +101,19 @@ class PeriodAnalysis(Analysis):
             self._all_max_duration = period_event.duration
         self._all_total_duration += period_event.duration
 
+    def _update_top_periods(self, period_event):
+        duration = period_event.duration
+
+        if self._conf.min_duration is not None and \
+                duration < self._conf.min_duration:
+            return
+
+        if self._conf.max_duration is not None and \
+                duration > self._conf.max_duration:
+            return
+
+        self._top_periods.update(duration, period_event)
+
     # beginning of a new period
     def _begin_period_cb(self, period_data):
         # Only track real periods, not the dummy ones created
@@ -110,7 +140,9 @@ class PeriodAnalysis(Analysis):
         period_data._period_event = PeriodEvent(
             period.begin_evt.timestamp, definition.name, parent)
 
-        self._all_period_list.append(period_data._period_event)
+        if self._top_periods is None:
+            self._all_period_list.append(period_data._period_event)
+
         self._current_periods[period] = period_data._period_event
 
     def _end_period_cb(self, period_data, completed,
@@ -123,7 +155,9 @@ class PeriodAnalysis(Analysis):
         if completed is False:
             # We should eventually warn the user here or keep
             # the event as uncomplete or in a separate table.
-            self._all_period_list.remove(period_data._period_event)
+            if self._top_periods is None:
+                self._all_period_list.remove(period_data._period_event)
+
             return
 
         if period.definition.name is None:
@@ -133,9 +167,15 @@ class PeriodAnalysis(Analysis):
 
         period_data._period_event.finish(
             self.last_event_ts, begin_captures, end_captures)
+        self.update_global_stats(period_data._period_event)
+
+        if self._top_periods is not None:
+            self._update_top_periods(period_data._period_event)
+            del self._current_periods[period]
+            return
+
         self._all_period_stats[name].update_stats(
             period_data._period_event)
-        self.update_global_stats(period_data._period_event)
 
         if period.parent is not None:
             parent = self._current_periods[period.parent]
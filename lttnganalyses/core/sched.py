@@ -26,14 +26,36 @@ from .analysis import Analysis, PeriodData
 
 
 class _PeriodData(PeriodData):
-    def __init__(self):
-        # Log of individual wake scheduling events
+    def __init__(self, keep_events, top_limit):
+        # Log of individual wake scheduling events, only kept if the
+        # analysis keeps events
         self.sched_list = []
-        self.min_latency = None
-        self.max_latency = None
-        self.total_latency = 0
+        # Wake scheduling events with the greatest latencies, only
+        # tracked if the analysis has a top limit
+        self.top_sched = None
+
+        if top_limit is not None:
+            self.top_sched = stats.TopK(top_limit)
+
+        # latency statistics, with their histogram if the events are
+        # not kept
+        self.latency_stats = stats.RunningStats(not keep_events)
+        # prio to the latency statistics of the wakeups of this prio
+        self.prio_latency_stats = {}
         self.tids = {}
 
+    @property
+    def min_latency(self):
+        return self.latency_stats.min
+
+    @property
+    def max_latency(self):
+        return self.latency_stats.max
+
+    @property
+    def total_latency(self):
+        return self.latency_stats.total
+
 
 class SchedAnalysis(Analysis):
     def __init__(self, state, conf):
@@ -44,19 +66,25 @@ class SchedAnalysis(Analysis):
         super().__init__(state, conf, notification_cbs)
 
     def count(self, period_data):
-        return len(period_data.sched_list)
+        return period_data.latency_stats.count
 
     def _create_period_data(self):
-        return _PeriodData()
-
-    def _process_sched_switch(self, period_data, **kwargs):
-        cpu_id = kwargs['cpu_id']
-        switch_ts = kwargs['timestamp']
-        wakee_proc = kwargs['wakee_proc']
-        waker_proc = kwargs['waker_proc']
-        next_tid = kwargs['next_tid']
+        return _PeriodData(self._conf.keep_events, self._conf.top_limit)
+
+    def _new_process_stats(self, proc):
+        proc_stats = ProcessSchedStats(proc.pid, proc.tid, proc.comm,
+                                       self._conf.keep_events)
+        proc_stats.incomplete = proc.incomplete
+
+        return proc_stats
+
+    def _process_sched_switch(self, period_data, notification):
+        cpu_id = notification.cpu_id
+        switch_ts = notification.timestamp
+        wakee_proc = notification.wakee_proc
+        waker_proc = notification.waker_proc
+        next_tid = notification.next_tid
         wakeup_ts = wakee_proc.last_wakeup
-#        print(period_data)
 
         if not self._filter_process(wakee_proc):
             return
@@ -76,13 +104,12 @@ class SchedAnalysis(Analysis):
 
         if waker_proc is not None and waker_proc.tid not in period_data.tids:
             period_data.tids[waker_proc.tid] = \
-                ProcessSchedStats.new_from_process(waker_proc)
+                self._new_process_stats(waker_proc)
             period_data.tids[waker_proc.tid].update_prio(switch_ts,
                                                          waker_proc.prio)
 
         if next_tid not in period_data.tids:
-            period_data.tids[next_tid] = \
-                ProcessSchedStats.new_from_process(wakee_proc)
+            period_data.tids[next_tid] = self._new_process_stats(wakee_proc)
             period_data.tids[next_tid].update_prio(switch_ts, wakee_proc.prio)
 
         sched_event = SchedEvent(
@@ -90,10 +117,10 @@ class SchedAnalysis(Analysis):
         period_data.tids[next_tid].update_stats(sched_event)
         self._update_stats(period_data, sched_event)
 
-    def _process_prio_changed(self, period_data, **kwargs):
-        timestamp = kwargs['timestamp']
-        prio = kwargs['prio']
-        tid = kwargs['tid']
+    def _process_prio_changed(self, period_data, notification):
+        timestamp = notification.timestamp
+        prio = notification.prio
+        tid = notification.tid
 
         if tid not in period_data.tids:
             return
@@ -101,50 +128,63 @@ class SchedAnalysis(Analysis):
         period_data.tids[tid].update_prio(timestamp, prio)
 
     def _update_stats(self, period_data, sched_event):
-        if period_data.min_latency is None or \
-                sched_event.latency < period_data.min_latency:
-            period_data.min_latency = sched_event.latency
+        period_data.latency_stats.update(sched_event.latency)
+        prio_stats = period_data.prio_latency_stats.get(sched_event.prio)
+
+        if prio_stats is None:
+            prio_stats = stats.RunningStats(
+                not self._conf.keep_events)
+            period_data.prio_latency_stats[sched_event.prio] = prio_stats
 
-        if period_data.max_latency is None or \
-                sched_event.latency > period_data.max_latency:
-            period_data.max_latency = sched_event.latency
+        prio_stats.update(sched_event.latency)
 
-        period_data.total_latency += sched_event.latency
-        period_data.sched_list.append(sched_event)
+        if period_data.top_sched is not None:
+            period_data.top_sched.update(sched_event.latency, sched_event)
+
+        if self._conf.keep_events:
+            period_data.sched_list.append(sched_event)
 
 
 class ProcessSchedStats(stats.Process):
-    def __init__(self, pid, tid, comm):
+    def __init__(self, pid, tid, comm, keep_events=True):
         super().__init__(pid, tid, comm)
 
-        self.min_latency = None
-        self.max_latency = None
-        self.total_latency = 0
+        self.keep_events = keep_events
+        self.latency_stats = stats.RunningStats(not keep_events)
         self.sched_list = []
 
     @property
     def count(self):
-        return len(self.sched_list)
+        return self.latency_stats.count
 
-    def update_stats(self, sched_event):
-        if self.min_latency is None or sched_event.latency < self.min_latency:
-            self.min_latency = sched_event.latency
+    @property
+    def min_latency(self):
+        return self.latency_stats.min
 
-        if self.max_latency is None or sched_event.latency > self.max_latency:
-            self.max_latency = sched_event.latency
+    @property
+    def max_latency(self):
+        return self.latency_stats.max
 
-        self.total_latency += sched_event.latency
-        self.sched_list.append(sched_event)
+    @property
+    def total_latency(self):
+        return self.latency_stats.total
+
+    def update_stats(self, sched_event):
+        self.latency_stats.update(sched_event.latency)
+
+        if self.keep_events:
+            self.sched_list.append(sched_event)
 
     def reset(self):
         super().reset()
-        self.min_latency = None
-        self.max_latency = None
-        self.total_latency = 0
+        self.latency_stats.reset()
         self.sched_list = []
 
 
 class SchedEvent():
+    __slots__ = ('wakeup_ts', 'switch_ts', 'wakee_proc', 'waker_proc', 'prio',
+                 'target_cpu', 'latency')
+
     def __init__(self, wakeup_ts, switch_ts, wakee_proc, waker_proc,
                  target_cpu):
         self.wakeup_ts = wakeup_ts
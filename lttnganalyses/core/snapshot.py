@@ -0,0 +1,162 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import bisect
+import os
+import tempfile
+from . import cache
+from .. import __version__
+from ..common import trace_utils
+
+
+_FILE_NAME_SUFFIX = '.snapshot'
+
+
+def get_snapshot_store_path(trace_path, intersect_mode):
+    """Get the path of the directory of state snapshots of a trace.
+
+    Snapshots are pickled objects: the name of the directory depends on
+    the version of LTTng analyses and on the content of the trace (see
+    cache.get_trace_key()).
+
+    Args:
+        trace_path (str): path of the trace (collection).
+        intersect_mode (bool): whether the events are read in stream
+        intersection mode.
+
+    Returns:
+        The path of the snapshot directory, which may not exist.
+    """
+
+    key = cache.get_trace_key(trace_path, __version__, bool(intersect_mode))
+
+    return os.path.join(trace_utils.get_cache_dir(trace_path),
+                        'snapshots-' + key)
+
+
+class SnapshotStore:
+    """Directory of snapshots of the state of an automaton.
+
+    Each snapshot is the state of the automaton after it processed all
+    the events of which the timestamp is less than the snapshot's
+    timestamp, and none of the other ones.
+
+    Args:
+        path (str): path of the directory, as returned by
+        get_snapshot_store_path().
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._timestamps = []
+
+        if os.path.isdir(path):
+            for name in os.listdir(path):
+                if name.endswith(_FILE_NAME_SUFFIX):
+                    self._timestamps.append(
+                        int(name[:-len(_FILE_NAME_SUFFIX)]))
+
+        self._timestamps.sort()
+
+    @property
+    def timestamps(self):
+        return self._timestamps
+
+    def _get_file_path(self, ts):
+        return os.path.join(self._path, '{}{}'.format(ts, _FILE_NAME_SUFFIX))
+
+    def find(self, ts):
+        """Find the latest snapshot taken at or before a timestamp.
+
+        Args:
+            ts (int): timestamp (ns).
+
+        Returns:
+            The timestamp of the snapshot, or None if there is none.
+        """
+
+        index = bisect.bisect_right(self._timestamps, ts)
+
+        if index == 0:
+            return None
+
+        return self._timestamps[index - 1]
+
+    def load(self, automaton, ts):
+        """Restore the state of an automaton from a snapshot.
+
+        Args:
+            automaton (Automaton): automaton to restore.
+            ts (int): timestamp of the snapshot.
+        """
+
+        with open(self._get_file_path(ts), 'rb') as f:
+            automaton.load_snapshot(f)
+
+    def save(self, automaton, ts):
+        """Save a snapshot of the state of an automaton.
+
+        Args:
+            automaton (Automaton): automaton to save.
+            ts (int): timestamp of the snapshot.
+        """
+
+        os.makedirs(self._path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='tmp-', dir=self._path)
+
+        with os.fdopen(fd, 'wb') as f:
+            automaton.save_snapshot(f)
+
+        os.replace(tmp_path, self._get_file_path(ts))
+        bisect.insort(self._timestamps, ts)
+
+    def record(self, events, automaton, interval):
+        """Save snapshots while yielding events to the automaton's user.
+
+        A snapshot is saved every `interval` nanoseconds of trace time
+        after the latest existing snapshot, just before yielding the
+        first event of a new timestamp. The user of `events` must feed
+        each event to `automaton` before getting the next one.
+
+        Args:
+            events: an iterable of events.
+            automaton (Automaton): automaton fed with the events.
+            interval (int): minimal duration between two snapshots (ns).
+        """
+
+        next_ts = None
+        last_ts = None
+
+        if self._timestamps:
+            next_ts = self._timestamps[-1] + interval
+
+        for event in events:
+            ts = event.timestamp
+
+            if next_ts is None:
+                next_ts = ts + interval
+            elif ts >= next_ts and last_ts is not None and ts > last_ts:
+                self.save(automaton, ts)
+                next_ts = ts + interval
+
+            last_ts = ts
+            yield event
@@ -20,6 +20,9 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import array
+import heapq
+import math
 from collections import namedtuple
 
 
@@ -27,24 +30,45 @@ PrioEvent = namedtuple('PrioEvent', ['timestamp', 'prio'])
 
 
 class Stats():
+    __slots__ = ()
+
     def reset(self):
         raise NotImplementedError()
 
 
 class Process(Stats):
+    __slots__ = ('pid', 'tid', 'comm', 'prio_list', 'incomplete')
+
     def __init__(self, pid, tid, comm):
         self.pid = pid
         self.tid = tid
         self.comm = comm
         self.prio_list = []
+        # whether the process existed before the analyzed events
+        # without any event describing it (see sv.Process)
+        self.incomplete = False
 
     @classmethod
     def new_from_process(cls, proc):
-        return cls(proc.pid, proc.tid, proc.comm)
+        proc_stats = cls(proc.pid, proc.tid, proc.comm)
+        proc_stats.incomplete = proc.incomplete
+
+        return proc_stats
 
     def update_prio(self, timestamp, prio):
         self.prio_list.append(PrioEvent(timestamp, prio))
 
+    # Merges the stats of the same process gathered over the time
+    # range following the one of this object.
+    def merge(self, other):
+        if self.pid is None:
+            self.pid = other.pid
+
+        if not self.comm:
+            self.comm = other.comm
+
+        self.prio_list += other.prio_list
+
     def reset(self):
         if self.prio_list:
             # Keep the last prio as the first for the next period
@@ -52,6 +76,8 @@ class Process(Stats):
 
 
 class IO(Stats):
+    __slots__ = ('read', 'write')
+
     def __init__(self):
         # Number of bytes read or written
         self.read = 0
@@ -65,3 +91,294 @@ class IO(Stats):
         self.read += other.read
         self.write += other.write
         return self
+
+
+# Count, minimum, maximum, total, mean, and variance of a series of
+# values, updated with each value rather than computed from a list of
+# all of them afterwards (Welford's algorithm).
+#
+# If `with_histogram` is True, the values are also counted in a
+# LogHistogram (`histogram` attribute).
+class RunningStats(Stats):
+    __slots__ = ('count', 'min', 'max', 'total', 'mean', '_m2', 'histogram')
+
+    def __init__(self, with_histogram=False):
+        self.histogram = None
+
+        if with_histogram:
+            self.histogram = LogHistogram()
+
+        self.reset()
+
+    def update(self, value):
+        self.count += 1
+        self.total += value
+
+        if self.min is None or value < self.min:
+            self.min = value
+
+        if self.max is None or value > self.max:
+            self.max = value
+
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+        if self.histogram is not None:
+            self.histogram.update(value)
+
+    # Sample variance, or NaN with less than two values, like
+    # statistics.variance() which raises an error instead
+    @property
+    def variance(self):
+        if self.count < 2:
+            return float('nan')
+
+        return self._m2 / (self.count - 1)
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.variance)
+
+    # Merges the statistics of the values of `other` into this object
+    # (Chan et al.'s parallel algorithm).
+    def merge(self, other):
+        if other.count == 0:
+            return
+
+        if self.count == 0:
+            self.min = other.min
+            self.max = other.max
+        else:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / \
+            count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram.merge(other.histogram)
+
+    def reset(self):
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.total = 0
+        self.mean = 0
+        self._m2 = 0
+
+        if self.histogram is not None:
+            self.histogram.reset()
+
+
+# Histogram of positive values with logarithmic buckets: the value
+# which represents a bucket is within `precision` (relative error) of
+# all the values counted in this bucket. The memory it uses only
+# depends on the range of the values, not on their count, and two
+# histograms with the same precision can be merged.
+#
+# Values which are not positive are counted in a single bucket
+# represented by 0.
+class LogHistogram(Stats):
+    __slots__ = ('precision', '_gamma', '_log_gamma', '_counts', 'count')
+
+    def __init__(self, precision=0.01):
+        self.precision = precision
+        self._gamma = (1 + precision) / (1 - precision)
+        self._log_gamma = math.log(self._gamma)
+        self.reset()
+
+    def update(self, value, count=1):
+        if value > 0:
+            index = math.ceil(math.log(value) / self._log_gamma)
+        else:
+            index = None
+
+        self._counts[index] = self._counts.get(index, 0) + count
+        self.count += count
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError('Cannot merge histograms of different '
+                             'precisions')
+
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+
+        self.count += other.count
+
+    def _get_bucket_value(self, index):
+        if index is None:
+            return 0
+
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    # Returns the list of the (value, count) pairs of the non-empty
+    # buckets, sorted by value.
+    def items(self):
+        indexes = sorted(self._counts, key=lambda index: (
+            index is not None, index))
+
+        return [(self._get_bucket_value(index), self._counts[index])
+                for index in indexes]
+
+    # Returns the approximate value below which a fraction `q` (between
+    # 0 and 1) of the values fall, or None if the histogram is empty.
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+
+        for value, count in self.items():
+            seen += count
+
+            if seen > rank:
+                return value
+
+        return value
+
+    def reset(self):
+        self._counts = {}
+        self.count = 0
+
+
+# Bounded min-heap of the `limit` items having the greatest keys.
+#
+# Items having equal keys are ordered by insertion, the first one
+# coming first, so that the kept items are the first ones a stable
+# reverse sort of all the items by key would return.
+class TopK(Stats):
+    __slots__ = ('limit', '_heap', '_seq')
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.reset()
+
+    def __len__(self):
+        return len(self._heap)
+
+    # The heap entries are (key, -seq, item) tuples: the sequence
+    # number breaks ties, so that items are never compared.
+    def _push(self, key, seq, item):
+        entry = (key, -seq, item)
+
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        elif self._heap and (key, -seq) > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def update(self, key, item):
+        self._push(key, self._seq, item)
+        self._seq += 1
+
+    # Merges the items of `other`, which were inserted after the ones
+    # of this object.
+    def merge(self, other):
+        for key, neg_seq, item in other._heap:
+            self._push(key, self._seq - neg_seq, item)
+
+        self._seq += other._seq
+
+    # Returns the kept items, the greatest first
+    def items(self):
+        return [entry[2] for entry in sorted(self._heap, reverse=True)]
+
+    def reset(self):
+        self._heap = []
+        self._seq = 0
+
+
+# Columnar store of records made of integer fields.
+#
+# Each column is an array('q') of signed 64-bit integers, so that
+# storing a record (an I/O request or a system call, for example)
+# costs a few machine words instead of a Python object. The id of a
+# record is its index in the columns.
+#
+# None values are stored as `NULL`. The values of the columns named
+# in `string_columns` are interned in the `strings` list of the store,
+# the column holding their indexes.
+class ColumnStore(Stats):
+    __slots__ = ('_names', '_columns', '_string_columns', 'strings',
+                 '_string_ids')
+
+    NULL = -2 ** 63
+
+    def __init__(self, names, string_columns=()):
+        self._names = tuple(names)
+        self._string_columns = frozenset(string_columns)
+        self.reset()
+
+    def __len__(self):
+        return len(self._columns[self._names[0]])
+
+    # Returns the array of the column named `name`
+    def column(self, name):
+        return self._columns[name]
+
+    def _intern(self, string):
+        string_id = self._string_ids.get(string)
+
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(string)
+            self._string_ids[string] = string_id
+
+        return string_id
+
+    # Appends a record, the values being in the order of the column
+    # names, and returns its id.
+    def append(self, *values):
+        rec_id = len(self)
+
+        for name, value in zip(self._names, values):
+            if value is None:
+                value = ColumnStore.NULL
+            elif name in self._string_columns:
+                value = self._intern(value)
+
+            self._columns[name].append(value)
+
+        return rec_id
+
+    # Returns the value of the field `name` of the record `rec_id`
+    def get(self, rec_id, name):
+        value = self._columns[name][rec_id]
+
+        if value == ColumnStore.NULL:
+            return None
+
+        if name in self._string_columns:
+            return self.strings[value]
+
+        return value
+
+    # Materializes the record `rec_id` as a dict indexed by column name
+    def row(self, rec_id):
+        return {name: self.get(rec_id, name) for name in self._names}
+
+    # Appends the records of `other`, which must have the same columns,
+    # after the ones of this store.
+    def merge(self, other):
+        for name in self._names:
+            column = other._columns[name]
+
+            if name in self._string_columns:
+                string_ids = [self._intern(string)
+                              for string in other.strings]
+                column = (value if value == ColumnStore.NULL else
+                          string_ids[value] for value in column)
+
+            self._columns[name].extend(column)
+
+    def reset(self):
+        self._columns = {name: array.array('q') for name in self._names}
+        self.strings = []
+        self._string_ids = {}
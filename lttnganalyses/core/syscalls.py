@@ -31,6 +31,8 @@ class _PeriodData(PeriodData):
 
 
 class SyscallsAnalysis(Analysis):
+    MERGEABLE = True
+
     def __init__(self, state, conf):
         notification_cbs = {
             'syscall_exit': self._process_syscall_exit
@@ -40,9 +42,18 @@ class SyscallsAnalysis(Analysis):
     def _create_period_data(self):
         return _PeriodData()
 
-    def _process_syscall_exit(self, period_data, **kwargs):
-        cpu_id = kwargs['cpu_id']
-        proc = kwargs['proc']
+    def _merge_period_data(self, period_data, other):
+        for tid, proc_stats in other.tids.items():
+            if tid not in period_data.tids:
+                period_data.tids[tid] = proc_stats
+            else:
+                period_data.tids[tid].merge(proc_stats)
+
+        period_data.total_syscalls += other.total_syscalls
+
+    def _process_syscall_exit(self, period_data, notification):
+        cpu_id = notification.cpu_id
+        proc = notification.proc
         tid = proc.tid
         current_syscall = proc.current_syscall
         name = current_syscall.name
@@ -72,6 +83,17 @@ class ProcessSyscallStats(stats.Process):
         self.syscalls = {}
         self.total_syscalls = 0
 
+    def merge(self, other):
+        super().merge(other)
+
+        for name, syscall_stats in other.syscalls.items():
+            if name not in self.syscalls:
+                self.syscalls[name] = syscall_stats
+            else:
+                self.syscalls[name].merge(syscall_stats)
+
+        self.total_syscalls += other.total_syscalls
+
     def reset(self):
         pass
 
@@ -82,11 +104,12 @@ class SyscallStats():
         self.min_duration = None
         self.max_duration = None
         self.total_duration = 0
-        self.syscalls_list = []
+        # Columns of the system calls of this name
+        self.calls = stats.ColumnStore(('begin_ts', 'duration', 'ret'))
 
     @property
     def count(self):
-        return len(self.syscalls_list)
+        return len(self.calls)
 
     def update_stats(self, syscall):
         duration = syscall.duration
@@ -97,4 +120,17 @@ class SyscallStats():
             self.max_duration = duration
 
         self.total_duration += duration
-        self.syscalls_list.append(syscall)
+        self.calls.append(syscall.begin_ts, duration, syscall.ret)
+
+    def merge(self, other):
+        if other.min_duration is not None and \
+           (self.min_duration is None or
+                self.min_duration > other.min_duration):
+            self.min_duration = other.min_duration
+        if other.max_duration is not None and \
+           (self.max_duration is None or
+                self.max_duration < other.max_duration):
+            self.max_duration = other.max_duration
+
+        self.total_duration += other.total_duration
+        self.calls.merge(other.calls)
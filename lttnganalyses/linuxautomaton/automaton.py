@@ -21,6 +21,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import collections
+import pickle
 from .sched import SchedStateProvider
 from .mem import MemStateProvider
 from .irq import IrqStateProvider
@@ -30,6 +32,11 @@ from .statedump import StatedumpStateProvider
 from .block import BlockStateProvider
 from .net import NetStateProvider
 from .sv import MemoryManagement
+from .notification import NotificationBus
+
+
+# Default maximum number of freed processes kept in State.dead_tids
+DEFAULT_MAX_DEAD_TIDS = 100000
 
 
 class State:
@@ -38,47 +45,185 @@ class State:
         self.tids = {}
         self.disks = {}
         self.mm = MemoryManagement()
-        self._notification_cbs = {}
+        # TID to the set of the IDs of the CPUs running this task
+        self.tid_cpus = {}
+        # IDs of the CPUs running a task which is in an I/O system call
+        self.io_cpus = set()
+        # IDs of the CPUs running kswapd
+        self.kswapd_cpus = set()
+        # TIDs of the processes which may be in an I/O system call
+        self.io_tids = set()
+        # TID to the sv.DeadProcess summary of the processes which the
+        # kernel freed, from the oldest to the most recently freed
+        self.dead_tids = collections.OrderedDict()
+        self.max_dead_tids = DEFAULT_MAX_DEAD_TIDS
+        self._notification_bus = NotificationBus()
+        self._notification_cb_wrapper = None
         # State changes can be handled differently depending on
         # version of tracer used, so keep track of it.
         self._tracer_version = None
 
+    # Returns the process of TID `tid`: the live sv.Process if any,
+    # otherwise the sv.DeadProcess summary of the last freed process
+    # with this TID, or None.
+    def find_process(self, tid):
+        proc = self.tids.get(tid)
+
+        if proc is None:
+            proc = self.dead_tids.get(tid)
+
+        return proc
+
+    # The notification callbacks belong to the analyses, not to the
+    # state of the system: they are not part of a snapshot.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_notification_bus']
+        del state['_notification_cb_wrapper']
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._notification_bus = NotificationBus()
+        self._notification_cb_wrapper = None
+
+    # Replaces the state of the system with the one of `other`, keeping
+    # the registered notification callbacks and the configured maximum
+    # number of dead processes.
+    def restore(self, other):
+        max_dead_tids = self.max_dead_tids
+        self.__dict__.update(other.__getstate__())
+        self.max_dead_tids = max_dead_tids
+
+    # Sets a function which wraps the notification callbacks registered
+    # from now on: the registered callback becomes `wrapper(name, cb)`,
+    # where `name` is the name of the notification.
+    def set_notification_cb_wrapper(self, wrapper):
+        self._notification_cb_wrapper = wrapper
+
     def register_notification_cbs(self, period_data, cbs):
-        for name in cbs:
-            if name not in self._notification_cbs:
-                self._notification_cbs[name] = []
-            # Store the callback in the form of (period_data, function)
-            self._notification_cbs[name].append((period_data, cbs[name]))
+        wrapper = self._notification_cb_wrapper
+
+        if wrapper is not None:
+            cbs = {name: wrapper(name, cb) for name, cb in cbs.items()}
+
+        self._notification_bus.subscribe(period_data, cbs)
 
-    def send_notification_cb(self, name, **kwargs):
-        if name in self._notification_cbs:
-            for cb_tuple in self._notification_cbs[name]:
-                cb_tuple[1](cb_tuple[0], **kwargs)
+    # Returns whether or not sending the notification named `name`
+    # would call anything: if not, the caller may skip building the
+    # payload of the notification.
+    def has_notification_cbs(self, name):
+        return self._notification_bus.has_subscribers(name)
+
+    # Sends `notification`, a payload object of the `notification`
+    # module, to the callbacks of the notification named `name`.
+    def send_notification_cb(self, name, notification):
+        self._notification_bus.send(name, notification)
 
     def clear_period_notification_cbs(self, period_data):
-        for name in self._notification_cbs:
-            for cb in self._notification_cbs[name]:
-                if cb[0] == period_data:
-                    self._notification_cbs[name].remove(cb)
+        self._notification_bus.unsubscribe(period_data)
+
+
+# All the state provider classes, in the order in which they process
+# each event
+_STATE_PROVIDER_CLASSES = [
+    SchedStateProvider,
+    MemStateProvider,
+    IrqStateProvider,
+    SyscallsStateProvider,
+    IoStateProvider,
+    StatedumpStateProvider,
+    BlockStateProvider,
+    NetStateProvider,
+]
 
 
 class Automaton:
     def __init__(self):
         self._state = State()
-        self._state_providers = [
-            SchedStateProvider(self._state),
-            MemStateProvider(self._state),
-            IrqStateProvider(self._state),
-            SyscallsStateProvider(self._state),
-            IoStateProvider(self._state),
-            StatedumpStateProvider(self._state),
-            BlockStateProvider(self._state),
-            NetStateProvider(self._state)
-        ]
+        self._create_state_providers(_STATE_PROVIDER_CLASSES)
 
-    def process_event(self, ev):
+    def _create_state_providers(self, sp_classes):
+        self._state_providers = [sp_class(self._state)
+                                 for sp_class in sp_classes]
+
+        for sp in self._state_providers:
+            if isinstance(sp, SyscallsStateProvider):
+                sp.clears_io_syscalls = IoStateProvider not in sp_classes
+
+        # event name to the tuple of the callbacks of the state
+        # providers which handle the events of this name, in the order
+        # of the state providers
+        self._event_cbs = {}
+
+    # Keeps only the state providers which send the notifications named
+    # `names`, and the state providers on which they depend. This must
+    # be called before processing any event.
+    def select_state_providers(self, names):
+        sp_classes = set()
+        to_visit = [sp_class for sp_class in _STATE_PROVIDER_CLASSES
+                    if not set(sp_class.PRODUCES).isdisjoint(names)]
+
+        while to_visit:
+            sp_class = to_visit.pop()
+
+            if sp_class not in sp_classes:
+                sp_classes.add(sp_class)
+                to_visit += sp_class.DEPENDS
+
+        self._create_state_providers([sp_class for sp_class
+                                      in _STATE_PROVIDER_CLASSES
+                                      if sp_class in sp_classes])
+
+    def consumes_event(self, name):
+        return len(self._get_event_cbs(name)) > 0
+
+    def _get_event_cbs(self, name):
+        cbs = self._event_cbs.get(name)
+
+        if cbs is None:
+            cbs = tuple(cb for cb in (sp.get_event_cb(name)
+                                      for sp in self._state_providers)
+                        if cb is not None)
+            self._event_cbs[name] = cbs
+
+        return cbs
+
+    # Replaces each event callback of each state provider by
+    # `wrap(sp, name, cb)`, where `name` is the name of the consumed
+    # event.
+    def wrap_cbs(self, wrap):
         for sp in self._state_providers:
-            sp.process_event(ev)
+            sp.wrap_cbs(lambda name, cb, sp=sp: wrap(sp, name, cb))
+
+        self._event_cbs.clear()
+
+    # Saves the state and the private data of the state providers to
+    # `f`, a binary file.
+    def save_snapshot(self, f):
+        sp_data = [sp.get_snapshot_data() for sp in self._state_providers]
+        pickle.dump((self._state, sp_data), f, pickle.HIGHEST_PROTOCOL)
+
+    # Restores the state and the private data of the state providers
+    # from `f`, a binary file written by save_snapshot(). The State
+    # object remains the same, so that its users see the restored
+    # state.
+    def load_snapshot(self, f):
+        state, sp_data = pickle.load(f)
+        self._state.restore(state)
+
+        for sp, data in zip(self._state_providers, sp_data):
+            sp.restore_snapshot_data(data)
+
+    def process_event(self, ev):
+        cbs = self._event_cbs.get(ev.name)
+
+        if cbs is None:
+            cbs = self._get_event_cbs(ev.name)
+
+        for cb in cbs:
+            cb(ev)
 
     @property
     def state(self):
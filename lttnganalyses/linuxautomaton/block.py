@@ -21,10 +21,19 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from . import sp, sv
+import collections
+from . import notification, sp, sv
+from .sched import SchedStateProvider
 
 
 class BlockStateProvider(sp.StateProvider):
+    PRODUCES = ('block_rq_complete',)
+    DEPENDS = (SchedStateProvider,)
+
+    # Maximum number of remap requests kept: the oldest ones are
+    # dropped, as their request was never completed
+    MAX_REMAP_REQUESTS = 65536
+
     def __init__(self, state):
         cbs = {
             'block_rq_complete': self._process_block_rq_complete,
@@ -34,7 +43,10 @@ class BlockStateProvider(sp.StateProvider):
         }
 
         super().__init__(state, cbs)
-        self._remap_requests = []
+
+        # remap requests indexed by (dev, sector), from the oldest to
+        # the most recently updated
+        self._remap_requests = collections.OrderedDict()
 
     def _process_block_bio_remap(self, event):
         dev = event['dev']
@@ -42,24 +54,27 @@ class BlockStateProvider(sp.StateProvider):
         old_dev = event['old_dev']
         old_sector = event['old_sector']
 
-        for req in self._remap_requests:
-            if req.dev == old_dev and req.sector == old_sector:
-                req.dev = dev
-                req.sector = sector
-                return
+        # a request which was already remapped is remapped again: keep
+        # its original device
+        req = self._remap_requests.pop((old_dev, old_sector), None)
+
+        if req is not None:
+            req.dev = dev
+            req.sector = sector
+        else:
+            req = sv.BlockRemapRequest(dev, sector, old_dev, old_sector)
+
+        self._remap_requests.pop((dev, sector), None)
+        self._remap_requests[(dev, sector)] = req
 
-        req = sv.BlockRemapRequest(dev, sector, old_dev, old_sector)
-        self._remap_requests.append(req)
+        if len(self._remap_requests) > self.MAX_REMAP_REQUESTS:
+            self._remap_requests.popitem(last=False)
 
     # For backmerge requests, just remove the request from the
     # _remap_requests queue, because we rely later on the nr_sector
     # which has all the info we need
     def _process_block_bio_backmerge(self, event):
-        dev = event['dev']
-        sector = event['sector']
-        for remap_req in self._remap_requests:
-            if remap_req.dev == dev and remap_req.sector == sector:
-                self._remap_requests.remove(remap_req)
+        self._remap_requests.pop((event['dev'], event['sector']), None)
 
     def _process_block_rq_issue(self, event):
         dev = event['dev']
@@ -70,11 +85,10 @@ class BlockStateProvider(sp.StateProvider):
             return
 
         req = sv.BlockIORequest.new_from_rq_issue(event)
+        remap_req = self._remap_requests.get((dev, sector))
 
-        for remap_req in self._remap_requests:
-            if remap_req.dev == dev and remap_req.sector == sector:
-                dev = remap_req.old_dev
-                break
+        if remap_req is not None:
+            dev = remap_req.old_dev
 
         if dev not in self._state.disks:
             self._state.disks[dev] = sv.Disk(dev)
@@ -89,11 +103,10 @@ class BlockStateProvider(sp.StateProvider):
         if nr_sector == 0:
             return
 
-        for remap_req in self._remap_requests:
-            if remap_req.dev == dev and remap_req.sector == sector:
-                dev = remap_req.old_dev
-                self._remap_requests.remove(remap_req)
-                break
+        remap_req = self._remap_requests.pop((dev, sector), None)
+
+        if remap_req is not None:
+            dev = remap_req.old_dev
 
         if dev not in self._state.disks:
             self._state.disks[dev] = sv.Disk(dev)
@@ -110,11 +123,12 @@ class BlockStateProvider(sp.StateProvider):
             return
 
         req.update_from_rq_complete(event)
-        if req.tid in self._state.tids.keys():
-            proc = self._state.tids[req.tid]
-        else:
-            proc = None
-        self._state.send_notification_cb('block_rq_complete', req=req,
-                                         proc=proc, cpu_id=event['cpu_id'],
-                                         disk=disk)
+        # The process which issued the request may be dead already:
+        # `proc` is then an sv.DeadProcess, which only has the `tid`,
+        # `pid` and `comm` attributes of an sv.Process.
+        proc = self._state.find_process(req.tid)
+        self._state.send_notification_cb(
+            'block_rq_complete',
+            notification.BlockRequestNotification(req, proc, event['cpu_id'],
+                                                  disk))
         del disk.pending_requests[sector]
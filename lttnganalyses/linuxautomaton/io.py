@@ -24,11 +24,18 @@
 import os
 import socket
 from babeltrace import CTFScope
-from . import sp, sv
-from ..common import format_utils, trace_utils
+from . import notification, sp, sv
+from .sched import SchedStateProvider
+from .statedump import StatedumpStateProvider
+from .syscalls import SyscallsStateProvider
+from ..common import format_utils
 
 
 class IoStateProvider(sp.StateProvider):
+    PRODUCES = ('io_rq_exit', 'create_fd', 'close_fd', 'update_fd')
+    DEPENDS = (SchedStateProvider, SyscallsStateProvider,
+               StatedumpStateProvider)
+
     def __init__(self, state):
         cbs = {
             'syscall_entry': self._process_syscall_entry,
@@ -43,8 +50,8 @@ class IoStateProvider(sp.StateProvider):
 
     def _process_syscall_entry(self, event):
         # Only handle IO Syscalls
-        name = trace_utils.get_syscall_name(event)
-        if name not in sv.SyscallConsts.IO_SYSCALLS:
+        descriptor = sv.SyscallDescriptor.get(event)
+        if not descriptor.is_io:
             return
 
         cpu_id = event['cpu_id']
@@ -60,15 +67,14 @@ class IoStateProvider(sp.StateProvider):
         # check if we can fix the pid from a context
         self._fix_context_pid(event, proc)
 
-        if name in sv.SyscallConsts.OPEN_SYSCALLS:
-            self._track_open(event, name, proc)
-        elif name in sv.SyscallConsts.CLOSE_SYSCALLS:
-            self._track_close(event, name, proc)
-        elif name in sv.SyscallConsts.READ_SYSCALLS or \
-                name in sv.SyscallConsts.WRITE_SYSCALLS:
-            self._track_read_write(event, name, proc)
-        elif name in sv.SyscallConsts.SYNC_SYSCALLS:
-            self._track_sync(event, name, proc)
+        track_cb = self._TRACK_CBS.get(descriptor.operation)
+
+        if track_cb is not None:
+            track_cb(self, event, descriptor, proc)
+
+        if proc.current_syscall.io_rq:
+            self._state.io_cpus.add(cpu_id)
+            self._state.io_tids.add(proc.tid)
 
     def _process_syscall_exit(self, event):
         cpu_id = event['cpu_id']
@@ -84,13 +90,14 @@ class IoStateProvider(sp.StateProvider):
         if current_syscall is None:
             return
 
-        name = current_syscall.name
-        if name not in sv.SyscallConsts.IO_SYSCALLS:
+        if not current_syscall.descriptor.is_io:
             return
 
         self._track_io_rq_exit(event, proc)
 
         proc.current_syscall = None
+        self._state.io_cpus.discard(cpu_id)
+        self._state.io_tids.discard(proc.tid)
 
     def _process_connect(self, event):
         cpu_id = event['cpu_id']
@@ -111,14 +118,14 @@ class IoStateProvider(sp.StateProvider):
                 parent_proc.fds[fd].filename = format_utils.format_ipv4(
                     event['v4addr'], event['dport']
                 )
-            self._state.send_notification_cb('update_fd',
-                                             fd=fd,
-                                             parent_proc=proc,
-                                             timestamp=event.timestamp,
-                                             cpu_id=event['cpu_id'])
+            self._state.send_notification_cb(
+                'update_fd',
+                notification.FDNotification(fd, proc, event.timestamp,
+                                            event['cpu_id']))
 
     def _process_writeback_pages_written(self, event):
-        for cpu in self._state.cpus.values():
+        for cpu_id in self._state.io_cpus:
+            cpu = self._state.cpus[cpu_id]
             if cpu.current_tid is None:
                 continue
 
@@ -146,7 +153,12 @@ class IoStateProvider(sp.StateProvider):
             current_syscall.io_rq.woke_kswapd = True
 
     def _process_mm_page_free(self, event):
-        for cpu in self._state.cpus.values():
+        # only the current task of these CPUs can have an I/O request
+        # which woke kswapd up, or be kswapd
+        cpu_ids = self._state.io_cpus.union(self._state.kswapd_cpus)
+
+        for cpu_id in cpu_ids:
+            cpu = self._state.cpus[cpu_id]
             if cpu.current_tid is None:
                 continue
 
@@ -156,7 +168,10 @@ class IoStateProvider(sp.StateProvider):
             # attribute the page freed to the process that
             # woke it up.
             if proc.comm == 'kswapd0' and proc.prev_tid > 0:
-                proc = self._state.tids[proc.prev_tid]
+                proc = self._state.tids.get(proc.prev_tid)
+
+                if proc is None:
+                    continue
 
             current_syscall = proc.current_syscall
             if current_syscall is None:
@@ -165,8 +180,10 @@ class IoStateProvider(sp.StateProvider):
             if current_syscall.io_rq and current_syscall.io_rq.woke_kswapd:
                 current_syscall.io_rq.pages_freed += 1
 
-    def _track_open(self, event, name, proc):
+    def _track_open(self, event, descriptor, proc):
         current_syscall = proc.current_syscall
+        name = descriptor.name
+
         if name in sv.SyscallConsts.DISK_OPEN_SYSCALLS:
             current_syscall.io_rq = sv.OpenIORequest.new_from_disk_open(
                 event, proc.tid)
@@ -213,12 +230,13 @@ class IoStateProvider(sp.StateProvider):
             cloexec = event['flags'] & os.O_CLOEXEC == os.O_CLOEXEC
             current_syscall.io_rq.cloexec = cloexec
 
-    def _track_close(self, event, name, proc):
+    def _track_close(self, event, descriptor, proc):
         proc.current_syscall.io_rq = sv.CloseIORequest(
             event.timestamp, proc.tid, event['fd'])
 
-    def _track_read_write(self, event, name, proc):
+    def _track_read_write(self, event, descriptor, proc):
         current_syscall = proc.current_syscall
+        name = descriptor.name
 
         if name == 'splice':
             current_syscall.io_rq = sv.ReadWriteIORequest.new_from_splice(
@@ -229,22 +247,12 @@ class IoStateProvider(sp.StateProvider):
                 event, proc.tid)
             return
 
-        if name in ['writev', 'pwritev', 'readv', 'preadv']:
-            size_key = 'vlen'
-        elif name == 'recvfrom':
-            size_key = 'size'
-        elif name == 'sendto':
-            size_key = 'len'
-        elif name in ['recvmsg', 'sendmsg']:
-            size_key = None
-        else:
-            size_key = 'count'
-
         current_syscall.io_rq = sv.ReadWriteIORequest.new_from_fd_event(
-            event, proc.tid, size_key)
+            event, proc.tid, descriptor)
 
-    def _track_sync(self, event, name, proc):
+    def _track_sync(self, event, descriptor, proc):
         current_syscall = proc.current_syscall
+        name = descriptor.name
 
         if name == 'sync':
             current_syscall.io_rq = sv.SyncIORequest.new_from_sync(
@@ -256,6 +264,17 @@ class IoStateProvider(sp.StateProvider):
             current_syscall.io_rq = sv.SyncIORequest.new_from_sync_file_range(
                 event, proc.tid)
 
+    # I/O operation to the method which creates the I/O request of the
+    # system calls of this operation. The system calls which both read
+    # and write (splice, sendfile64) are not tracked.
+    _TRACK_CBS = {
+        sv.IORequest.OP_OPEN: _track_open,
+        sv.IORequest.OP_CLOSE: _track_close,
+        sv.IORequest.OP_READ: _track_read_write,
+        sv.IORequest.OP_WRITE: _track_read_write,
+        sv.IORequest.OP_SYNC: _track_sync,
+    }
+
     def _track_io_rq_exit(self, event, proc):
         ret = event['ret']
         cpu_id = event['cpu_id']
@@ -272,11 +291,10 @@ class IoStateProvider(sp.StateProvider):
             self._create_fd(proc, io_rq, cpu_id)
 
         parent_proc = self._get_parent_proc(proc)
-        self._state.send_notification_cb('io_rq_exit',
-                                         io_rq=io_rq,
-                                         proc=proc,
-                                         parent_proc=parent_proc,
-                                         cpu_id=cpu_id)
+        self._state.send_notification_cb(
+            'io_rq_exit',
+            notification.IORequestNotification(io_rq, proc, parent_proc,
+                                               cpu_id))
 
         if isinstance(io_rq, sv.CloseIORequest) and ret == 0:
             self._close_fd(proc, io_rq.fd, io_rq.end_ts, cpu_id)
@@ -289,42 +307,40 @@ class IoStateProvider(sp.StateProvider):
                 parent_proc.fds[io_rq.fd] = sv.FD.new_from_open_rq(io_rq)
             else:
                 parent_proc.fds[io_rq.fd] = sv.FD(io_rq.fd)
+                parent_proc.fds[io_rq.fd].incomplete = True
 
-            self._state.send_notification_cb('create_fd',
-                                             fd=io_rq.fd,
-                                             parent_proc=parent_proc,
-                                             timestamp=io_rq.end_ts,
-                                             cpu_id=cpu_id)
+            self._state.send_notification_cb(
+                'create_fd',
+                notification.FDNotification(io_rq.fd, parent_proc,
+                                            io_rq.end_ts, cpu_id))
         elif isinstance(io_rq, sv.ReadWriteIORequest):
             if io_rq.fd_in is not None and io_rq.fd_in not in parent_proc.fds:
                 parent_proc.fds[io_rq.fd_in] = sv.FD(io_rq.fd_in)
-                self._state.send_notification_cb('create_fd',
-                                                 fd=io_rq.fd_in,
-                                                 parent_proc=parent_proc,
-                                                 timestamp=io_rq.end_ts,
-                                                 cpu_id=cpu_id)
+                parent_proc.fds[io_rq.fd_in].incomplete = True
+                self._state.send_notification_cb(
+                    'create_fd',
+                    notification.FDNotification(io_rq.fd_in, parent_proc,
+                                                io_rq.end_ts, cpu_id))
 
             if io_rq.fd_out is not None and \
                io_rq.fd_out not in parent_proc.fds:
                 parent_proc.fds[io_rq.fd_out] = sv.FD(io_rq.fd_out)
-                self._state.send_notification_cb('create_fd',
-                                                 fd=io_rq.fd_out,
-                                                 parent_proc=parent_proc,
-                                                 timestamp=io_rq.end_ts,
-                                                 cpu_id=cpu_id)
+                parent_proc.fds[io_rq.fd_out].incomplete = True
+                self._state.send_notification_cb(
+                    'create_fd',
+                    notification.FDNotification(io_rq.fd_out, parent_proc,
+                                                io_rq.end_ts, cpu_id))
 
     def _close_fd(self, proc, fd, timestamp, cpu_id):
         parent_proc = self._get_parent_proc(proc)
-        self._state.send_notification_cb('close_fd',
-                                         fd=fd,
-                                         parent_proc=parent_proc,
-                                         timestamp=timestamp,
-                                         cpu_id=cpu_id)
+        self._state.send_notification_cb(
+            'close_fd',
+            notification.FDNotification(fd, parent_proc, timestamp, cpu_id))
         del parent_proc.fds[fd]
 
     def _get_parent_proc(self, proc):
         if proc.pid is not None and proc.tid != proc.pid:
-            parent_proc = self._state.tids[proc.pid]
+            parent_proc = self._state.tids.get(proc.pid, proc)
         else:
             parent_proc = proc
 
@@ -21,10 +21,12 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from . import sp, sv
+from . import notification, sp, sv
 
 
 class IrqStateProvider(sp.StateProvider):
+    PRODUCES = ('irq_handler_entry', 'irq_handler_exit', 'softirq_exit')
+
     def __init__(self, state):
         cbs = {
             'irq_handler_entry': self._process_irq_handler_entry,
@@ -48,9 +50,9 @@ class IrqStateProvider(sp.StateProvider):
         irq = sv.HardIRQ.new_from_irq_handler_entry(event)
         cpu.current_hard_irq = irq
 
-        self._state.send_notification_cb('irq_handler_entry',
-                                         id=irq.id,
-                                         irq_name=event['name'])
+        self._state.send_notification_cb(
+            'irq_handler_entry',
+            notification.IrqHandlerEntryNotification(irq.id, event['name']))
 
     def _process_irq_handler_exit(self, event):
         cpu = self._get_cpu(event['cpu_id'])
@@ -62,8 +64,9 @@ class IrqStateProvider(sp.StateProvider):
         cpu.current_hard_irq.end_ts = event.timestamp
         cpu.current_hard_irq.ret = event['ret']
 
-        self._state.send_notification_cb('irq_handler_exit',
-                                         hard_irq=cpu.current_hard_irq)
+        self._state.send_notification_cb(
+            'irq_handler_exit',
+            notification.IrqExitNotification(cpu.current_hard_irq))
         cpu.current_hard_irq = None
 
     # SoftIRQs
@@ -113,6 +116,7 @@ class IrqStateProvider(sp.StateProvider):
             return
 
         current_softirqs[0].end_ts = event.timestamp
-        self._state.send_notification_cb('softirq_exit',
-                                         softirq=current_softirqs[0])
+        self._state.send_notification_cb(
+            'softirq_exit',
+            notification.IrqExitNotification(current_softirqs[0]))
         del current_softirqs[0]
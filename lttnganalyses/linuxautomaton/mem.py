@@ -21,10 +21,14 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from . import sp
+from . import notification, sp
+from .sched import SchedStateProvider
 
 
 class MemStateProvider(sp.StateProvider):
+    PRODUCES = ('tid_page_alloc', 'tid_page_free')
+    DEPENDS = (SchedStateProvider,)
+
     def __init__(self, state):
         cbs = {
             'mm_page_alloc': self._process_mm_page_alloc,
@@ -51,20 +55,32 @@ class MemStateProvider(sp.StateProvider):
 
         # Increment the number of pages allocated during the execution
         # of all currently syscall io requests
-        for process in self._state.tids.values():
-            if process.current_syscall is None:
+        ended_tids = []
+
+        for tid in self._state.io_tids:
+            process = self._state.tids.get(tid)
+
+            if process is None or process.current_syscall is None or \
+                    not process.current_syscall.io_rq:
+                # the system call ended without an exit event
+                ended_tids.append(tid)
                 continue
 
-            if process.current_syscall.io_rq:
-                process.current_syscall.io_rq.pages_allocated += 1
+            process.current_syscall.io_rq.pages_allocated += 1
+
+        self._state.io_tids.difference_update(ended_tids)
+
+        if not self._state.has_notification_cbs('tid_page_alloc'):
+            return
 
         current_process = self._get_current_proc(event)
         if current_process is None:
             return
 
-        self._state.send_notification_cb('tid_page_alloc',
-                                         proc=current_process,
-                                         cpu_id=event['cpu_id'])
+        self._state.send_notification_cb(
+            'tid_page_alloc',
+            notification.ProcessNotification(current_process,
+                                             event['cpu_id']))
 
     def _process_mm_page_free(self, event):
         if self._state.mm.page_count == 0:
@@ -72,10 +88,14 @@ class MemStateProvider(sp.StateProvider):
 
         self._state.mm.page_count -= 1
 
+        if not self._state.has_notification_cbs('tid_page_free'):
+            return
+
         current_process = self._get_current_proc(event)
         if current_process is None:
             return
 
-        self._state.send_notification_cb('tid_page_free',
-                                         proc=current_process,
-                                         cpu_id=event['cpu_id'])
+        self._state.send_notification_cb(
+            'tid_page_free',
+            notification.ProcessNotification(current_process,
+                                             event['cpu_id']))
@@ -21,10 +21,16 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from . import sp, sv
+from . import notification, sp, sv
+from .io import IoStateProvider
 
 
 class NetStateProvider(sp.StateProvider):
+    PRODUCES = ('net_dev_xmit', 'netif_receive_skb')
+
+    # the I/O requests of the current system calls
+    DEPENDS = (IoStateProvider,)
+
     def __init__(self, state):
         cbs = {
             'net_dev_xmit': self._process_net_dev_xmit,
@@ -34,10 +40,12 @@ class NetStateProvider(sp.StateProvider):
         super().__init__(state, cbs)
 
     def _process_net_dev_xmit(self, event):
-        self._state.send_notification_cb('net_dev_xmit',
-                                         iface_name=event['name'],
-                                         sent_bytes=event['len'],
-                                         cpu_id=event['cpu_id'])
+        if self._state.has_notification_cbs('net_dev_xmit'):
+            self._state.send_notification_cb(
+                'net_dev_xmit',
+                notification.NetDeviceNotification(event['name'],
+                                                   event['len'],
+                                                   event['cpu_id']))
 
         cpu_id = event['cpu_id']
         if cpu_id not in self._state.cpus:
@@ -53,9 +61,9 @@ class NetStateProvider(sp.StateProvider):
             return
 
         if proc.pid is not None and proc.pid != proc.tid:
-            proc = self._state.tids[proc.pid]
+            proc = self._state.tids.get(proc.pid, proc)
 
-        if current_syscall.name in sv.SyscallConsts.WRITE_SYSCALLS:
+        if current_syscall.descriptor.operation == sv.IORequest.OP_WRITE:
             # TODO: find a way to set fd_type on the write rq to allow
             # setting FD Type if FD hasn't yet been created
             fd = current_syscall.io_rq.fd
@@ -63,7 +71,10 @@ class NetStateProvider(sp.StateProvider):
                 proc.fds[fd].fd_type = sv.FDType.maybe_net
 
     def _process_netif_receive_skb(self, event):
-        self._state.send_notification_cb('netif_receive_skb',
-                                         iface_name=event['name'],
-                                         recv_bytes=event['len'],
-                                         cpu_id=event['cpu_id'])
+        if not self._state.has_notification_cbs('netif_receive_skb'):
+            return
+
+        self._state.send_notification_cb(
+            'netif_receive_skb',
+            notification.NetDeviceNotification(event['name'], event['len'],
+                                               event['cpu_id']))
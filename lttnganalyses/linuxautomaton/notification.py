@@ -0,0 +1,204 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+# The payload classes of the notifications, built once per event by
+# the state providers. They define __slots__ since some of them are
+# built for each scheduling switch or page allocation.
+
+# sched_switch_per_cpu, sched_switch_per_tid
+class SchedSwitchNotification():
+    __slots__ = ('timestamp', 'cpu_id', 'prev_tid', 'prev_comm', 'next_tid',
+                 'next_comm', 'wakee_proc', 'waker_proc')
+
+    def __init__(self, timestamp, cpu_id, prev_tid, prev_comm, next_tid,
+                 next_comm, wakee_proc, waker_proc):
+        self.timestamp = timestamp
+        self.cpu_id = cpu_id
+        self.prev_tid = prev_tid
+        self.prev_comm = prev_comm
+        self.next_tid = next_tid
+        self.next_comm = next_comm
+        self.wakee_proc = wakee_proc
+        self.waker_proc = waker_proc
+
+
+# prio_changed
+class PrioChangedNotification():
+    __slots__ = ('timestamp', 'tid', 'prio')
+
+    def __init__(self, timestamp, tid, prio):
+        self.timestamp = timestamp
+        self.tid = tid
+        self.prio = prio
+
+
+# sched_migrate_task, tid_page_alloc, tid_page_free
+class ProcessNotification():
+    __slots__ = ('proc', 'cpu_id')
+
+    def __init__(self, proc, cpu_id):
+        self.proc = proc
+        self.cpu_id = cpu_id
+
+
+# create_parent_proc
+class ParentProcessNotification():
+    __slots__ = ('proc', 'parent_proc')
+
+    def __init__(self, proc, parent_proc):
+        self.proc = proc
+        self.parent_proc = parent_proc
+
+
+# create_fd, close_fd, update_fd
+class FDNotification():
+    __slots__ = ('fd', 'parent_proc', 'timestamp', 'cpu_id')
+
+    def __init__(self, fd, parent_proc, timestamp, cpu_id):
+        self.fd = fd
+        self.parent_proc = parent_proc
+        self.timestamp = timestamp
+        self.cpu_id = cpu_id
+
+
+# io_rq_exit
+class IORequestNotification():
+    __slots__ = ('io_rq', 'proc', 'parent_proc', 'cpu_id')
+
+    def __init__(self, io_rq, proc, parent_proc, cpu_id):
+        self.io_rq = io_rq
+        self.proc = proc
+        self.parent_proc = parent_proc
+        self.cpu_id = cpu_id
+
+
+# block_rq_complete
+class BlockRequestNotification():
+    __slots__ = ('req', 'proc', 'cpu_id', 'disk')
+
+    def __init__(self, req, proc, cpu_id, disk):
+        self.req = req
+        self.proc = proc
+        self.cpu_id = cpu_id
+        self.disk = disk
+
+
+# lttng_statedump_block_device
+class BlockDeviceNotification():
+    __slots__ = ('dev', 'diskname')
+
+    def __init__(self, dev, diskname):
+        self.dev = dev
+        self.diskname = diskname
+
+
+# net_dev_xmit (sent bytes), netif_receive_skb (received bytes)
+class NetDeviceNotification():
+    __slots__ = ('iface_name', 'size', 'cpu_id')
+
+    def __init__(self, iface_name, size, cpu_id):
+        self.iface_name = iface_name
+        self.size = size
+        self.cpu_id = cpu_id
+
+
+# irq_handler_entry
+class IrqHandlerEntryNotification():
+    __slots__ = ('id', 'irq_name')
+
+    def __init__(self, id, irq_name):
+        self.id = id
+        self.irq_name = irq_name
+
+
+# irq_handler_exit (sv.HardIRQ), softirq_exit (sv.SoftIRQ)
+class IrqExitNotification():
+    __slots__ = ('irq',)
+
+    def __init__(self, irq):
+        self.irq = irq
+
+
+# syscall_exit
+class SyscallExitNotification():
+    __slots__ = ('proc', 'event', 'cpu_id')
+
+    def __init__(self, proc, event, cpu_id):
+        self.proc = proc
+        self.event = event
+        self.cpu_id = cpu_id
+
+
+# Dispatches the notifications of the state providers to the callbacks
+# of the analyses.
+#
+# Each analysis subscribes a set of callbacks for each of its periods,
+# identified by its period data object, and unsubscribes all of them
+# when the period ends. Subscribing and unsubscribing are O(1) per
+# callback, whatever the number of concurrent periods.
+class NotificationBus:
+    def __init__(self):
+        # notification name to an ordered dictionary of period data
+        # to callback, in subscription order
+        self._cbs = {}
+
+        # period data to the names of its subscribed notifications
+        self._period_names = {}
+
+    # Subscribes the callbacks of `cbs`, a dictionary of notification
+    # name to callback, for the period data object `period_data`.
+    # A callback receives `period_data` and the payload object of the
+    # notification.
+    def subscribe(self, period_data, cbs):
+        names = self._period_names.setdefault(period_data, set())
+
+        for name, cb in cbs.items():
+            self._cbs.setdefault(name, {})[period_data] = cb
+            names.add(name)
+
+    def unsubscribe(self, period_data):
+        for name in self._period_names.pop(period_data, ()):
+            period_cbs = self._cbs[name]
+            del period_cbs[period_data]
+
+            if not period_cbs:
+                del self._cbs[name]
+
+    # Returns whether or not any callback is subscribed to the
+    # notification named `name`, so that a state provider can skip
+    # building its payload.
+    def has_subscribers(self, name):
+        return name in self._cbs
+
+    # Sends the payload object `notification` to all the callbacks
+    # subscribed to the notification named `name`: the same object is
+    # passed to the callbacks of all the periods, which must not
+    # modify it.
+    def send(self, name, notification):
+        period_cbs = self._cbs.get(name)
+
+        if period_cbs is None:
+            return
+
+        for period_data, cb in period_cbs.items():
+            cb(period_data, notification)
@@ -21,7 +21,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from . import sp, sv
+from . import notification, sp, sv
+from .statedump import StatedumpStateProvider
 from ..common import version_utils
 
 
@@ -30,6 +31,13 @@ class SchedStateProvider(sp.StateProvider):
     # lttng-modules 2.7.1 upwards
     PRIO_OFFSET_FIX_VERSION = version_utils.Version(2, 7, 1)
 
+    PRODUCES = ('sched_migrate_task', 'sched_switch_per_cpu',
+                'sched_switch_per_tid', 'prio_changed', 'create_fd',
+                'close_fd')
+
+    # names and PIDs of the processes
+    DEPENDS = (StatedumpStateProvider,)
+
     def __init__(self, state):
         cbs = {
             'sched_switch': self._process_sched_switch,
@@ -39,6 +47,8 @@ class SchedStateProvider(sp.StateProvider):
             'sched_waking': self._process_sched_wakeup,
             'sched_process_fork': self._process_sched_process_fork,
             'sched_process_exec': self._process_sched_process_exec,
+            'sched_process_exit': self._process_sched_process_exit,
+            'sched_process_free': self._process_sched_process_free,
             'sched_pi_setprio': self._process_sched_pi_setprio,
         }
 
@@ -49,11 +59,38 @@ class SchedStateProvider(sp.StateProvider):
             self._state.cpus[cpu_id] = sv.CPU(cpu_id)
 
         cpu = self._state.cpus[cpu_id]
+        tid_cpus = self._state.tid_cpus
+
+        if cpu.current_tid is not None:
+            cpu_ids = tid_cpus[cpu.current_tid]
+            cpu_ids.discard(cpu_id)
+
+            if not cpu_ids:
+                del tid_cpus[cpu.current_tid]
+
         # exclude swapper process
         if next_tid == 0:
             cpu.current_tid = None
         else:
             cpu.current_tid = next_tid
+            tid_cpus.setdefault(next_tid, set()).add(cpu_id)
+
+    # Updates the sets of the CPUs running a task in an I/O system call
+    # and of the CPUs running kswapd after `next_tid` was scheduled on
+    # the CPU `cpu_id`.
+    def _update_cpu_sets(self, cpu_id, next_tid):
+        next_proc = self._state.tids[next_tid]
+        syscall = next_proc.current_syscall
+
+        if next_tid != 0 and syscall is not None and syscall.io_rq:
+            self._state.io_cpus.add(cpu_id)
+        else:
+            self._state.io_cpus.discard(cpu_id)
+
+        if next_tid != 0 and next_proc.comm == 'kswapd0':
+            self._state.kswapd_cpus.add(cpu_id)
+        else:
+            self._state.kswapd_cpus.discard(cpu_id)
 
     def _create_proc(self, tid):
         if tid not in self._state.tids:
@@ -82,7 +119,8 @@ class SchedStateProvider(sp.StateProvider):
         if proc.prio != prio:
             proc.prio = prio
             self._state.send_notification_cb(
-                'prio_changed', timestamp=timestamp, tid=tid, prio=prio)
+                'prio_changed',
+                notification.PrioChangedNotification(timestamp, tid, prio))
 
     def _process_sched_switch(self, event):
         timestamp = event.timestamp
@@ -96,27 +134,23 @@ class SchedStateProvider(sp.StateProvider):
 
         self._sched_switch_per_cpu(cpu_id, next_tid)
         self._sched_switch_per_tid(next_tid, next_comm, prev_tid)
+        self._update_cpu_sets(cpu_id, next_tid)
         self._check_prio_changed(timestamp, prev_tid, prev_prio)
         self._check_prio_changed(timestamp, next_tid, next_prio)
 
         wakee_proc = self._state.tids[next_tid]
-        waker_proc = None
-        if wakee_proc.last_waker is not None:
-            waker_proc = self._state.tids[wakee_proc.last_waker]
-
-        cb_data = {
-            'timestamp': timestamp,
-            'cpu_id': cpu_id,
-            'prev_tid': prev_tid,
-            'next_tid': next_tid,
-            'next_comm': next_comm,
-            'wakee_proc': wakee_proc,
-            'waker_proc': waker_proc,
-            'prev_comm': prev_comm,
-        }
 
-        self._state.send_notification_cb('sched_switch_per_cpu', **cb_data)
-        self._state.send_notification_cb('sched_switch_per_tid', **cb_data)
+        if self._state.has_notification_cbs('sched_switch_per_cpu') or \
+                self._state.has_notification_cbs('sched_switch_per_tid'):
+            waker_proc = None
+            if wakee_proc.last_waker is not None:
+                waker_proc = self._state.tids.get(wakee_proc.last_waker)
+
+            switch = notification.SchedSwitchNotification(
+                timestamp, cpu_id, prev_tid, prev_comm, next_tid, next_comm,
+                wakee_proc, waker_proc)
+            self._state.send_notification_cb('sched_switch_per_cpu', switch)
+            self._state.send_notification_cb('sched_switch_per_tid', switch)
 
         wakee_proc.last_wakeup = None
         wakee_proc.last_waker = None
@@ -134,7 +168,8 @@ class SchedStateProvider(sp.StateProvider):
             proc = self._state.tids[tid]
 
         self._state.send_notification_cb(
-            'sched_migrate_task', proc=proc, cpu_id=event['cpu_id'])
+            'sched_migrate_task',
+            notification.ProcessNotification(proc, event['cpu_id']))
         self._check_prio_changed(event.timestamp, tid, prio)
 
     def _process_sched_wakeup(self, event):
@@ -153,10 +188,8 @@ class SchedStateProvider(sp.StateProvider):
             self._state.cpus[current_cpu] = sv.CPU(current_cpu)
 
         # If the TID is already executing on a CPU, ignore this wakeup
-        for cpu_id in self._state.cpus:
-            cpu = self._state.cpus[cpu_id]
-            if cpu.current_tid == tid:
-                return
+        if tid in self._state.tid_cpus:
+            return
 
         if tid not in self._state.tids:
             proc = sv.Process()
@@ -190,6 +223,8 @@ class SchedStateProvider(sp.StateProvider):
 
         parent_proc = self._state.tids[parent_pid]
         child_proc = sv.Process(child_tid, child_pid, child_comm)
+        child_proc.incomplete = False
+        child_proc.begin_ts = event.timestamp
 
         for fd in parent_proc.fds:
             old_fd = parent_proc.fds[fd]
@@ -198,8 +233,9 @@ class SchedStateProvider(sp.StateProvider):
             # refers to the parent of the FD, which in this case is
             # the child_proc created by the fork
             self._state.send_notification_cb(
-                'create_fd', fd=fd, parent_proc=child_proc,
-                timestamp=event.timestamp, cpu_id=event['cpu_id'])
+                'create_fd',
+                notification.FDNotification(fd, child_proc, event.timestamp,
+                                            event['cpu_id']))
 
         self._state.tids[child_tid] = child_proc
 
@@ -223,8 +259,9 @@ class SchedStateProvider(sp.StateProvider):
                 toremove.append(fd)
         for fd in toremove:
             self._state.send_notification_cb(
-                'close_fd', fd=fd, parent_proc=proc,
-                timestamp=event.timestamp, cpu_id=event['cpu_id'])
+                'close_fd',
+                notification.FDNotification(fd, proc, event.timestamp,
+                                            event['cpu_id']))
             del proc.fds[fd]
 
     def _process_sched_pi_setprio(self, event):
@@ -233,3 +270,47 @@ class SchedStateProvider(sp.StateProvider):
         tid = event['tid']
 
         self._check_prio_changed(timestamp, tid, newprio)
+
+    def _process_sched_process_exit(self, event):
+        tid = event['tid']
+
+        if tid in self._state.tids:
+            self._state.tids[tid].end_ts = event.timestamp
+
+    # The task is switched out for the last time after its exit: it
+    # only leaves the state once the kernel frees it.
+    def _process_sched_process_free(self, event):
+        tid = event['tid']
+
+        # never retire the swapper
+        if tid == 0 or tid not in self._state.tids:
+            return
+
+        self._retire_proc(tid)
+
+    # Moves the process of TID `tid` from the live state to the
+    # summaries of the dead processes, evicting the oldest ones beyond
+    # State.max_dead_tids.
+    def _retire_proc(self, tid):
+        state = self._state
+        proc = state.tids.pop(tid)
+
+        for cpu_id in state.tid_cpus.pop(tid, ()):
+            state.cpus[cpu_id].current_tid = None
+            state.io_cpus.discard(cpu_id)
+            state.kswapd_cpus.discard(cpu_id)
+
+        state.io_tids.discard(tid)
+
+        # a TID can be reused: keep the last process which had it
+        state.dead_tids.pop(tid, None)
+
+        if state.max_dead_tids <= 0:
+            return
+
+        state.dead_tids[tid] = sv.DeadProcess(
+            proc.tid, proc.pid, proc.comm, proc.begin_ts, proc.end_ts,
+            proc.incomplete)
+
+        while len(state.dead_tids) > state.max_dead_tids:
+            state.dead_tids.popitem(last=False)
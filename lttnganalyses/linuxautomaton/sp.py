@@ -20,22 +20,51 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from ..common import trace_utils
+
 
 class StateProvider:
+    # Names of the notifications sent by this state provider
+    PRODUCES = ()
+
+    # Classes of the state providers which maintain state on which
+    # this state provider relies
+    DEPENDS = ()
+
     def __init__(self, state, cbs):
         self._state = state
         self._cbs = cbs
 
+    # Names of the events (or, for system calls, 'syscall_entry' and
+    # 'syscall_exit') consumed by this state provider.
+    @property
+    def event_names(self):
+        return set(self._cbs.keys())
+
+    def consumes_event(self, name):
+        return self.get_event_cb(name) is not None
+
+    # Returns the callback handling the events named `name`, or None if
+    # this state provider does not consume them.
+    def get_event_cb(self, name):
+        return trace_utils.get_event_cb(self._cbs, name)
+
+    # Returns the private data of this state provider to save in a
+    # snapshot, that is, everything but the state and the callbacks.
+    def get_snapshot_data(self):
+        return {name: value for name, value in self.__dict__.items()
+                if name not in ('_state', '_cbs')}
+
+    def restore_snapshot_data(self, data):
+        self.__dict__.update(data)
+
+    # Replaces each callback by `wrap(name, cb)`, where `name` is the
+    # name of the consumed event.
+    def wrap_cbs(self, wrap):
+        self._cbs = {name: wrap(name, cb) for name, cb in self._cbs.items()}
+
     def process_event(self, ev):
-        name = ev.name
-
-        if name in self._cbs:
-            self._cbs[name](ev)
-        # for now we process all the syscalls at the same place
-        elif 'syscall_entry' in self._cbs and \
-                (name.startswith('sys_') or name.startswith('syscall_entry_')):
-            self._cbs['syscall_entry'](ev)
-        elif 'syscall_exit' in self._cbs and \
-                (name.startswith('exit_syscall') or
-                 name.startswith('syscall_exit_')):
-            self._cbs['syscall_exit'](ev)
+        cb = self.get_event_cb(ev.name)
+
+        if cb is not None:
+            cb(ev)
@@ -22,10 +22,13 @@
 # SOFTWARE.
 
 import os
-from . import sp, sv
+from . import notification, sp, sv
 
 
 class StatedumpStateProvider(sp.StateProvider):
+    PRODUCES = ('create_fd', 'update_fd', 'create_parent_proc',
+                'lttng_statedump_block_device')
+
     def __init__(self, state):
         cbs = {
             'lttng_statedump_process_state':
@@ -46,8 +49,9 @@ class StatedumpStateProvider(sp.StateProvider):
             self._state.disks[dev] = sv.Disk(dev, diskname=diskname)
         elif self._state.disks[dev].diskname is None:
             self._state.disks[dev].diskname = diskname
-        self._state.send_notification_cb('lttng_statedump_block_device',
-                                         dev=dev, diskname=diskname)
+        self._state.send_notification_cb(
+            'lttng_statedump_block_device',
+            notification.BlockDeviceNotification(dev, diskname))
 
     def _process_lttng_statedump_process_state(self, event):
         tid = event['tid']
@@ -65,6 +69,7 @@ class StatedumpStateProvider(sp.StateProvider):
         # missing, add it now.
         proc.pid = pid
         proc.comm = name
+        proc.incomplete = False
         # However don't override the prio value if we already got the
         # information from sched_* events.
         if proc.prio is None:
@@ -83,9 +88,9 @@ class StatedumpStateProvider(sp.StateProvider):
             # If the thread had opened FDs, they need to be assigned
             # to the parent.
             StatedumpStateProvider._assign_fds_to_parent(proc, parent)
-            self._state.send_notification_cb('create_parent_proc',
-                                             proc=proc,
-                                             parent_proc=parent)
+            self._state.send_notification_cb(
+                'create_parent_proc',
+                notification.ParentProcessNotification(proc, parent))
 
     def _process_lttng_statedump_file_descriptor(self, event):
         pid = event['pid']
@@ -100,19 +105,17 @@ class StatedumpStateProvider(sp.StateProvider):
 
         if fd not in proc.fds:
             proc.fds[fd] = sv.FD(fd, filename, sv.FDType.unknown, cloexec)
-            self._state.send_notification_cb('create_fd',
-                                             fd=fd,
-                                             parent_proc=proc,
-                                             timestamp=event.timestamp,
-                                             cpu_id=event['cpu_id'])
+            self._state.send_notification_cb(
+                'create_fd',
+                notification.FDNotification(fd, proc, event.timestamp,
+                                            event['cpu_id']))
         else:
             # just fix the filename
             proc.fds[fd].filename = filename
-            self._state.send_notification_cb('update_fd',
-                                             fd=fd,
-                                             parent_proc=proc,
-                                             timestamp=event.timestamp,
-                                             cpu_id=event['cpu_id'])
+            self._state.send_notification_cb(
+                'update_fd',
+                notification.FDNotification(fd, proc, event.timestamp,
+                                            event['cpu_id']))
 
     @staticmethod
     def _assign_fds_to_parent(proc, parent):
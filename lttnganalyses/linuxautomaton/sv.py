@@ -21,12 +21,19 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import collections
 import os
 import socket
 from ..common import format_utils, trace_utils
 
 
+# The state value classes define __slots__ since a trace can contain
+# millions of processes, file descriptors, and I/O requests.
 class Process():
+    __slots__ = ('tid', 'pid', 'comm', 'prio', 'fds', 'current_syscall',
+                 'prev_tid', 'last_wakeup', 'last_waker', 'incomplete',
+                 'begin_ts', 'end_ts')
+
     def __init__(self, tid=None, pid=None, comm='', prio=None):
         self.tid = tid
         self.pid = pid
@@ -39,9 +46,36 @@ class Process():
         self.prev_tid = None
         self.last_wakeup = None
         self.last_waker = None
+        # whether the process existed before the first event of the
+        # analyzed events which describes it (fork or statedump): some
+        # of its information might be missing
+        self.incomplete = True
+        # timestamps of the fork and of the exit of the process, if
+        # they are part of the analyzed events
+        self.begin_ts = None
+        self.end_ts = None
+
+
+# What remains of a process once the kernel freed it: enough to label
+# its TID in the results of the analyses. It has the `tid`, `pid`,
+# `comm` and `incomplete` attributes of a Process, so that it can be
+# passed where only those are used (stats.Process.new_from_process(),
+# for example), but none of its state (FDs, current system call, and
+# so on).
+DeadProcess = collections.namedtuple('DeadProcess', [
+    'tid',
+    'pid',
+    'comm',
+    'begin_ts',
+    'end_ts',
+    'incomplete',
+])
 
 
 class CPU():
+    __slots__ = ('cpu_id', 'current_tid', 'current_hard_irq',
+                 'current_softirqs')
+
     def __init__(self, cpu_id):
         self.cpu_id = cpu_id
         self.current_tid = None
@@ -53,13 +87,23 @@ class CPU():
 
 
 class MemoryManagement():
+    __slots__ = ('page_count',)
+
     def __init__(self):
         self.page_count = 0
 
 
 class SyscallEvent():
-    def __init__(self, name, begin_ts):
+    __slots__ = ('name', 'begin_ts', 'end_ts', 'ret', 'duration', 'io_rq',
+                 'descriptor')
+
+    def __init__(self, name, begin_ts, descriptor=None):
         self.name = name
+        # SyscallDescriptor of this system call
+        if descriptor is None:
+            descriptor = SyscallDescriptor(name)
+
+        self.descriptor = descriptor
         self.begin_ts = begin_ts
         self.end_ts = None
         self.ret = None
@@ -80,11 +124,13 @@ class SyscallEvent():
 
     @classmethod
     def new_from_entry(cls, event):
-        name = trace_utils.get_syscall_name(event)
-        return cls(name, event.timestamp)
+        descriptor = SyscallDescriptor.get(event)
+        return cls(descriptor.name, event.timestamp, descriptor)
 
 
 class Disk():
+    __slots__ = ('dev', 'diskname', 'pending_requests')
+
     def __init__(self, dev, diskname=None):
         self.dev = dev
         self.diskname = diskname
@@ -115,6 +161,9 @@ class FDType():
 
 
 class FD():
+    __slots__ = ('fd', 'filename', 'fd_type', 'cloexec', 'family',
+                 'incomplete')
+
     def __init__(self, fd, filename='unknown', fd_type=FDType.unknown,
                  cloexec=False, family=None):
         self.fd = fd
@@ -122,10 +171,16 @@ class FD():
         self.fd_type = fd_type
         self.cloexec = cloexec
         self.family = family
+        # whether the FD was opened before the analyzed events, without
+        # any event describing it (open or statedump)
+        self.incomplete = False
 
     @classmethod
     def new_from_fd(cls, fd):
-        return cls(fd.fd, fd.filename, fd.fd_type, fd.cloexec, fd.family)
+        new_fd = cls(fd.fd, fd.filename, fd.fd_type, fd.cloexec, fd.family)
+        new_fd.incomplete = fd.incomplete
+
+        return new_fd
 
     @classmethod
     def new_from_open_rq(cls, io_rq):
@@ -134,6 +189,8 @@ class FD():
 
 
 class IRQ():
+    __slots__ = ('id', 'cpu_id', 'begin_ts', 'end_ts')
+
     def __init__(self, id, cpu_id, begin_ts=None):
         self.id = id
         self.cpu_id = cpu_id
@@ -149,6 +206,8 @@ class IRQ():
 
 
 class HardIRQ(IRQ):
+    __slots__ = ('ret',)
+
     def __init__(self, id, cpu_id, begin_ts):
         super().__init__(id, cpu_id, begin_ts)
         self.ret = None
@@ -162,6 +221,8 @@ class HardIRQ(IRQ):
 
 
 class SoftIRQ(IRQ):
+    __slots__ = ('raise_ts',)
+
     def __init__(self, id, cpu_id, raise_ts=None, begin_ts=None):
         super().__init__(id, cpu_id, begin_ts)
         self.raise_ts = raise_ts
@@ -192,6 +253,9 @@ class IORequest():
     # e.g. splice and sendfile
     OP_READ_WRITE = 6
 
+    __slots__ = ('begin_ts', 'end_ts', 'duration', 'size', 'operation', 'tid',
+                 'errno')
+
     def __init__(self, begin_ts, size, tid, operation):
         self.begin_ts = begin_ts
         self.end_ts = None
@@ -224,6 +288,9 @@ class IORequest():
 
 
 class SyscallIORequest(IORequest):
+    __slots__ = ('fd', 'syscall_name', 'pages_allocated', 'pages_freed',
+                 'pages_written', 'woke_kswapd')
+
     def __init__(self, begin_ts, size, tid, operation, syscall_name):
         super().__init__(begin_ts, None, tid, operation)
         self.fd = None
@@ -243,6 +310,8 @@ class SyscallIORequest(IORequest):
 
 
 class OpenIORequest(SyscallIORequest):
+    __slots__ = ('filename', 'fd_type', 'family', 'cloexec')
+
     def __init__(self, begin_ts, tid, syscall_name, filename,
                  fd_type):
         super().__init__(begin_ts, None, tid, IORequest.OP_OPEN, syscall_name)
@@ -311,12 +380,16 @@ class OpenIORequest(SyscallIORequest):
 
 
 class CloseIORequest(SyscallIORequest):
+    __slots__ = ()
+
     def __init__(self, begin_ts, tid, fd):
         super().__init__(begin_ts, None, tid, IORequest.OP_CLOSE, 'close')
         self.fd = fd
 
 
 class ReadWriteIORequest(SyscallIORequest):
+    __slots__ = ('returned_size', 'fd_in', 'fd_out')
+
     def __init__(self, begin_ts, size, tid, operation, syscall_name):
         super().__init__(begin_ts, size, tid, operation, syscall_name)
         # The size returned on syscall exit, in bytes. May differ from
@@ -359,27 +432,23 @@ class ReadWriteIORequest(SyscallIORequest):
         return req
 
     @classmethod
-    def new_from_fd_event(cls, event, tid, size_key):
+    def new_from_fd_event(cls, event, tid, descriptor):
         begin_ts = event.timestamp
         # Some events, like recvmsg or sendmsg, only have size info on return
-        if size_key is not None:
-            size = event[size_key]
+        if descriptor.size_key is not None:
+            size = event[descriptor.size_key]
         else:
             size = None
 
-        syscall_name = trace_utils.get_syscall_name(event)
-        if syscall_name in SyscallConsts.READ_SYSCALLS:
-            operation = IORequest.OP_READ
-        else:
-            operation = IORequest.OP_WRITE
-
-        req = cls(begin_ts, size, tid, operation, syscall_name)
+        req = cls(begin_ts, size, tid, descriptor.operation, descriptor.name)
         req.fd = event['fd']
 
         return req
 
 
 class SyncIORequest(SyscallIORequest):
+    __slots__ = ()
+
     def __init__(self, begin_ts, size, tid, syscall_name):
         super().__init__(begin_ts, size, tid, IORequest.OP_SYNC, syscall_name)
 
@@ -414,6 +483,8 @@ class SyncIORequest(SyscallIORequest):
 
 
 class BlockIORequest(IORequest):
+    __slots__ = ('dev', 'sector', 'nr_sector')
+
     # Logical sector size in bytes, according to the kernel
     SECTOR_SIZE = 512
 
@@ -445,6 +516,8 @@ class BlockIORequest(IORequest):
 
 
 class BlockRemapRequest():
+    __slots__ = ('dev', 'sector', 'old_dev', 'old_sector')
+
     def __init__(self, dev, sector, old_dev, old_sector):
         self.dev = dev
         self.sector = sector
@@ -479,3 +552,58 @@ class SyscallConsts():
     # All I/O related syscalls
     IO_SYSCALLS = OPEN_SYSCALLS + CLOSE_SYSCALLS + READ_SYSCALLS + \
         WRITE_SYSCALLS + SYNC_SYSCALLS + READ_WRITE_SYSCALLS
+
+
+# What the analyses need to know about a system call, derived once from
+# its name rather than on each call.
+class SyscallDescriptor():
+    __slots__ = ('name', 'is_io', 'operation', 'size_key')
+
+    # event name to SyscallDescriptor
+    _descriptors = {}
+
+    def __init__(self, name):
+        # name of the system call, without the prefix of the event name
+        self.name = name
+        self.is_io = name in SyscallConsts.IO_SYSCALLS
+        # IORequest.OP_* value of the I/O system calls
+        self.operation = None
+        # name of the field of the entry event which contains the
+        # requested size of a read or write system call
+        self.size_key = None
+
+        if name in SyscallConsts.OPEN_SYSCALLS:
+            self.operation = IORequest.OP_OPEN
+        elif name in SyscallConsts.CLOSE_SYSCALLS:
+            self.operation = IORequest.OP_CLOSE
+        elif name in SyscallConsts.READ_SYSCALLS:
+            self.operation = IORequest.OP_READ
+        elif name in SyscallConsts.WRITE_SYSCALLS:
+            self.operation = IORequest.OP_WRITE
+        elif name in SyscallConsts.SYNC_SYSCALLS:
+            self.operation = IORequest.OP_SYNC
+        elif name in SyscallConsts.READ_WRITE_SYSCALLS:
+            self.operation = IORequest.OP_READ_WRITE
+
+        if self.operation in (IORequest.OP_READ, IORequest.OP_WRITE):
+            if name in ['writev', 'pwritev', 'readv', 'preadv']:
+                self.size_key = 'vlen'
+            elif name == 'recvfrom':
+                self.size_key = 'size'
+            elif name == 'sendto':
+                self.size_key = 'len'
+            elif name not in ['recvmsg', 'sendmsg']:
+                self.size_key = 'count'
+
+    # Returns the descriptor of the system call of the syscall entry
+    # event `event`, creating it the first time an event of this name
+    # is seen.
+    @classmethod
+    def get(cls, event):
+        descriptor = cls._descriptors.get(event.name)
+
+        if descriptor is None:
+            descriptor = cls(trace_utils.get_syscall_name(event))
+            cls._descriptors[event.name] = descriptor
+
+        return descriptor
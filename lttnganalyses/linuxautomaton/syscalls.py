@@ -21,10 +21,14 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from . import sp, sv
+from . import notification, sp, sv
+from .sched import SchedStateProvider
 
 
 class SyscallsStateProvider(sp.StateProvider):
+    PRODUCES = ('syscall_exit',)
+    DEPENDS = (SchedStateProvider,)
+
     def __init__(self, state):
         cbs = {
             'syscall_entry': self._process_syscall_entry,
@@ -33,6 +37,11 @@ class SyscallsStateProvider(sp.StateProvider):
 
         super().__init__(state, cbs)
 
+        # Whether this state provider clears the current system call of
+        # a process when it is an I/O system call. The I/O state
+        # provider clears it otherwise.
+        self.clears_io_syscalls = False
+
     def _process_syscall_entry(self, event):
         cpu_id = event['cpu_id']
 
@@ -62,12 +71,12 @@ class SyscallsStateProvider(sp.StateProvider):
 
         current_syscall.process_exit(event)
 
-        self._state.send_notification_cb('syscall_exit',
-                                         proc=proc,
-                                         event=event,
-                                         cpu_id=cpu_id)
+        self._state.send_notification_cb(
+            'syscall_exit',
+            notification.SyscallExitNotification(proc, event, cpu_id))
 
         # If it's an IO Syscall, the IO state provider will take care of
         # clearing the current syscall, so only clear here if it's not
-        if current_syscall.name not in sv.SyscallConsts.IO_SYSCALLS:
+        if self.clears_io_syscalls or \
+                not current_syscall.descriptor.is_io:
             self._state.tids[cpu.current_tid].current_syscall = None
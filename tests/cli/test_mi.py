@@ -0,0 +1,112 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import contextlib
+import io
+import json
+import unittest
+from lttnganalyses.cli import mi
+
+
+_TABLE_CLASS = mi.TableClass('syscalls', 'System calls', [
+    ('name', 'Name', mi.String),
+    ('duration', 'Duration', mi.Duration),
+])
+
+
+def _gen_rows(count):
+    for index in range(count):
+        yield {
+            'name': mi.String('read'),
+            'duration': mi.Duration(index * 10),
+        }
+
+
+class TestStreamedResultTable(unittest.TestCase):
+    def _create_table(self, row_count):
+        return mi.StreamedResultTable(_TABLE_CLASS, 1000, 2000,
+                                      _gen_rows(row_count))
+
+    def test_rows(self):
+        result_table = self._create_table(3)
+        durations = [row.duration.value for row in result_table.rows]
+
+        self.assertEqual(durations, [0, 10, 20])
+
+    def test_is_empty(self):
+        self.assertTrue(self._create_table(0).is_empty)
+
+        result_table = self._create_table(2)
+
+        # peeking the first row does not consume it
+        self.assertFalse(result_table.is_empty)
+        self.assertFalse(result_table.is_empty)
+        self.assertEqual(len(list(result_table.rows)), 2)
+
+    def test_append_row(self):
+        result_table = self._create_table(0)
+
+        self.assertRaises(TypeError, result_table.append_row,
+                          name=mi.String('read'), duration=mi.Duration(0))
+        self.assertRaises(TypeError, result_table.append_row_tuple, ())
+
+    def test_print(self):
+        result_table = self._create_table(2)
+        table = mi.ResultTable(_TABLE_CLASS, 1000, 2000)
+
+        for row in _gen_rows(2):
+            table.append_row(**row)
+
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            mi.print_streamed_result_table(result_table)
+
+        lines = output.getvalue().splitlines()
+        objs = [json.loads(line) for line in lines]
+        expected = table.to_native_object()
+
+        self.assertEqual(len(objs), 2)
+
+        for index, obj in enumerate(objs):
+            self.assertEqual(obj['class'], 'syscalls')
+            self.assertEqual(obj['time-range'], expected['time-range'])
+            self.assertEqual(obj['data'], [expected['data'][index]])
+
+
+class TestIncomplete(unittest.TestCase):
+    def test_process(self):
+        self.assertEqual(mi.Process('ls', tid=10).to_native_object(),
+                         {'class': 'process', 'name': 'ls', 'tid': 10})
+        self.assertEqual(
+            mi.Process('ls', tid=10, incomplete=True).to_native_object(),
+            {'class': 'process', 'name': 'ls', 'tid': 10,
+             'incomplete': True})
+        self.assertNotEqual(mi.Process('ls', tid=10, incomplete=False),
+                            mi.Process('ls', tid=10, incomplete=True))
+
+    def test_path(self):
+        self.assertEqual(mi.Path('/etc/passwd').to_native_object(),
+                         {'class': 'path', 'path': '/etc/passwd'})
+        self.assertEqual(
+            mi.Path('/etc/passwd', False).to_native_object(),
+            {'class': 'path', 'path': '/etc/passwd', 'incomplete': False})
@@ -0,0 +1,42 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+from lttnganalyses.cli import multi
+
+
+class TestDefaultArgs(unittest.TestCase):
+    def test_modes_disabled(self):
+        for name, sub_analysis in multi._SUB_ANALYSES.items():
+            default_args = multi._get_default_args(sub_analysis.cmd_class())
+
+            for mode in ('log', 'top', 'stats', 'freq', 'usage'):
+                self.assertFalse(default_args.get(mode, False), name)
+
+    def test_sched_defaults(self):
+        sub_analysis = multi._SUB_ANALYSES['schedstats']
+        default_args = multi._get_default_args(sub_analysis.cmd_class())
+
+        self.assertEqual(default_args['freq_resolution'], 20)
+        self.assertEqual(default_args['limit'], 10)
+        self.assertFalse(default_args['stream_log'])
+        self.assertFalse(default_args['per_prio'])
@@ -0,0 +1,49 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import itertools
+import unittest
+from unittest import mock
+from lttnganalyses.cli import profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_self_duration(self):
+        # each reading of the clock is one second after the previous one
+        clock = itertools.count()
+
+        with mock.patch('time.perf_counter', lambda: next(clock)):
+            prof = profiler.Profiler()
+            inner = prof._wrap('inner', lambda: None)
+            outer = prof._wrap('outer', lambda: inner() or inner())
+            outer()
+
+        rows = prof.get_result_tables(0, 1)[1].rows
+        durations = {row.handler.value: (row.count.value,
+                                         row.duration.to_us(),
+                                         row.self_duration.to_us())
+                     for row in rows}
+
+        self.assertEqual(durations, {
+            'inner': (2, 2e6, 2e6),
+            'outer': (1, 5e6, 3e6),
+        })
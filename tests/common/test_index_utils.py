@@ -0,0 +1,104 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import struct
+import unittest
+from lttnganalyses.common import index_utils
+
+
+def _make_index(entries, minor=1):
+    field_count = 9 if minor >= 1 else 7
+    entry_fmt = '>{}Q'.format(field_count)
+    data = struct.pack('>IIII', 0xc1f1dcc1, 1, minor,
+                       struct.calcsize(entry_fmt))
+
+    for entry in entries:
+        data += struct.pack(entry_fmt, *entry[:field_count])
+
+    return data
+
+
+# offset, packet_size, content_size, timestamp_begin, timestamp_end,
+# events_discarded, stream_id, stream_instance_id, packet_seq_num
+_ENTRIES = [
+    (0, 32768, 30000, 1000, 2000, 0, 0, 3, 0),
+    (4096, 32768, 30000, 2000, 3000, 12, 0, 3, 1),
+    (8192, 32768, 30000, 4000, 5000, 12, 0, 3, 4),
+]
+
+
+class TestDecodeIndex(unittest.TestCase):
+    def test_version_1_1(self):
+        entries = index_utils.decode_index(_make_index(_ENTRIES))
+
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[1].timestamp_end, 3000)
+        self.assertEqual(entries[1].events_discarded, 12)
+        self.assertEqual(entries[2].packet_seq_num, 4)
+
+    def test_version_1_0(self):
+        entries = index_utils.decode_index(_make_index(_ENTRIES, minor=0))
+
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[2].stream_id, 0)
+        self.assertIsNone(entries[2].packet_seq_num)
+
+    def test_invalid_magic(self):
+        data = b'\0' * 16
+
+        self.assertRaises(ValueError, index_utils.decode_index, data)
+
+
+class TestGetLostEvents(unittest.TestCase):
+    def test_lost_events(self):
+        entries = index_utils.decode_index(_make_index(_ENTRIES))
+        result = index_utils.get_lost_events(entries)
+        expected = [
+            index_utils.LostEvents(2000, 3000, 12, 0),
+            index_utils.LostEvents(3000, 5000, 0, 2),
+        ]
+
+        self.assertEqual(result, expected)
+
+    def test_no_lost_events(self):
+        entries = index_utils.decode_index(_make_index(_ENTRIES[:1]))
+
+        self.assertEqual(index_utils.get_lost_events(entries), [])
+
+    def test_events_discarded_wrap_around(self):
+        entries = index_utils.decode_index(_make_index([
+            (0, 32768, 30000, 1000, 2000, 2 ** 32 - 3, 0, 3, 0),
+            (4096, 32768, 30000, 2000, 3000, 4, 0, 3, 1),
+        ]))
+        result = index_utils.get_lost_events(entries, 32)
+
+        self.assertEqual(result[-1], index_utils.LostEvents(2000, 3000, 7, 0))
+
+    def test_missing_packet_seq_num(self):
+        entries = index_utils.decode_index(_make_index(_ENTRIES))
+        entries[1] = entries[1]._replace(packet_seq_num=None)
+        result = index_utils.get_lost_events(entries)
+        expected = [
+            index_utils.LostEvents(2000, 3000, 12, 0),
+        ]
+
+        self.assertEqual(result, expected)
@@ -0,0 +1,158 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from lttnganalyses.common import metadata_utils
+from lttnganalyses.common.version_utils import Version
+
+
+_UUID = '6a0c5c2f-7bbe-4d2f-9c1f-0d4b2f6a8e11'
+
+_METADATA = '''/* CTF 1.8 */
+
+trace {
+    major = 1;
+    minor = 8;
+    uuid = "''' + _UUID + '''";
+    byte_order = le;
+};
+
+env {
+    domain = "kernel";
+    tracer_name = "lttng-modules";
+    tracer_major = 2;
+    tracer_minor = 7;
+    tracer_patchlevel = 3;
+};
+
+typealias integer { size = 32; align = 8; signed = false; } := unsigned long;
+
+struct packet_context {
+    uint64_t packet_seq_num;
+    unsigned long events_discarded;
+    uint32_t cpu_id;
+};
+
+clock {
+    name = "monotonic";
+    freq = 1000000000; /* Frequency, in Hz */
+    offset = 1456412386420453765;
+};
+
+event {
+    name = "sched_switch";
+    id = 0;
+    stream_id = 0;
+};
+
+event {
+    name = syscall_entry_open;
+    id = 1;
+    stream_id = 0;
+};
+'''
+
+
+def _packetize(text, packet_text_size=64):
+    data = b''
+    text = text.encode()
+
+    for offset in range(0, len(text), packet_text_size):
+        chunk = text[offset:offset + packet_text_size]
+        content_size = (37 + len(chunk)) * 8
+        data += struct.pack('<I16sIIIBBBBB', 0x75d11d57,
+                            bytes.fromhex(_UUID.replace('-', '')), 0,
+                            content_size, content_size + 64, 0, 0, 0, 1, 8)
+        data += chunk + b'\0' * 8
+
+    return data
+
+
+class TestDecodeMetadata(unittest.TestCase):
+    def test_text(self):
+        result = metadata_utils.decode_metadata(_METADATA.encode())
+
+        self.assertEqual(result, _METADATA)
+
+    def test_packetized(self):
+        result = metadata_utils.decode_metadata(_packetize(_METADATA))
+
+        self.assertEqual(result, _METADATA)
+
+    def test_invalid_packet(self):
+        data = _packetize(_METADATA)[:20]
+
+        self.assertRaises(ValueError, metadata_utils.decode_metadata, data)
+
+
+class TestTraceMetadata(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'metadata')
+        self._cache_dir = os.path.join(self._dir, 'cache')
+
+        with open(self._path, 'wb') as f:
+            f.write(_packetize(_METADATA))
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_new_from_metadata(self):
+        result = metadata_utils.TraceMetadata.new_from_metadata(_METADATA)
+
+        self.assertEqual(result.uuid, _UUID)
+        self.assertEqual(result.tracer_version, Version(2, 7, 3))
+        self.assertEqual(result.event_names,
+                         ['sched_switch', 'syscall_entry_open'])
+        self.assertEqual(len(result.clocks), 1)
+        self.assertEqual(result.clocks[0].cycles_to_ns(1000),
+                         1456412386420454765)
+        self.assertEqual(result.events_discarded_size, 32)
+
+    def test_default_events_discarded_size(self):
+        result = metadata_utils.get_events_discarded_size('trace {};')
+
+        self.assertEqual(result, 64)
+
+    def test_read_uuid(self):
+        self.assertEqual(metadata_utils.read_uuid(self._path), _UUID)
+
+    def test_get_trace_metadata_cached(self):
+        result = metadata_utils.get_trace_metadata(self._path,
+                                                   self._cache_dir)
+        cache_path = os.path.join(self._cache_dir,
+                                  'metadata-{}.json'.format(_UUID))
+
+        self.assertEqual(result.tracer_version, Version(2, 7, 3))
+        self.assertTrue(os.path.isfile(cache_path))
+
+        # the on-disk cache is used when the in-memory one is empty
+        metadata_utils._trace_metadata_cache.clear()
+        result = metadata_utils.get_trace_metadata(self._path,
+                                                   self._cache_dir)
+
+        self.assertEqual(result.tracer_version, Version(2, 7, 3))
+        self.assertEqual(result.clocks[0].offset, 1456412386420453765)
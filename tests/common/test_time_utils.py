@@ -0,0 +1,50 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+from lttnganalyses.common import time_utils
+
+
+class TestGetTimeShards(unittest.TestCase):
+    def test_single(self):
+        result = time_utils.get_time_shards(1000, 1999, 1)
+
+        self.assertEqual(result, [(1000, 1999)])
+
+    def test_even(self):
+        result = time_utils.get_time_shards(1000, 1999, 4)
+        expected = [(1000, 1249), (1250, 1499), (1500, 1749), (1750, 1999)]
+
+        self.assertEqual(result, expected)
+
+    def test_uneven(self):
+        result = time_utils.get_time_shards(0, 9, 3)
+
+        self.assertEqual(result, [(0, 2), (3, 5), (6, 9)])
+
+    def test_too_small(self):
+        result = time_utils.get_time_shards(5, 6, 4)
+
+        self.assertEqual(result, [(5, 5), (6, 6)])
+
+    def test_invalid_count(self):
+        self.assertRaises(ValueError, time_utils.get_time_shards, 0, 9, 0)
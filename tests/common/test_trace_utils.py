@@ -117,3 +117,47 @@ class TestGetSyscallName(unittest.TestCase):
         event = self.Event('whatever')
 
         self.assertRaises(ValueError, trace_utils.get_syscall_name, event)
+
+
+class TestGetEventCb(unittest.TestCase):
+    cbs = {
+        'sched_switch': 'sched_switch_cb',
+        'syscall_entry_connect': 'connect_cb',
+        'syscall_entry': 'entry_cb',
+        'syscall_exit': 'exit_cb',
+    }
+
+    def test_name(self):
+        result = trace_utils.get_event_cb(self.cbs, 'sched_switch')
+
+        self.assertEqual(result, 'sched_switch_cb')
+
+    def test_name_before_syscall(self):
+        result = trace_utils.get_event_cb(self.cbs, 'syscall_entry_connect')
+
+        self.assertEqual(result, 'connect_cb')
+
+    def test_syscall_entry(self):
+        result = trace_utils.get_event_cb(self.cbs, 'syscall_entry_open')
+        result_sys = trace_utils.get_event_cb(self.cbs, 'sys_open')
+
+        self.assertEqual(result, 'entry_cb')
+        self.assertEqual(result_sys, 'entry_cb')
+
+    def test_syscall_exit(self):
+        result = trace_utils.get_event_cb(self.cbs, 'syscall_exit_open')
+        result_exit = trace_utils.get_event_cb(self.cbs, 'exit_syscall')
+
+        self.assertEqual(result, 'exit_cb')
+        self.assertEqual(result_exit, 'exit_cb')
+
+    def test_no_syscall_cb(self):
+        cbs = {'sched_switch': 'sched_switch_cb'}
+        result = trace_utils.get_event_cb(cbs, 'syscall_entry_open')
+
+        self.assertIsNone(result)
+
+    def test_unknown(self):
+        result = trace_utils.get_event_cb(self.cbs, 'irq_handler_entry')
+
+        self.assertIsNone(result)
@@ -0,0 +1,370 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+from lttnganalyses.core import cputop, io, irq, memtop, syscalls
+from lttnganalyses.core.analysis import AnalysisCallbackType, AnalysisConfig
+from lttnganalyses.core.event import Event
+from lttnganalyses.core.period import Period
+from lttnganalyses.linuxautomaton import notification, sv
+
+
+def _create_period_data(analysis, begin_ts):
+    period_data = analysis._create_period_data()
+    begin_evt = Event.new_from_fields('sched_switch', begin_ts, {})
+    period_data._set_period(Period(None, None, begin_evt, {}))
+
+    return period_data
+
+
+def _create_irq(irq_class, id, begin_ts, end_ts, **kwargs):
+    interrupt = irq_class(id, 0, begin_ts=begin_ts, **kwargs)
+    interrupt.end_ts = end_ts
+
+    return interrupt
+
+
+def _create_syscall(name, begin_ts, end_ts, ret=0):
+    syscall = sv.SyscallEvent(name, begin_ts)
+    syscall.end_ts = end_ts
+    syscall.duration = end_ts - begin_ts
+    syscall.ret = ret
+
+    return syscall
+
+
+class TestMergeShards(unittest.TestCase):
+    def setUp(self):
+        self._analysis = memtop.Memtop(None, AnalysisConfig())
+        self._ticks = []
+        self._analysis.register_notification_cbs({
+            AnalysisCallbackType.TICK_CB: self._tick_cb,
+        })
+
+    def _tick_cb(self, period_data, end_ns):
+        self._ticks.append((period_data, end_ns))
+
+    def _create_shard_period_data(self, begin_ts, allocated_pages):
+        period_data = _create_period_data(self._analysis, begin_ts)
+        proc_stats = memtop.ProcessMemStats(1, 1, 'init')
+        proc_stats.allocated_pages = allocated_pages
+        period_data.tids[1] = proc_stats
+
+        return period_data
+
+    def test_merge_shards(self):
+        first = self._create_shard_period_data(1000, 3)
+        second = self._create_shard_period_data(2000, 4)
+        self._analysis.merge_shards([(first, 1900), (None, None),
+                                     (second, 2900)])
+
+        self.assertTrue(self._analysis.ended)
+        self.assertEqual(self._analysis.first_event_ts, 1000)
+        self.assertEqual(self._analysis.last_event_ts, 2900)
+        self.assertEqual(self._ticks, [(first, 2900), (None, 2900)])
+        self.assertEqual(first.tids[1].allocated_pages, 7)
+
+    def test_merge_empty_shards(self):
+        self._analysis.merge_shards([(None, None), (None, None)])
+
+        self.assertTrue(self._analysis.ended)
+        self.assertEqual(self._ticks, [(None, None)])
+
+
+class TestCputopMerge(unittest.TestCase):
+    def test_cpu_usage_stats(self):
+        cpu_stats = cputop.CpuUsageStats(0)
+        cpu_stats.total_usage_time = 300
+        other = cputop.CpuUsageStats(0)
+        other.total_usage_time = 200
+        cpu_stats.merge(other)
+
+        self.assertEqual(cpu_stats.total_usage_time, 500)
+
+    def test_process_cpu_stats(self):
+        proc_stats = cputop.ProcessCpuStats(None, 12, '')
+        proc_stats.total_cpu_time = 300
+        proc_stats.migrate_count = 1
+        other = cputop.ProcessCpuStats(10, 12, 'bash')
+        other.total_cpu_time = 200
+        other.migrate_count = 2
+        proc_stats.merge(other)
+
+        self.assertEqual(proc_stats.pid, 10)
+        self.assertEqual(proc_stats.comm, 'bash')
+        self.assertEqual(proc_stats.total_cpu_time, 500)
+        self.assertEqual(proc_stats.migrate_count, 3)
+
+    def test_usage_percent(self):
+        analysis = cputop.Cputop(None, AnalysisConfig())
+        first = _create_period_data(analysis, 0)
+        first.cpus[0] = cputop.CpuUsageStats(0)
+        first.cpus[0].total_usage_time = 250
+        second = _create_period_data(analysis, 500)
+        second.cpus[0] = cputop.CpuUsageStats(0)
+        second.cpus[0].total_usage_time = 250
+        second.cpus[1] = cputop.CpuUsageStats(1)
+        second.cpus[1].total_usage_time = 100
+        analysis.merge_shards([(first, 499), (second, 1000)])
+
+        self.assertEqual(first.cpus[0].usage_percent, 50)
+        self.assertEqual(first.cpus[1].usage_percent, 10)
+
+
+class TestIoMerge(unittest.TestCase):
+    def test_disk_stats(self):
+        disk_stats = io.DiskStats(8, 'sda')
+        other = io.DiskStats(8, 'sda')
+
+        for begin_ts, duration, stats in ((0, 30, disk_stats),
+                                          (100, 10, other),
+                                          (200, 50, other)):
+            req = sv.BlockIORequest(begin_ts, 1, sv.IORequest.OP_READ, 8, 0,
+                                    2)
+            req.duration = duration
+            stats.update_stats(req)
+
+        disk_stats.merge(other)
+
+        self.assertEqual(disk_stats.rq_count, 3)
+        self.assertEqual(disk_stats.min_rq_duration, 10)
+        self.assertEqual(disk_stats.max_rq_duration, 50)
+        self.assertEqual(disk_stats.total_rq_sectors, 6)
+        self.assertEqual(disk_stats.total_rq_duration, 90)
+        self.assertEqual(list(disk_stats.requests.column('begin_ts')),
+                         [0, 100, 200])
+
+    def test_iface_stats(self):
+        iface_stats = io.IfaceStats('eth0')
+        iface_stats.recv_bytes = 100
+        iface_stats.sent_packets = 1
+        other = io.IfaceStats('eth0')
+        other.recv_bytes = 50
+        other.sent_packets = 2
+        iface_stats.merge(other)
+
+        self.assertEqual(iface_stats.recv_bytes, 150)
+        self.assertEqual(iface_stats.sent_packets, 3)
+
+    def test_process_io_stats(self):
+        proc_stats = io.ProcessIOStats(10, 10, 'cat')
+        proc_stats.disk_io.read = 100
+        proc_stats.fds[3] = [io.FDStats(3, '/etc/passwd', sv.FDType.disk,
+                                        False, None, 0)]
+        proc_stats.fds[3][0].io.read = 100
+        other = io.ProcessIOStats(10, 10, 'cat')
+        other.disk_io.read = 50
+        other.net_io.write = 20
+
+        # FD 3 is still open at the beginning of the following shard,
+        # then reused
+        other.fds[3] = [io.FDStats(3, '/etc/passwd', sv.FDType.disk, False,
+                                   None, 500),
+                        io.FDStats(3, '/etc/hosts', sv.FDType.disk, False,
+                                   None, 800)]
+        other.fds[3][0].close_ts = 700
+        other.fds[3][0].io.read = 50
+        other.fds[4] = [io.FDStats(4, 'socket', sv.FDType.net, False, None,
+                                   600)]
+        proc_stats.merge(other, 500)
+
+        self.assertEqual(proc_stats.disk_io.read, 150)
+        self.assertEqual(proc_stats.net_io.write, 20)
+        self.assertEqual(len(proc_stats.fds[3]), 2)
+        self.assertEqual(proc_stats.fds[3][0].open_ts, 0)
+        self.assertEqual(proc_stats.fds[3][0].close_ts, 700)
+        self.assertEqual(proc_stats.fds[3][0].io.read, 150)
+        self.assertEqual(proc_stats.fds[3][1].filename, '/etc/hosts')
+        self.assertEqual(len(proc_stats.fds[4]), 1)
+
+    def test_process_io_stats_fd_closed_then_reused(self):
+        proc_stats = io.ProcessIOStats(10, 10, 'cat')
+        proc_stats.fds[3] = [io.FDStats(3, '/etc/passwd', sv.FDType.disk,
+                                        False, None, 0)]
+
+        # FD 3 is closed without any I/O in the following shard, then
+        # its number is reused for another file
+        conf = AnalysisConfig()
+        conf.follows_time_shard = True
+        analysis = io.IoAnalysis(None, conf)
+        period_data = _create_period_data(analysis, 500)
+        proc = sv.Process(10, 10, 'cat')
+        proc.fds[3] = sv.FD(3, '/etc/passwd', sv.FDType.disk)
+        analysis._process_close_fd(
+            period_data, notification.FDNotification(3, proc, 700, 0))
+        proc.fds[3] = sv.FD(3, '/etc/hosts', sv.FDType.disk)
+        analysis._process_create_fd(
+            period_data, notification.FDNotification(3, proc, 800, 0))
+        proc_stats.merge(period_data.tids[10], 500)
+
+        self.assertEqual(len(proc_stats.fds[3]), 2)
+        self.assertEqual(proc_stats.fds[3][0].filename, '/etc/passwd')
+        self.assertEqual(proc_stats.fds[3][0].close_ts, 700)
+        self.assertEqual(proc_stats.fds[3][1].filename, '/etc/hosts')
+        self.assertEqual(proc_stats.fds[3][1].open_ts, 800)
+        self.assertIsNone(proc_stats.fds[3][1].close_ts)
+
+    def test_process_io_stats_fd_opened_in_following_shard(self):
+        proc_stats = io.ProcessIOStats(10, 10, 'cat')
+        proc_stats.fds[3] = [io.FDStats(3, '/etc/passwd', sv.FDType.disk,
+                                        False, None, 0)]
+        other = io.ProcessIOStats(10, 10, 'cat')
+        other.fds[3] = [io.FDStats(3, '/etc/hosts', sv.FDType.disk, False,
+                                   None, 800)]
+        proc_stats.merge(other, 500)
+
+        self.assertEqual(len(proc_stats.fds[3]), 2)
+        self.assertEqual(proc_stats.fds[3][1].filename, '/etc/hosts')
+
+    def test_top_requests(self):
+        conf = AnalysisConfig()
+        conf.top_limit = 1
+        conf.min_size = 100
+        analysis = io.IoAnalysis(None, conf)
+        period_data = _create_period_data(analysis, 0)
+        other = _create_period_data(analysis, 1000)
+        proc_stats = io.ProcessIOStats(10, 10, 'cat')
+
+        for data, begin_ts, duration, size in ((period_data, 0, 50, 100),
+                                               (period_data, 100, 80, 10),
+                                               (other, 1000, 70, 200),
+                                               (other, 1100, 60, 200)):
+            req = sv.ReadWriteIORequest(begin_ts, None, 10,
+                                        sv.IORequest.OP_READ, 'read')
+            req.size = size
+            req.end_ts = begin_ts + duration
+            req.duration = duration
+            analysis._update_top_requests(data, proc_stats, req)
+
+        analysis._merge_period_data(period_data, other)
+        top_requests = analysis.top_io_requests(period_data,
+                                                sv.IORequest.OP_READ)
+
+        # The top tables have one more row than the limit, and the
+        # request of 10 bytes is filtered out
+        self.assertEqual([io_rq['duration'] for _, io_rq in top_requests],
+                         [70, 60])
+        self.assertEqual(top_requests[0][1]['syscall_name'], 'read')
+        self.assertEqual(
+            analysis.top_io_requests(period_data, sv.IORequest.OP_WRITE), [])
+
+    def _get_fd_stats(self, follows_time_shard):
+        conf = AnalysisConfig()
+        conf.follows_time_shard = follows_time_shard
+        analysis = io.IoAnalysis(None, conf)
+        period_data = _create_period_data(analysis, 1000)
+        proc = sv.Process(10, 10, 'cat')
+        proc.fds[3] = sv.FD(3, '/etc/passwd', sv.FDType.disk)
+        proc_stats = io.ProcessIOStats.new_from_process(proc)
+
+        return analysis._get_fd_stats(period_data, proc_stats, proc, 3)
+
+    def test_fd_opened_before_time_shard(self):
+        fd_stats = self._get_fd_stats(True)
+
+        self.assertEqual(fd_stats.filename, '/etc/passwd')
+        self.assertEqual(fd_stats.open_ts, 1000)
+
+    def test_fd_opened_before_analysis(self):
+        self.assertIsNone(self._get_fd_stats(False))
+
+
+class TestIrqMerge(unittest.TestCase):
+    def test_hard_irq_stats(self):
+        irq_stats = irq.HardIrqStats('eth0')
+        irq_stats.update_stats(_create_irq(sv.HardIRQ, 30, 1000, 1010))
+        other = irq.HardIrqStats('ahci')
+        other.update_stats(_create_irq(sv.HardIRQ, 30, 1100, 1130))
+        other.update_stats(_create_irq(sv.HardIRQ, 30, 1200, 1205))
+        irq_stats.merge(other)
+
+        self.assertEqual(irq_stats.name, 'eth0, ahci')
+        self.assertEqual(irq_stats.count, 3)
+        self.assertEqual(irq_stats.min_duration, 5)
+        self.assertEqual(irq_stats.max_duration, 30)
+        self.assertEqual(irq_stats.total_duration, 45)
+        self.assertEqual(len(irq_stats.irq_list), 3)
+
+    def test_softirq_stats(self):
+        irq_stats = irq.SoftIrqStats('TIMER_SOFTIRQ', keep_events=False)
+        irq_stats.update_stats(_create_irq(sv.SoftIRQ, 1, 10, 20,
+                                           raise_ts=5))
+        other = irq.SoftIrqStats('TIMER_SOFTIRQ', keep_events=False)
+        other.update_stats(_create_irq(sv.SoftIRQ, 1, 110, 150,
+                                       raise_ts=90))
+        irq_stats.merge(other)
+
+        self.assertEqual(irq_stats.count, 2)
+        self.assertEqual(irq_stats.raise_count, 2)
+        self.assertEqual(irq_stats.min_raise_latency, 5)
+        self.assertEqual(irq_stats.max_raise_latency, 20)
+        self.assertEqual(irq_stats.duration_stats.histogram.count, 2)
+        self.assertEqual(irq_stats.irq_list, [])
+
+
+class TestMemtopMerge(unittest.TestCase):
+    def test_process_mem_stats(self):
+        proc_stats = memtop.ProcessMemStats(10, 10, 'cat')
+        proc_stats.allocated_pages = 5
+        proc_stats.freed_pages = 1
+        other = memtop.ProcessMemStats(10, 10, 'cat')
+        other.allocated_pages = 2
+        other.freed_pages = 4
+        proc_stats.merge(other)
+
+        self.assertEqual(proc_stats.allocated_pages, 7)
+        self.assertEqual(proc_stats.freed_pages, 5)
+
+
+class TestSyscallsMerge(unittest.TestCase):
+    def test_syscall_stats(self):
+        syscall_stats = syscalls.SyscallStats('read')
+        syscall_stats.update_stats(_create_syscall('read', 0, 20))
+        other = syscalls.SyscallStats('read')
+        other.update_stats(_create_syscall('read', 100, 105, -11))
+        syscall_stats.merge(other)
+
+        self.assertEqual(syscall_stats.count, 2)
+        self.assertEqual(syscall_stats.min_duration, 5)
+        self.assertEqual(syscall_stats.max_duration, 20)
+        self.assertEqual(syscall_stats.total_duration, 25)
+        self.assertEqual(list(syscall_stats.calls.column('ret')), [0, -11])
+
+    def test_process_syscall_stats(self):
+        proc_stats = syscalls.ProcessSyscallStats(10, 10, 'cat')
+        proc_stats.syscalls['read'] = syscalls.SyscallStats('read')
+        proc_stats.syscalls['read'].update_stats(
+            _create_syscall('read', 0, 20))
+        proc_stats.total_syscalls = 1
+        other = syscalls.ProcessSyscallStats(10, 10, 'cat')
+
+        for name in ('read', 'close'):
+            other.syscalls[name] = syscalls.SyscallStats(name)
+            other.syscalls[name].update_stats(
+                _create_syscall(name, 100, 110))
+
+        other.total_syscalls = 2
+        proc_stats.merge(other)
+
+        self.assertEqual(proc_stats.total_syscalls, 3)
+        self.assertEqual(proc_stats.syscalls['read'].count, 2)
+        self.assertEqual(proc_stats.syscalls['close'].count, 1)
@@ -0,0 +1,210 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import math
+import random
+import statistics
+import unittest
+from lttnganalyses.core import stats
+
+
+class TestRunningStats(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self._values = [rng.randint(0, 10 ** 9) for _ in range(1000)]
+
+    def _get_stats(self, values):
+        running_stats = stats.RunningStats()
+
+        for value in values:
+            running_stats.update(value)
+
+        return running_stats
+
+    def test_empty(self):
+        running_stats = stats.RunningStats()
+
+        self.assertEqual(running_stats.count, 0)
+        self.assertIsNone(running_stats.min)
+        self.assertIsNone(running_stats.max)
+        self.assertTrue(math.isnan(running_stats.stdev))
+
+    def test_update(self):
+        running_stats = self._get_stats(self._values)
+
+        self.assertEqual(running_stats.count, len(self._values))
+        self.assertEqual(running_stats.min, min(self._values))
+        self.assertEqual(running_stats.max, max(self._values))
+        self.assertEqual(running_stats.total, sum(self._values))
+        self.assertAlmostEqual(running_stats.stdev,
+                               statistics.stdev(self._values), delta=1e-3)
+
+    def test_merge(self):
+        running_stats = self._get_stats(self._values[:300])
+        running_stats.merge(self._get_stats(self._values[300:]))
+        running_stats.merge(stats.RunningStats())
+
+        self.assertEqual(running_stats.count, len(self._values))
+        self.assertEqual(running_stats.min, min(self._values))
+        self.assertEqual(running_stats.max, max(self._values))
+        self.assertAlmostEqual(running_stats.stdev,
+                               statistics.stdev(self._values), delta=1e-3)
+
+    def test_histogram(self):
+        running_stats = stats.RunningStats(with_histogram=True)
+
+        for value in self._values:
+            running_stats.update(value)
+
+        self.assertEqual(running_stats.histogram.count, len(self._values))
+        running_stats.reset()
+        self.assertEqual(running_stats.histogram.count, 0)
+
+
+class TestLogHistogram(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self._values = [rng.randint(1, 10 ** 9) for _ in range(1000)]
+
+    def test_precision(self):
+        histogram = stats.LogHistogram(0.01)
+        histogram.update(12345)
+        [(value, count)] = histogram.items()
+
+        self.assertEqual(count, 1)
+        self.assertLessEqual(abs(value - 12345) / 12345, 0.01)
+
+    def test_not_positive(self):
+        histogram = stats.LogHistogram()
+        histogram.update(0)
+        histogram.update(10)
+
+        self.assertEqual(histogram.items()[0], (0, 1))
+
+    def test_quantile(self):
+        histogram = stats.LogHistogram(0.01)
+
+        for value in self._values:
+            histogram.update(value)
+
+        median = statistics.median_low(self._values)
+
+        self.assertIsNone(stats.LogHistogram().quantile(0.5))
+        self.assertLessEqual(abs(histogram.quantile(0.5) - median) / median,
+                             0.01)
+
+    def test_merge(self):
+        histogram = stats.LogHistogram()
+        other = stats.LogHistogram()
+
+        for value in self._values[:500]:
+            histogram.update(value)
+
+        for value in self._values[500:]:
+            other.update(value)
+
+        histogram.merge(other)
+        self.assertEqual(histogram.count, len(self._values))
+        self.assertEqual(sum(count for _, count in histogram.items()),
+                         len(self._values))
+        self.assertRaises(ValueError, histogram.merge,
+                          stats.LogHistogram(0.05))
+
+
+class TestColumnStore(unittest.TestCase):
+    _NAMES = ('begin_ts', 'size', 'name')
+
+    def _get_store(self, rows):
+        store = stats.ColumnStore(self._NAMES, ('name',))
+
+        for row in rows:
+            store.append(*row)
+
+        return store
+
+    def test_append(self):
+        store = self._get_store([(10, 4096, 'read'), (20, None, 'open')])
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual(list(store.column('begin_ts')), [10, 20])
+        self.assertEqual(store.row(0),
+                         {'begin_ts': 10, 'size': 4096, 'name': 'read'})
+        self.assertIsNone(store.get(1, 'size'))
+        self.assertEqual(store.get(1, 'name'), 'open')
+
+    def test_merge(self):
+        store = self._get_store([(10, 1, 'read'), (20, 2, 'write')])
+        other = self._get_store([(30, 3, 'write'), (40, None, None)])
+        store.merge(other)
+
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.strings, ['read', 'write'])
+        self.assertEqual(store.row(2),
+                         {'begin_ts': 30, 'size': 3, 'name': 'write'})
+        self.assertEqual(store.row(3),
+                         {'begin_ts': 40, 'size': None, 'name': None})
+
+    def test_reset(self):
+        store = self._get_store([(10, 1, 'read')])
+        store.reset()
+
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.strings, [])
+
+
+class TestTopK(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self._keys = [rng.randint(0, 50) for _ in range(1000)]
+
+    def _get_expected(self, keys, limit):
+        items = sorted(enumerate(keys), key=lambda item: item[1],
+                       reverse=True)
+
+        return [index for index, key in items[:limit]]
+
+    def test_update(self):
+        top = stats.TopK(10)
+
+        for index, key in enumerate(self._keys):
+            top.update(key, index)
+
+        self.assertEqual(len(top), 10)
+        self.assertEqual(top.items(), self._get_expected(self._keys, 10))
+
+    def test_merge(self):
+        top = stats.TopK(10)
+        other = stats.TopK(10)
+
+        for index, key in enumerate(self._keys[:500]):
+            top.update(key, index)
+
+        for index, key in enumerate(self._keys[500:], 500):
+            other.update(key, index)
+
+        top.merge(other)
+        self.assertEqual(top.items(), self._get_expected(self._keys, 10))
+
+    def test_zero_limit(self):
+        top = stats.TopK(0)
+        top.update(1, 'item')
+
+        self.assertEqual(top.items(), [])
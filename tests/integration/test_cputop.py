@@ -47,3 +47,13 @@ class CpuTest(AnalysisTest):
                                      options='--no-intersection')
 
         self._assertMultiLineEqual(result, expected, test_name)
+
+    def test_cputop_cache(self):
+        test_name = 'cputop'
+        expected = self.get_expected_output(test_name)
+
+        # the first run creates the cache, the second one replays it
+        for _ in range(2):
+            result = self.get_cmd_output('lttng-cputop',
+                                         options='--no-intersection --cache')
+            self._assertMultiLineEqual(result, expected, test_name)
@@ -21,7 +21,9 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import inspect
 import unittest
+from babeltrace import TraceCollection
 from lttnganalyses.common import trace_utils
 from .analysis_test import AnalysisTest
 
@@ -39,8 +41,10 @@ class IntersectTest(AnalysisTest):
         self.trace_writer.write_softirq_exit(1010, 2, 7)
         self.trace_writer.flush()
 
-    @unittest.skipIf(trace_utils.read_babeltrace_version() <
-                     trace_utils.BT_INTERSECT_VERSION,
+    # TraceCollection only accepts the intersect_mode argument starting
+    # with babeltrace 1.4
+    @unittest.skipIf('intersect_mode' not in
+                     inspect.signature(TraceCollection).parameters,
                      "not supported by Babeltrace < %s" %
                      trace_utils.BT_INTERSECT_VERSION,)
     def test_no_intersection(self):
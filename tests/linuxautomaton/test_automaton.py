@@ -0,0 +1,194 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+from babeltrace import CTFScope
+from lttnganalyses.common.version_utils import Version
+from lttnganalyses.core.event import Event
+from lttnganalyses.linuxautomaton import automaton
+
+
+class _AutomatonTestCase(unittest.TestCase):
+    def setUp(self):
+        self._automaton = automaton.Automaton()
+        self._state = self._automaton.state
+        self._state.tracer_version = Version(2, 8, 0)
+        self._ts = 1000
+
+    def _process_event(self, name, cpu_id, **fields):
+        self._ts += 1
+        self._automaton.process_event(Event.new_from_fields(
+            name, self._ts, {
+                CTFScope.STREAM_PACKET_CONTEXT: {'cpu_id': cpu_id},
+                CTFScope.EVENT_FIELDS: fields,
+            }))
+
+    def _switch(self, cpu_id, prev_tid, next_tid, next_comm='task'):
+        self._process_event('sched_switch', cpu_id, prev_comm='task',
+                            prev_tid=prev_tid, prev_prio=20, prev_state=0,
+                            next_comm=next_comm, next_tid=next_tid,
+                            next_prio=20)
+
+    def _read_entry(self, cpu_id):
+        self._process_event('syscall_entry_read', cpu_id, fd=3, count=4096)
+
+    def _read_exit(self, cpu_id):
+        self._process_event('syscall_exit_read', cpu_id, ret=4096)
+
+    def _free(self, cpu_id, tid):
+        self._process_event('sched_process_exit', cpu_id, comm='task',
+                            tid=tid, prio=20)
+        self._process_event('sched_process_free', cpu_id, comm='task',
+                            tid=tid, prio=20)
+
+
+class TestStateIndexes(_AutomatonTestCase):
+    # Checks the indexes against the CPUs and processes of the state
+    def _assert_consistent(self):
+        tid_cpus = {}
+        io_cpus = set()
+        kswapd_cpus = set()
+
+        for cpu_id, cpu in self._state.cpus.items():
+            if cpu.current_tid is None:
+                continue
+
+            tid_cpus.setdefault(cpu.current_tid, set()).add(cpu_id)
+            proc = self._state.tids[cpu.current_tid]
+
+            if proc.current_syscall is not None and \
+                    proc.current_syscall.io_rq:
+                io_cpus.add(cpu_id)
+
+            if proc.comm == 'kswapd0':
+                kswapd_cpus.add(cpu_id)
+
+        self.assertEqual(self._state.tid_cpus, tid_cpus)
+        self.assertEqual(self._state.io_cpus, io_cpus)
+        self.assertEqual(self._state.kswapd_cpus, kswapd_cpus)
+
+    def test_sched_switch(self):
+        self._switch(0, 0, 10)
+        self._switch(1, 0, 11)
+        self._assert_consistent()
+        self.assertEqual(self._state.tid_cpus, {10: {0}, 11: {1}})
+
+        self._switch(0, 10, 0)
+        self._switch(1, 11, 10)
+        self._assert_consistent()
+        self.assertEqual(self._state.tid_cpus, {10: {1}})
+
+        self._switch(0, 0, 12, 'kswapd0')
+        self._assert_consistent()
+        self.assertEqual(self._state.kswapd_cpus, {0})
+
+        self._switch(0, 12, 0)
+        self._assert_consistent()
+        self.assertEqual(self._state.kswapd_cpus, set())
+
+    def test_io_syscall(self):
+        self._switch(0, 0, 10)
+        self._read_entry(0)
+        self._assert_consistent()
+        self.assertEqual(self._state.io_cpus, {0})
+        self.assertEqual(self._state.io_tids, {10})
+
+        # the task is still in its system call on another CPU
+        self._switch(0, 10, 11)
+        self._switch(1, 0, 10)
+        self._assert_consistent()
+        self.assertEqual(self._state.io_cpus, {1})
+
+        self._read_exit(1)
+        self._assert_consistent()
+        self.assertEqual(self._state.io_cpus, set())
+        self.assertEqual(self._state.io_tids, set())
+
+    def test_process_exit(self):
+        self._switch(0, 0, 10)
+        self._switch(1, 0, 11, 'kswapd0')
+        self._read_entry(0)
+        self._free(0, 10)
+        self._free(1, 11)
+        self._assert_consistent()
+        self.assertEqual(self._state.tid_cpus, {})
+        self.assertEqual(self._state.io_cpus, set())
+        self.assertEqual(self._state.kswapd_cpus, set())
+        self.assertEqual(self._state.io_tids, set())
+
+
+class TestDeadProcesses(_AutomatonTestCase):
+    def _fork(self, cpu_id, tid, comm):
+        self._process_event('sched_process_fork', cpu_id,
+                            parent_comm='bash', parent_tid=1, parent_pid=1,
+                            child_comm=comm, child_tid=tid, child_pid=tid)
+
+    def test_retire(self):
+        self._fork(0, 10, 'cat')
+        fork_ts = self._ts
+        self._switch(0, 0, 10, 'cat')
+        self._read_entry(0)
+        self._free(0, 10)
+
+        self.assertNotIn(10, self._state.tids)
+        self.assertEqual(self._state.find_process(10).comm, 'cat')
+
+        dead_proc = self._state.dead_tids[10]
+
+        self.assertEqual(dead_proc.tid, 10)
+        self.assertEqual(dead_proc.pid, 10)
+        self.assertEqual(dead_proc.begin_ts, fork_ts)
+        self.assertEqual(dead_proc.end_ts, self._ts - 1)
+        self.assertIsNone(self._state.cpus[0].current_tid)
+        self.assertEqual(self._state.tid_cpus, {})
+        self.assertEqual(self._state.io_cpus, set())
+        self.assertEqual(self._state.io_tids, set())
+
+    def test_reused_tid(self):
+        self._fork(0, 10, 'cat')
+        self._free(0, 10)
+        self._fork(0, 10, 'ls')
+
+        self.assertEqual(self._state.find_process(10).comm, 'ls')
+
+        self._free(0, 10)
+
+        self.assertEqual(len(self._state.dead_tids), 1)
+        self.assertEqual(self._state.dead_tids[10].comm, 'ls')
+
+    def test_max_dead_tids(self):
+        self._state.max_dead_tids = 2
+
+        for tid in (10, 11, 12):
+            self._fork(0, tid, 'task')
+            self._free(0, tid)
+
+        self.assertEqual(list(self._state.dead_tids), [11, 12])
+        self.assertIsNone(self._state.find_process(10))
+
+    def test_no_dead_tids(self):
+        self._state.max_dead_tids = 0
+        self._fork(0, 10, 'cat')
+        self._free(0, 10)
+
+        self.assertEqual(len(self._state.dead_tids), 0)
+        self.assertIsNone(self._state.find_process(10))
@@ -0,0 +1,65 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+from lttnganalyses.linuxautomaton import notification
+
+
+class TestNotificationBus(unittest.TestCase):
+    def setUp(self):
+        self._bus = notification.NotificationBus()
+        self._received = []
+
+    def _get_cb(self, tag):
+        def cb(period_data, payload):
+            self._received.append((tag, period_data, payload))
+
+        return cb
+
+    def test_send(self):
+        self._bus.subscribe('period1', {'prio_changed': self._get_cb(1)})
+        self._bus.subscribe('period2', {'prio_changed': self._get_cb(2)})
+        payload = notification.PrioChangedNotification(1000, 42, 20)
+        self._bus.send('prio_changed', payload)
+
+        # The same payload object is passed to all the periods, in
+        # subscription order
+        self.assertEqual(self._received, [(1, 'period1', payload),
+                                          (2, 'period2', payload)])
+
+    def test_unsubscribe(self):
+        self._bus.subscribe('period1', {
+            'prio_changed': self._get_cb(1),
+            'close_fd': self._get_cb(1),
+        })
+        self._bus.subscribe('period2', {'prio_changed': self._get_cb(2)})
+        self._bus.unsubscribe('period1')
+
+        self.assertTrue(self._bus.has_subscribers('prio_changed'))
+        self.assertFalse(self._bus.has_subscribers('close_fd'))
+
+        self._bus.send('prio_changed',
+                       notification.PrioChangedNotification(1000, 42, 20))
+        self._bus.send('close_fd',
+                       notification.FDNotification(3, None, 1000, 0))
+
+        self.assertEqual([tag for tag, _, _ in self._received], [2])
@@ -0,0 +1,77 @@
+# The MIT License (MIT)
+#
+# Copyright (C) 2016 - LTTng Analyses contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import tracemalloc
+import unittest
+from lttnganalyses.linuxautomaton import sv
+
+
+_COUNT = 10000
+
+
+# Returns the number of bytes allocated by `create()`, called `_COUNT`
+# times.
+def _get_allocated_size(create):
+    tracemalloc.start()
+
+    try:
+        objects = [create(i) for i in range(_COUNT)]
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert len(objects) == _COUNT
+
+    return size
+
+
+# Returns a class with the same constructor as `cls`, but of which the
+# instances store their attributes in a dictionary.
+def _get_dict_class(cls):
+    return type('Dict' + cls.__name__, (), {'__init__': cls.__init__})
+
+
+class TestStateValueMemory(unittest.TestCase):
+    def _assert_smaller(self, cls, create):
+        dict_cls = _get_dict_class(cls)
+        size = _get_allocated_size(lambda i: create(cls, i))
+        dict_size = _get_allocated_size(lambda i: create(dict_cls, i))
+        self.assertLess(size, dict_size)
+
+    def test_process(self):
+        self._assert_smaller(sv.Process,
+                             lambda cls, i: cls(i, i, 'proc{}'.format(i)))
+
+    def test_fd(self):
+        self._assert_smaller(sv.FD, lambda cls, i: cls(i, '/tmp/file'))
+
+    def test_cpu(self):
+        self._assert_smaller(sv.CPU, lambda cls, i: cls(i))
+
+    def test_no_instance_dict(self):
+        req = sv.ReadWriteIORequest(0, 16, 42, sv.IORequest.OP_READ, 'read')
+        req.fd = 3
+        self.assertFalse(hasattr(req, '__dict__'))
+        self.assertFalse(hasattr(sv.HardIRQ(1, 0, 0), '__dict__'))
+
+        with self.assertRaises(AttributeError):
+            req.unknown = None